@@ -0,0 +1 @@
+"""Benchmarks for the Mindponics agents and tools."""
@@ -0,0 +1,111 @@
+"""Byte and token reduction of compact tool results, per tool.
+
+Compact mode also appends a legend for the short keys in use to the system
+instruction of the next model call, so the compact figures include the cost of
+the legend for each result's keys.
+
+Usage:
+    python -m benchmarks.compact_tools [--output benchmarks/results/compact_tools.json]
+"""
+
+import argparse
+import json
+import pathlib
+import random
+
+from mindponics.compact import compact_legend, compact_tool_result, short_keys_in
+from mindponics.compatibility import find_compatible_species
+from mindponics.context_budget import estimate_tokens
+from mindponics.forecasting import get_forecast_store
+from mindponics.sub_agents.bacteria.agent import calculate_biofilter_size, forecast_nitrification, monitor_nitrification_cycle
+from mindponics.sub_agents.environment.agent import get_ambient_conditions, suggest_climate_control
+from mindponics.sub_agents.fish.agent import calculate_feeding, check_fish_symptoms, get_fish_species_info
+from mindponics.sub_agents.plant.agent import check_plant_symptoms, get_plant_species_info, identify_nutrient_deficiency
+from mindponics.sub_agents.water.agent import (
+    diagnose_water_quality,
+    forecast_water_parameters,
+    get_water_parameters,
+    suggest_corrective_actions,
+)
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "compact_tools.json"
+
+PARAMETERS = {"ph": 6.23, "ammonia": 1.237, "nitrite": 0.612, "nitrate": 163.37,
+              "temperature": 29.46, "dissolved_oxygen": 3.81}
+
+
+def sample_calls() -> list:
+    """Representative (function, args) pairs for every FunctionTool."""
+    diagnosis = diagnose_water_quality(PARAMETERS)
+    return [
+        (get_water_parameters, {}),
+        (diagnose_water_quality, {"parameters": PARAMETERS}),
+        (suggest_corrective_actions, {"parameters": PARAMETERS, "diagnosis": diagnosis}),
+        (forecast_water_parameters, {"tank_id": "bench", "horizon_hours": 24.0}),
+        (get_fish_species_info, {"species": "tilapia", "life_stage": "juvenile"}),
+        (calculate_feeding, {"species": "trout", "life_stage": "fry", "fish_count": 250, "avg_weight_g": 12.5}),
+        (check_fish_symptoms, {"symptoms": "white spots, rapid gilling"}),
+        (get_plant_species_info, {"species": "tomato", "life_stage": "fruiting"}),
+        (identify_nutrient_deficiency, {"symptoms": "yellow leaves", "nitrate_level": 12.0, "phosphate_level": 35.0,
+                                        "potassium_level": 18.0, "species": "lettuce", "life_stage": "seedling"}),
+        (check_plant_symptoms, {"symptoms": "purple leaves, brown leaf edges"}),
+        (calculate_biofilter_size, {"fish_load_kg": 42.5}),
+        (monitor_nitrification_cycle, {"ammonia": 0.7, "nitrite": 0.3, "nitrate": 85.0}),
+        (forecast_nitrification, {"tank_id": "bench", "horizon_hours": 48.0}),
+        (get_ambient_conditions, {}),
+        (suggest_climate_control, {"current_temp": 29.0, "target_temp": 25.0,
+                                   "current_humidity": 80.0, "target_humidity": 65.0}),
+        (find_compatible_species, {"species": "trout"}),
+    ]
+
+
+def _size(value) -> tuple:
+    text = json.dumps(value, default=str, separators=(", ", ": "))
+    return len(text.encode()), estimate_tokens(text)
+
+
+def run() -> dict:
+    random.seed(0)
+    store = get_forecast_store()
+    for hour in range(12):
+        store.observe("bench", {**PARAMETERS, "ammonia": 0.1 + 0.05 * hour}, timestamp=hour * 3600.0)
+
+    results = {}
+    for func, args in sample_calls():
+        verbose = func(**args)
+        compact = compact_tool_result(func.__name__, args, verbose)
+        (verbose_bytes, verbose_tokens), (compact_bytes, compact_tokens) = _size(verbose), _size(compact)
+        # The legend for this result's keys is sent with the model call that reads it
+        legend = compact_legend(short_keys_in(compact))
+        legend_bytes, legend_tokens = len(legend.encode()), estimate_tokens(legend)
+        compact_bytes += legend_bytes
+        compact_tokens += legend_tokens
+        results[func.__name__] = {
+            "verbose_bytes": verbose_bytes,
+            "compact_bytes": compact_bytes,
+            "verbose_tokens": verbose_tokens,
+            "compact_tokens": compact_tokens,
+            "legend_tokens": legend_tokens,
+            "byte_reduction": round(1 - compact_bytes / verbose_bytes, 3),
+            "token_reduction": round(1 - compact_tokens / verbose_tokens, 3),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results = run()
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"{'tool':32} {'bytes':>15} {'tokens':>13} {'legend':>6} {'saved':>6}")
+    for name, r in results.items():
+        print(f"{name:32} {r['verbose_bytes']:>6} -> {r['compact_bytes']:<6} "
+              f"{r['verbose_tokens']:>5} -> {r['compact_tokens']:<5} {r['legend_tokens']:>6} {r['token_reduction']:>6.0%}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
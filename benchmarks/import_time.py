@@ -0,0 +1,114 @@
+"""Cold-start cost of the Mindponics package, measured with `python -X importtime`.
+
+Two scenarios run in fresh interpreters: importing mindponics.agent, which must
+stay cheap, and building root_agent, which loads google.adk and every sub-agent.
+Self time is summed per top-level package to show where startup goes. With
+--check the run fails when a scenario's median exceeds its budget.
+
+Usage:
+    python -m benchmarks.import_time [--runs 5] [--check] [--output benchmarks/results/import_time.json]
+"""
+
+import argparse
+import json
+import pathlib
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "import_time.json"
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "import_agent_module": "import mindponics.agent",
+    "build_root_agent": "import mindponics.agent; mindponics.agent.root_agent",
+}
+
+# Regression budgets for the median wall time of each scenario, in milliseconds
+BUDGET_MS = {
+    "import_agent_module": 150.0,
+    "build_root_agent": 4000.0,
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+_TIMER = (
+    "import time as _t\n"
+    "_s = _t.perf_counter()\n"
+    "{code}\n"
+    "print(f'WALL_MS={{(_t.perf_counter() - _s) * 1000:.3f}}')\n"
+)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Returns self time in ms per imported module from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1)) / 1000
+    return modules
+
+
+def run_scenario(code: str) -> tuple:
+    """Runs code in a fresh interpreter and returns (wall_ms, self ms per module)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TIMER.format(code=code)],
+        capture_output=True, text=True, cwd=REPO_ROOT, check=True,
+    )
+    wall_ms = float(proc.stdout.strip().rsplit("WALL_MS=", 1)[1])
+    return wall_ms, parse_importtime(proc.stderr)
+
+
+def run(runs: int = 5, top: int = 10) -> dict:
+    results = {}
+    for name, code in SCENARIOS.items():
+        walls, per_package = [], defaultdict(list)
+        for _ in range(runs):
+            wall_ms, modules = run_scenario(code)
+            walls.append(wall_ms)
+            totals = defaultdict(float)
+            for module, self_ms in modules.items():
+                package = ".".join(module.split(".")[:2]) if module.startswith("google.") else module.split(".")[0]
+                totals[package] += self_ms
+            for package, total in totals.items():
+                per_package[package].append(total)
+        packages = {package: round(statistics.median(values), 2) for package, values in per_package.items()}
+        median = statistics.median(walls)
+        results[name] = {
+            "median_ms": round(median, 2),
+            "min_ms": round(min(walls), 2),
+            "max_ms": round(max(walls), 2),
+            "budget_ms": BUDGET_MS[name],
+            "within_budget": median <= BUDGET_MS[name],
+            "modules_imported": len(modules),
+            "top_packages_ms": dict(sorted(packages.items(), key=lambda kv: -kv[1])[:top]),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a scenario is over budget")
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    for name, r in results.items():
+        status = "ok" if r["within_budget"] else "OVER BUDGET"
+        print(f"{name:22} median {r['median_ms']:>8.1f} ms  budget {r['budget_ms']:>7.0f} ms  "
+              f"{r['modules_imported']:>5} modules  {status}")
+        for package, ms in r["top_packages_ms"].items():
+            print(f"    {package:30} {ms:>8.1f} ms")
+    print(f"Results written to {args.output}")
+    if args.check and not all(r["within_budget"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Throughput of the ingestion gateway for line and binary payloads.
+
+Pushes payloads of --batch readings over UDP and HTTP on loopback, in both
+formats, and reports readings per second from the first payload sent to the
+last reading written to the forecast store. The gateway's loop, parsing and
+writer share one core with the sender.
+
+Usage:
+    python -m benchmarks.ingestion [--readings 200000] [--batch 500] [--output benchmarks/results/ingestion.json]
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import time
+
+import numpy as np
+
+from mindponics.forecasting import ForecastStore
+from mindponics.ingestion import IngestionGateway, encode_binary, encode_lines, parameter_table
+from utils.sensor_acquisition import SensorSnapshot
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "ingestion.json"
+TANKS = 200
+
+
+def _payloads(readings: int, batch: int, binary: bool) -> list:
+    names = parameter_table()[0]
+    rng = np.random.default_rng(0)
+    payloads = []
+    for start in range(0, readings, batch):
+        n = min(batch, readings - start)
+        tanks = rng.integers(0, TANKS, n)
+        parameters = [names[i % len(names)] for i in range(start, start + n)]
+        values = np.round(rng.uniform(0.1, 8.0, n), 2)
+        timestamps = 1.7e9 + (start + np.arange(n)) * 0.01
+        if binary:
+            payloads.append(encode_binary(tanks, parameters, values, timestamps))
+        else:
+            rows = [(f"tank-{t}", {p: v}, ts) for t, p, v, ts in zip(tanks, parameters, values.tolist(), timestamps)]
+            payloads.append(encode_lines(rows))
+    return payloads
+
+
+async def _push(transport: str, payloads: list, readings: int) -> dict:
+    gateway = IngestionGateway(store=ForecastStore(), snapshot=SensorSnapshot())
+    ports = await gateway.start(**{f"{transport}_port": 0})
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    if transport == "udp":
+        sender, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=("127.0.0.1", ports["udp"]))
+        for payload in payloads:
+            sender.sendto(payload)
+            await asyncio.sleep(0)   # one loop turn per datagram, so the gateway reads it before the buffer fills
+        sender.close()
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", ports["http"])
+        for payload in payloads:
+            writer.write(f"POST /ingest HTTP/1.1\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+            await writer.drain()
+            await reader.readuntil(b"\r\n\r\n")
+            await reader.readuntil(b"}")
+        writer.close()
+    await asyncio.sleep(0.01)
+    await gateway.stop()
+    elapsed = time.perf_counter() - started
+    stats = gateway.stats
+    return {
+        "readings_per_s": round(stats["written"] / elapsed),
+        "written": stats["written"],
+        "lost": readings - stats["written"],
+        "batches": stats["batches"],
+        "backpressured": stats["backpressured"],
+    }
+
+
+def run(readings: int = 200_000, batch: int = 500) -> dict:
+    results = {}
+    for fmt in ("line", "binary"):
+        payloads = _payloads(readings, batch, fmt == "binary")
+        for transport in ("udp", "http"):
+            results[f"{transport}_{fmt}"] = asyncio.run(_push(transport, payloads, readings))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500, help="Readings per datagram or request")
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results = run(args.readings, args.batch)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    for name, r in results.items():
+        print(f"{name:12} " + "  ".join(f"{k}={v}" for k, v in r.items()))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
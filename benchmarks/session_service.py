@@ -0,0 +1,81 @@
+"""Cost of appending events with the in-memory and the SQLite session services.
+
+Appends a turn-sized burst of events carrying agent-output state deltas and
+reports the time spent on the request path per append, plus, for SQLite, the
+time the writer needs to commit the burst in the background.
+
+Usage:
+    python -m benchmarks.session_service [--events 2000] [--output benchmarks/results/session_service.json]
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from mindponics.sessions import SQLiteSessionService
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "session_service.json"
+
+
+def _events(count: int) -> list:
+    text = "Ammonia 0.4 ppm is above the 0.25 ppm limit; reduce feeding and do a 20% water change. " * 4
+    return [
+        Event(author="HydroGuardian", invocation_id=f"inv{n // 10}",
+              content=types.Content(role="model", parts=[types.Part(text=text)]),
+              actions=EventActions(state_delta={"water_agent_output": text, "turn": n}))
+        for n in range(count)
+    ]
+
+
+async def _append_all(service, events: list) -> tuple:
+    session = await service.create_session(app_name="bench", user_id="bench")
+    started = time.perf_counter()
+    for event in events:
+        await service.append_event(session, event)
+    appended = time.perf_counter() - started
+    await service.flush()
+    return appended, time.perf_counter() - started
+
+
+def run(count: int = 2000) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        services = {
+            "in_memory": InMemorySessionService(),
+            "sqlite_write_behind": SQLiteSessionService(pathlib.Path(directory) / "sessions.db"),
+        }
+        for name, service in services.items():
+            appended, committed = asyncio.run(_append_all(service, _events(count)))
+            results[name] = {
+                "us_per_append": round(appended / count * 1e6, 2),
+                "committed_ms": round(committed * 1000, 1),
+            }
+            if isinstance(service, SQLiteSessionService):
+                results[name]["batches"] = service.stats["batches"]
+                service.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results = run(args.events)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    for name, r in results.items():
+        print(f"{name:20} " + "  ".join(f"{k}={v}" for k, v in r.items()))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
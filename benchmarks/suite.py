@@ -0,0 +1,217 @@
+"""Benchmark suite for tool functions, agent step() loops and full runner turns.
+
+Three levels are measured:
+
+* tools:  every tool function called directly, microseconds per call;
+* steps:  the deterministic step() loop of each specialist agent, microseconds per step;
+* runner: complete InMemoryRunner.run_async turns through the orchestrator,
+  AgentTool delegation and tools, with FakeLlm in place of Gemini (no network,
+  zero model latency), so the figures are our own overhead.
+
+Results are written as JSON. `compare` flags every metric that got slower than
+the baseline by more than the threshold and exits non-zero if any did.
+
+Usage:
+    python -m benchmarks.suite run [--quick] [--output benchmarks/results/suite.json]
+    python -m benchmarks.suite compare BASELINE.json CURRENT.json [--threshold 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "suite.json"
+DEFAULT_THRESHOLD = 0.15
+
+# User turns for the runner level: one specialist, two specialists, and a query naming no domain (all five)
+RUNNER_SCENARIOS = {
+    "single_domain": "What is the ammonia level in the water?",
+    "multi_domain": "My fish are gasping and the lettuce leaves are yellow",
+    "fan_out_all": "Give me a full status report",
+}
+
+
+class Mailbox:
+    """In-process stand-in for the mailbox the step() loops exchange messages through."""
+
+    def __init__(self):
+        self.outbox = []
+        self.inbox = []
+
+    def send(self, recipient: str, message: dict) -> None:
+        self.outbox.append((recipient, message))
+
+    def receive(self) -> list:
+        messages, self.inbox = self.inbox, []
+        return messages
+
+
+def _per_call_us(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def bench_tools(repeat: int = 5) -> dict:
+    from benchmarks.compact_tools import PARAMETERS, sample_calls
+    from mindponics.forecasting import get_forecast_store
+
+    store = get_forecast_store()
+    for hour in range(12):
+        store.observe("bench", {**PARAMETERS, "ammonia": 0.1 + 0.05 * hour}, timestamp=hour * 3600.0)
+    return {
+        func.__name__: {"us_per_call": round(_per_call_us(lambda: func(**args), repeat), 2)}
+        for func, args in sample_calls()
+    }
+
+
+def bench_steps(repeat: int = 5) -> dict:
+    from mindponics.sub_agents.environment import EnvironmentAgent
+    from mindponics.sub_agents.fish import FishHealthAgent
+    from mindponics.sub_agents.plant import PlantGrowthAgent
+    from mindponics.sub_agents.water import WaterQualityAgent
+
+    water = {"ph": 6.8, "ammonia": 0.4, "nitrite": 0.2, "nitrate": 35.0, "temperature": 25.0, "dissolved_oxygen": 6.5}
+    agents = {
+        "HydroGuardian": (WaterQualityAgent(name="HydroGuardian"), {}, None),
+        "PiscinePro": (FishHealthAgent(name="PiscinePro"), {"fish_species": "tilapia", "life_stage": "juvenile"},
+                       ("orchestrator", {"water_parameters": water})),
+        "FloraFriend": (PlantGrowthAgent(name="FloraFriend"),
+                        {"plant_species": "lettuce", "life_stage": "vegetative", "observed_symptoms": "yellow leaves"},
+                        ("orchestrator", {"nutrient_levels": {"nitrate": 12.0, "phosphate": 15.0, "potassium": 25.0}})),
+        "ClimateController": (EnvironmentAgent(name="ClimateController", target_temp=25.0, target_humidity=65.0), {}, None),
+    }
+    results = {}
+    for name, (agent, state, message) in agents.items():
+        mailbox = Mailbox()
+
+        def step():
+            if message is not None:
+                mailbox.inbox.append(message)
+            agent.step(state, mailbox)
+            mailbox.outbox.clear()
+
+        us = _per_call_us(step, repeat)
+        results[name] = {"us_per_step": round(us, 2), "steps_per_s": round(1e6 / us, 1)}
+    return results
+
+
+async def _run_turns(runner, text: str, turns: int) -> list:
+    from google.genai import types
+
+    latencies = []
+    for _ in range(turns):
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        started = time.perf_counter()
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def bench_runner(turns: int = 20) -> dict:
+    from google.adk.runners import InMemoryRunner
+
+    from mindponics.agent import build_root_agent
+    from mindponics.fake_llm import fake_llm
+
+    root = build_root_agent()
+    results = {}
+    with fake_llm(root) as models:
+        runner = InMemoryRunner(agent=root, app_name="mindponics-bench")
+        for name, text in RUNNER_SCENARIOS.items():
+            calls_before = sum(m.calls for m in models.values())
+            asyncio.run(_run_turns(runner, text, 2))   # warm-up
+            latencies = sorted(asyncio.run(_run_turns(runner, text, turns)))
+            calls = sum(m.calls for m in models.values()) - calls_before
+            results[name] = {
+                "median_ms": round(statistics.median(latencies), 3),
+                "p95_ms": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 3),
+                "model_calls_per_turn": round(calls / (turns + 2), 1),
+            }
+    return results
+
+
+def run(quick: bool = False) -> dict:
+    random.seed(0)
+    repeat, turns = (3, 5) if quick else (5, 20)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "timestamp": time.time()},
+        "tools": bench_tools(repeat),
+        "steps": bench_steps(repeat),
+        "runner": bench_runner(turns),
+    }
+
+
+# Lower is better for these metrics; the others are informational
+TIMED_METRICS = ("us_per_call", "us_per_step", "median_ms", "p95_ms")
+
+
+def _timed(results: dict) -> dict:
+    return {
+        (level, name, metric): value
+        for level in ("tools", "steps", "runner")
+        for name, metrics in results.get(level, {}).items()
+        for metric, value in metrics.items()
+        if metric in TIMED_METRICS
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Returns the metrics that regressed by more than `threshold` (a fraction).
+    Each entry is (level, name, metric, baseline value, current value, relative change).
+    """
+    before, after = _timed(baseline), _timed(current)
+    regressions = []
+    for key in sorted(before.keys() & after.keys()):
+        if before[key] > 0:
+            change = after[key] / before[key] - 1
+            if change > threshold:
+                regressions.append((*key, before[key], after[key], change))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the suite and write JSON results")
+    run_parser.add_argument("--quick", action="store_true", help="Fewer repeats, for CI smoke runs")
+    run_parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline", type=pathlib.Path)
+    compare_parser.add_argument("current", type=pathlib.Path)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        logging.disable(logging.INFO)
+        results = run(args.quick)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        for level in ("tools", "steps", "runner"):
+            print(f"[{level}]")
+            for name, metrics in results[level].items():
+                print(f"    {name:32} " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+        print(f"Results written to {args.output}")
+        return
+
+    regressions = compare(json.loads(args.baseline.read_text()), json.loads(args.current.read_text()), args.threshold)
+    for level, name, metric, before, after, change in regressions:
+        print(f"REGRESSION {level}/{name} {metric}: {before} -> {after} (+{change:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-request cost of preparing tool declarations, with and without the cache.
+
+Every model call adds the declarations of the calling agent's tools to the
+request. This measures that work for each agent in the tree, using ADK's plain
+FunctionTool (introspection on every call) and CachedFunctionTool (a shared,
+prebuilt declaration).
+
+Usage:
+    python -m benchmarks.tool_declarations [--repeat 2000] [--output benchmarks/results/tool_declarations.json]
+"""
+
+import argparse
+import json
+import pathlib
+import time
+
+from google.adk.tools import FunctionTool
+
+from mindponics.agent import build_root_agent
+from mindponics.callbacks import iter_llm_agents
+from mindponics.tool_declarations import CachedFunctionTool
+
+DEFAULT_OUTPUT = pathlib.Path(__file__).parent / "results" / "tool_declarations.json"
+
+
+def _per_request_us(tools: list, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for tool in tools:
+            tool._get_declaration()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def run(repeat: int = 2000) -> dict:
+    results = {}
+    for agent in iter_llm_agents(build_root_agent()):
+        cached = [tool for tool in agent.tools if isinstance(tool, CachedFunctionTool)]
+        if not cached:
+            continue
+        uncached = [FunctionTool(func=tool.func) for tool in cached]
+        for tool in cached:
+            tool._get_declaration()
+        before = _per_request_us(uncached, repeat)
+        after = _per_request_us(cached, repeat)
+        results[agent.name] = {
+            "tools": len(cached),
+            "uncached_us_per_request": round(before, 2),
+            "cached_us_per_request": round(after, 2),
+            "speedup": round(before / after, 1),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"{'agent':20} {'tools':>5} {'uncached us':>12} {'cached us':>10} {'speedup':>8}")
+    for name, r in results.items():
+        print(f"{name:20} {r['tools']:>5} {r['uncached_us_per_request']:>12.1f} "
+              f"{r['cached_us_per_request']:>10.2f} {r['speedup']:>7.0f}x")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
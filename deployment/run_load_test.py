@@ -0,0 +1,227 @@
+"""Concurrent session load test for a deployed or local Mindponics agent.
+
+Opens one session per concurrent worker and replays the user queries of the
+eval dataset at a target request rate. Requests are scheduled open-loop: each
+has a planned send time, and latency and time-to-first-event are measured
+from that time, so a saturated agent shows up as growing latency instead of a
+silently lower request rate. Every concurrency level in --concurrency is run in
+turn to show how throughput and latency change with it.
+
+Modes:
+    local:  InMemoryRunner over root_agent with FakeLlm as the model, with
+            --model_latency_s seconds (plus jitter) per model call.
+    remote: an Agent Engine deployment, through stream_query.
+
+Usage:
+    python deployment/run_load_test.py --mode=local --concurrency=1,4,16 --rate=20 --requests=100
+    python deployment/run_load_test.py --mode=remote --resource_id=... --concurrency=1,4 --rate=2 --requests=20
+"""
+
+import asyncio
+import json
+import math
+import os
+import pathlib
+import time
+
+from absl import app, flags
+
+EVAL_DATA = pathlib.Path(__file__).resolve().parent.parent / "eval" / "data"
+
+FLAGS = flags.FLAGS
+
+
+def define_flags() -> None:
+    """Defines the command-line flags; only when run as a script, so importing the module has no side effects."""
+    flags.DEFINE_enum("mode", "local", ["local", "remote"], "Run against a local InMemoryRunner or a deployed engine.")
+    flags.DEFINE_string("resource_id", None, "ReasoningEngine resource ID, for --mode=remote.")
+    flags.DEFINE_list("concurrency", ["1", "4", "16"], "Concurrent sessions, one load level per value.")
+    flags.DEFINE_float("rate", 10.0, "Target requests per second at every level.")
+    flags.DEFINE_integer("requests", 50, "Requests sent per level.")
+    flags.DEFINE_float("model_latency_s", 0.2, "Stand-in model latency per call, for --mode=local.")
+    flags.DEFINE_float("model_jitter_s", 0.1, "Extra uniform random model latency, for --mode=local.")
+    flags.DEFINE_string("output", None, "Write the report as JSON to this file.")
+
+
+def load_queries(data_dir: pathlib.Path = EVAL_DATA) -> list:
+    """Returns the user turns of every eval case, in file order."""
+    queries = []
+    for path in sorted(data_dir.glob("*.json")):
+        for case in json.loads(path.read_text()).get("eval_cases", []):
+            for turn in case.get("conversation", []):
+                text = " ".join(p.get("text") or "" for p in turn["user_content"].get("parts", [])).strip()
+                if text:
+                    queries.append(text)
+    return queries
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of values, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+class LocalClient:
+    """Sessions and streamed turns on an InMemoryRunner."""
+
+    def __init__(self, root):
+        from google.adk.runners import InMemoryRunner
+
+        self.runner = InMemoryRunner(agent=root, app_name="mindponics-load")
+
+    async def open_session(self, user_id: str) -> str:
+        session = await self.runner.session_service.create_session(app_name=self.runner.app_name, user_id=user_id)
+        return session.id
+
+    async def stream(self, user_id: str, session_id: str, text: str):
+        from google.genai import types
+
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            yield event
+
+    async def close_session(self, user_id: str, session_id: str) -> None:
+        await self.runner.session_service.delete_session(
+            app_name=self.runner.app_name, user_id=user_id, session_id=session_id)
+
+
+class RemoteClient:
+    """Sessions and streamed turns on an Agent Engine deployment; its blocking calls run in threads."""
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    async def open_session(self, user_id: str) -> str:
+        session = await asyncio.to_thread(self.agent.create_session, user_id=user_id)
+        return session["id"]
+
+    async def stream(self, user_id: str, session_id: str, text: str):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        done = object()
+
+        def pump():
+            try:
+                for event in self.agent.stream_query(user_id=user_id, session_id=session_id, message=text):
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(events.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, done)
+
+        worker = loop.run_in_executor(None, pump)
+        while True:
+            event = await events.get()
+            if event is done:
+                break
+            if isinstance(event, Exception):
+                raise event
+            yield event
+        await worker
+
+    async def close_session(self, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self.agent.delete_session, user_id=user_id, session_id=session_id)
+
+
+async def run_level(client, queries: list, concurrency: int, rate: float, requests: int) -> dict:
+    """
+    Sends `requests` queries at `rate` per second over `concurrency` sessions.
+
+    Returns:
+        Throughput, error count and p50/p95/p99 of latency, time-to-first-event and queue wait
+    """
+    users = [f"load-{concurrency}-{i}" for i in range(concurrency)]
+    sessions = await asyncio.gather(*(client.open_session(user) for user in users))
+    idle = asyncio.Queue()
+    for worker in zip(users, sessions):
+        idle.put_nowait(worker)
+    latency, ttfe, queue_wait, errors = [], [], [], 0
+
+    async def send(i: int, planned: float) -> None:
+        nonlocal errors
+        user_id, session_id = await idle.get()
+        started = time.perf_counter()
+        queue_wait.append(started - planned)
+        first = None
+        try:
+            async for _ in client.stream(user_id, session_id, queries[i % len(queries)]):
+                if first is None:
+                    first = time.perf_counter()
+            latency.append(time.perf_counter() - planned)
+            ttfe.append((first or time.perf_counter()) - planned)
+        except Exception as e:
+            errors += 1
+            print(f"[LoadTest] Request {i} failed: {e}")
+        finally:
+            idle.put_nowait((user_id, session_id))
+
+    begin = time.perf_counter()
+    tasks = []
+    for i in range(requests):
+        planned = begin + i / rate
+        await asyncio.sleep(max(planned - time.perf_counter(), 0))
+        tasks.append(asyncio.create_task(send(i, planned)))
+    await asyncio.gather(*tasks)
+    wall_s = time.perf_counter() - begin
+    await asyncio.gather(*(client.close_session(user, session) for user, session in zip(users, sessions)))
+
+    ms = lambda values, q: round(percentile(values, q) * 1000, 1)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "target_rps": rate,
+        "throughput_rps": round(len(latency) / wall_s, 2),
+        **{f"latency_p{q}_ms": ms(latency, q) for q in (50, 95, 99)},
+        **{f"ttfe_p{q}_ms": ms(ttfe, q) for q in (50, 95, 99)},
+        "queue_wait_p95_ms": ms(queue_wait, 95),
+    }
+
+
+def _client():
+    if FLAGS.mode == "local":
+        from mindponics.agent import build_root_agent
+        from mindponics.fake_llm import install_fake_llm
+
+        root = build_root_agent()
+        install_fake_llm(root, latency_s=FLAGS.model_latency_s, latency_jitter_s=FLAGS.model_jitter_s)
+        return LocalClient(root)
+
+    import vertexai
+    from vertexai import agent_engines
+
+    if not FLAGS.resource_id:
+        raise app.UsageError("--resource_id is required for --mode=remote")
+    vertexai.init(project=os.getenv("GOOGLE_CLOUD_PROJECT"), location=os.getenv("GOOGLE_CLOUD_LOCATION"))
+    return RemoteClient(agent_engines.get(FLAGS.resource_id))
+
+
+def main(argv: list[str]) -> None:
+    del argv  # unused
+    import logging
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.disable(logging.INFO)
+    client = _client()
+    queries = load_queries()
+    print(f"Mode {FLAGS.mode}, {len(queries)} queries, {FLAGS.rate} req/s target, {FLAGS.requests} requests per level")
+    print(f"{'conc':>5} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'ttfe p50':>9} {'ttfe p95':>9} {'errors':>6}")
+    report = []
+    for concurrency in (int(c) for c in FLAGS.concurrency):
+        level = asyncio.run(run_level(client, queries, concurrency, FLAGS.rate, FLAGS.requests))
+        report.append(level)
+        print(f"{level['concurrency']:>5} {level['throughput_rps']:>7} {level['latency_p50_ms']:>8} "
+              f"{level['latency_p95_ms']:>8} {level['latency_p99_ms']:>8} {level['ttfe_p50_ms']:>9} "
+              f"{level['ttfe_p95_ms']:>9} {level['errors']:>6}")
+    if FLAGS.output:
+        pathlib.Path(FLAGS.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {FLAGS.output}")
+
+
+if __name__ == "__main__":
+    define_flags()
+    app.run(main)
@@ -0,0 +1,284 @@
+"""Parallel, cached evaluation runner for the eval sets in eval/data.
+
+AgentEvaluator.evaluate runs every case and repetition one after another.
+This runner plays the cases and their repetitions concurrently, up to
+--concurrency at a time, against root_agent through InMemoryRunner, and scores
+them locally with AgentEvaluator's default metrics: tool trajectory exact
+match and ROUGE-1 response match (computed here without stemming).
+
+Each run's output (responses, tool calls, latency and tokens) is cached under
+eval/.cache, keyed by a hash of the case's prompts and initial state, the
+model, the agent graph (instructions, tools and callbacks of every agent) and
+the repetition. Unchanged cases are served from the cache; the scores are
+always recomputed, so editing an expected response needs no new model calls.
+
+The report lists, per case, the scores next to the mean turn latency, the p95
+turn latency and the prompt and completion tokens, so every prompt change
+shows its performance cost as well as its quality.
+
+Usage:
+    python -m eval.runner [--data eval/data] [--num-runs 5] [--concurrency 4] [--fake] [--no-cache]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import pathlib
+import re
+import statistics
+import sys
+import time
+
+EVAL_DIR = pathlib.Path(__file__).parent
+DEFAULT_DATA = EVAL_DIR / "data"
+DEFAULT_CACHE = EVAL_DIR / ".cache"
+DEFAULT_OUTPUT = EVAL_DIR / "results"
+DEFAULT_CONCURRENCY = 4
+# Same defaults as AgentEvaluator when an eval set has no test_config.json
+DEFAULT_CRITERIA = {"tool_trajectory_avg_score": 1.0, "response_match_score": 0.8}
+
+# Token usage of the run the current task belongs to, across the root agent and its specialists
+_run_usage = contextvars.ContextVar("mindponics_eval_usage", default=None)
+
+
+def _count_tokens(callback_context, llm_response):
+    usage = _run_usage.get()
+    if usage is not None and not llm_response.partial and llm_response.usage_metadata is not None:
+        usage["prompt_tokens"] += llm_response.usage_metadata.prompt_token_count or 0
+        usage["completion_tokens"] += llm_response.usage_metadata.candidates_token_count or 0
+        usage["model_calls"] += 1
+    return None
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def agent_graph_hash(root) -> str:
+    """Hashes what shapes the agents' behaviour: models, instructions, tool declarations and callbacks."""
+    from mindponics.callbacks import CALLBACK_SLOTS, iter_llm_agents
+
+    def callbacks(agent, slot):
+        current = getattr(agent, slot) or []
+        return [getattr(c, "__qualname__", repr(c)) for c in (current if isinstance(current, list) else [current])]
+
+    graph = []
+    for agent in iter_llm_agents(root):
+        declarations = []
+        for tool in agent.tools:
+            declaration = tool._get_declaration() if hasattr(tool, "_get_declaration") else None
+            declarations.append(declaration.model_dump(exclude_none=True) if declaration else getattr(tool, "name", repr(tool)))
+        graph.append({
+            "name": agent.name,
+            "model": agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", ""),
+            "instruction": agent.instruction if isinstance(agent.instruction, str) else repr(agent.instruction),
+            "description": agent.description,
+            "output_key": agent.output_key,
+            "config": agent.generate_content_config.model_dump(exclude_none=True) if agent.generate_content_config else None,
+            "tools": declarations,
+            "callbacks": {slot: callbacks(agent, slot) for slot in CALLBACK_SLOTS},
+        })
+    return _digest(graph)[:16]
+
+
+def model_id(root) -> str:
+    """Names the models a run depends on, including the tiers the router picks from."""
+    from mindponics.callbacks import iter_llm_agents
+    from mindponics.routing import model_router, routing_enabled
+
+    models = {agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", "") for agent in iter_llm_agents(root)}
+    if routing_enabled():
+        models |= set(model_router.tiers.values())
+    return ",".join(sorted(models))
+
+
+def load_eval_set(path: pathlib.Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def load_criteria(data_dir: pathlib.Path) -> dict:
+    config = data_dir / "test_config.json"
+    return json.loads(config.read_text()).get("criteria", DEFAULT_CRITERIA) if config.exists() else dict(DEFAULT_CRITERIA)
+
+
+def _text(content) -> str:
+    return " ".join(part.get("text") or "" for part in (content or {}).get("parts") or []).strip()
+
+
+def _expected_tools(turn: dict) -> list:
+    uses = (turn.get("intermediate_data") or {}).get("tool_uses") or []
+    return [use.get("name") or use.get("tool_name") for use in uses]
+
+
+def _tokens(text: str) -> list:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def rouge1_f(reference: str, candidate: str) -> float:
+    """Unigram-overlap F1 between two texts (ROUGE-1 F-measure without stemming)."""
+    ref, cand = _tokens(reference), _tokens(candidate)
+    if not ref or not cand:
+        return float(ref == cand)
+    counts = {}
+    for token in ref:
+        counts[token] = counts.get(token, 0) + 1
+    overlap = 0
+    for token in cand:
+        if counts.get(token, 0) > 0:
+            counts[token] -= 1
+            overlap += 1
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / len(cand), overlap / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def case_key(case: dict, model: str, graph: str, run: int) -> str:
+    """Cache key: the case's prompts and initial state (not its expectations), the model, the graph and the repetition."""
+    prompts = [_text(turn.get("user_content")) for turn in case.get("conversation", [])]
+    session = case.get("session_input") or {}
+    return _digest({"prompts": prompts, "state": session.get("state") or {}, "model": model, "graph": graph, "run": run})
+
+
+async def _play(runner, case: dict) -> dict:
+    """Plays one case's conversation in a fresh session and returns what the agent did."""
+    from google.genai import types
+
+    session_input = case.get("session_input") or {}
+    user_id = session_input.get("user_id", "eval")
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, state=session_input.get("state") or {})
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "model_calls": 0}
+    _run_usage.set(usage)
+    turns = []
+    for turn in case.get("conversation", []):
+        message = types.Content(role="user", parts=[types.Part(text=_text(turn.get("user_content")))])
+        started = time.perf_counter()
+        response, tools = "", []
+        async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            for part in (event.content.parts or []) if event.content else []:
+                if part.function_call:
+                    tools.append(part.function_call.name)
+            if event.is_final_response() and event.content and event.content.parts:
+                response = "".join(part.text or "" for part in event.content.parts)
+        turns.append({"response": response, "tools": tools, "latency_s": time.perf_counter() - started})
+    return {"turns": turns, **usage}
+
+
+def score(case: dict, output: dict) -> dict:
+    """Scores one run of a case against its expected responses and tool trajectories."""
+    expected = case.get("conversation", [])
+    pairs = list(zip(expected, output["turns"]))
+    return {
+        "tool_trajectory_avg_score": statistics.mean(float(_expected_tools(e) == o["tools"]) for e, o in pairs),
+        "response_match_score": statistics.mean(rouge1_f(_text(e.get("final_response")), o["response"]) for e, o in pairs),
+    }
+
+
+async def evaluate(root, eval_set: dict, num_runs: int = 5, concurrency: int = DEFAULT_CONCURRENCY,
+                   cache_dir: pathlib.Path = DEFAULT_CACHE, use_cache: bool = True, criteria: dict = None) -> dict:
+    """
+    Runs every case of an eval set num_runs times, at most `concurrency` runs at once.
+
+    Args:
+        root: Agent to evaluate
+        eval_set: Parsed eval set (eval_set_id, eval_cases)
+        num_runs: Repetitions per case
+        concurrency: Maximum runs in flight
+        cache_dir: Directory of cached run outputs
+        use_cache: Whether to read cached outputs (new outputs are always written)
+        criteria: Metric -> minimum average score for a case to pass
+
+    Returns:
+        Report with per-case scores, latency, tokens and cache hits
+    """
+    from google.adk.runners import InMemoryRunner
+
+    from mindponics.callbacks import add_callbacks, iter_llm_agents
+
+    criteria = criteria or DEFAULT_CRITERIA
+    for agent in iter_llm_agents(root):
+        add_callbacks(agent, prepend=True, after_model_callback=_count_tokens)
+    graph, model = agent_graph_hash(root), model_id(root)
+    runner = InMemoryRunner(agent=root, app_name="mindponics_eval")
+    semaphore = asyncio.Semaphore(concurrency)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    async def run_once(case: dict, run: int) -> tuple:
+        path = cache_dir / f"{case_key(case, model, graph, run)}.json"
+        if use_cache and path.exists():
+            return json.loads(path.read_text()), True
+        async with semaphore:
+            output = await _play(runner, case)
+        path.write_text(json.dumps(output))
+        return output, False
+
+    cases = eval_set.get("eval_cases", [])
+    started = time.perf_counter()
+    # gather runs each coroutine in its own task, so each run counts its tokens in its own context
+    results = await asyncio.gather(*(run_once(case, run) for case in cases for run in range(num_runs)))
+    wall_s = time.perf_counter() - started
+
+    report = {"eval_set_id": eval_set.get("eval_set_id"), "model": model, "agent_graph": graph,
+              "num_runs": num_runs, "concurrency": concurrency, "wall_s": round(wall_s, 3), "cases": {}}
+    for i, case in enumerate(cases):
+        runs = results[i * num_runs:(i + 1) * num_runs]
+        scores = [score(case, output) for output, _ in runs]
+        latencies = sorted(turn["latency_s"] for output, _ in runs for turn in output["turns"])
+        averages = {metric: round(statistics.mean(s[metric] for s in scores), 4) for metric in scores[0]} if scores else {}
+        report["cases"][case["eval_id"]] = {
+            "scores": averages,
+            "passed": all(averages.get(metric, 0.0) >= threshold for metric, threshold in criteria.items()),
+            "mean_turn_latency_s": round(statistics.mean(latencies), 4) if latencies else 0.0,
+            "p95_turn_latency_s": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 4) if latencies else 0.0,
+            "prompt_tokens": round(statistics.mean(output["prompt_tokens"] for output, _ in runs), 1),
+            "completion_tokens": round(statistics.mean(output["completion_tokens"] for output, _ in runs), 1),
+            "model_calls": round(statistics.mean(output["model_calls"] for output, _ in runs), 1),
+            "cached_runs": sum(cached for _, cached in runs),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=pathlib.Path, default=DEFAULT_DATA, help="Directory of *.json eval sets")
+    parser.add_argument("--num-runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--fake", action="store_true", help="Use FakeLlm instead of Gemini (offline smoke run)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached run outputs")
+    parser.add_argument("--cache", type=pathlib.Path, default=DEFAULT_CACHE)
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    import dotenv
+
+    from mindponics.agent import build_root_agent
+    from mindponics.fake_llm import install_fake_llm
+
+    dotenv.load_dotenv()
+    logging.disable(logging.INFO)
+    root = build_root_agent()
+    if args.fake:
+        install_fake_llm(root)
+    criteria = load_criteria(args.data)
+    failed = False
+    args.output.mkdir(parents=True, exist_ok=True)
+    for path in sorted(p for p in args.data.glob("*.json") if p.name != "test_config.json"):
+        report = asyncio.run(evaluate(root, load_eval_set(path), args.num_runs, args.concurrency,
+                                      args.cache, not args.no_cache, criteria))
+        (args.output / path.name).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"{report['eval_set_id']}: {report['wall_s']}s, graph {report['agent_graph']}")
+        for case_id, r in report["cases"].items():
+            scores = " ".join(f"{k}={v}" for k, v in r["scores"].items())
+            print(f"    {'PASS' if r['passed'] else 'FAIL'} {case_id:32} {scores} latency={r['mean_turn_latency_s']}s "
+                  f"p95={r['p95_turn_latency_s']}s tokens={r['prompt_tokens']}+{r['completion_tokens']} "
+                  f"cached={r['cached_runs']}/{args.num_runs}")
+            failed = failed or not r["passed"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
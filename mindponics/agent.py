@@ -1,46 +1,116 @@
-"""Top-level agent definition for the Mindponics aquaponics system."""
+"""Top-level agent definition for the Mindponics aquaponics system.
 
-from google.adk.agents import LlmAgent  
-from google.adk.tools.agent_tool import AgentTool
+The agent tree is built on first access to `root_agent`, so importing this
+module does not pull in google.adk or the sub-agent knowledge bases. CLIs,
+deployment tooling and test collection only pay for what they use.
+"""
+
+import functools
+import os
 
 from . import prompt
-from .sub_agents.water import WaterQualityAgent
-from .sub_agents.fish import FishHealthAgent
-from .sub_agents.plant import PlantGrowthAgent
-from .sub_agents.bacteria import BacteriaAgent
-from .sub_agents.environment import EnvironmentAgent
 
 MODEL = "gemini-2.5-pro"
 
-water_agent_instance = WaterQualityAgent(name="HydroGuardian")
-fish_agent_instance = FishHealthAgent(name="PiscinePro", orchestrator_id="orchestrator")
-plant_agent_instance = PlantGrowthAgent(name="FloraFriend", orchestrator_id="orchestrator")
-environment_agent_instance = EnvironmentAgent(name="ClimateController", orchestrator_id="orchestrator", target_temp=25.0, target_humidity=65.0)
-
-orchestrator = LlmAgent(
-    name="AquaMaestro",
-    model=MODEL,
-    description=(
-        "A central orchestrator AI for aquaponic system management. "
-        "It routes user queries and coordinates specialist agents."
-        "It manages water quality, fish health, plant growth, bacteria levels, and environmental conditions. "
-        "It provides a unified interface for monitoring and controlling the aquaponic system. "
-        "It can also provide insights and recommendations based on the data collected from the system. "
-        "It is designed to be user-friendly and efficient, "
-        "allowing users to easily manage their aquaponic systems. "
-        "It can also provide insights and recommendations based on the data collected from the system. "
-        "It is designed to be user-friendly and efficient, "
-        "allowing users to easily manage their aquaponic systems. "
-    ),
-    instruction=prompt.MINDPONICS_PROMPT,
-    output_key="mindponics_output",
-    tools=[
-        AgentTool(agent=water_agent_instance),
-        AgentTool(agent=fish_agent_instance),
-        AgentTool(agent=plant_agent_instance),
-        AgentTool(agent=BacteriaAgent),
-        AgentTool(agent=environment_agent_instance),
-    ],
+ORCHESTRATOR_DESCRIPTION = (
+    "A central orchestrator AI for aquaponic system management. "
+    "It routes user queries and coordinates specialist agents. "
+    "It manages water quality, fish health, plant growth, bacteria levels, and environmental conditions. "
+    "It provides a unified interface for monitoring and controlling the aquaponic system, "
+    "with insights and recommendations based on the data collected from the system."
 )
 
-root_agent = orchestrator
+
+@functools.lru_cache(maxsize=None)
+def build_root_agent():
+    """
+    Builds the orchestrator, its specialist sub-agents and their tools once.
+
+    Returns:
+        The root agent served by the ADK runner
+    """
+    from google.adk.agents import LlmAgent
+    from google.adk.tools.agent_tool import AgentTool
+
+    from .compact import compact_mode_enabled, compact_tool_results
+    from .compatibility import SpeciesCompatibilityTool
+    from .context_budget import context_budget, context_budget_enabled
+    from .hedging import HedgedAgentTool, hedging_enabled
+    from .ingestion import start_from_env as start_ingestion_gateway
+    from .prefetch import prefetch_enabled, session_prefetcher
+    from .progressive import ProgressiveOrchestrator, progressive_mode_enabled
+    from .routing import model_router, routing_enabled
+    from .scheduler import model_scheduler, scheduler_enabled
+    from .state_compaction import state_compaction_enabled, state_compactor
+    from .telemetry import telemetry, telemetry_enabled
+    from .tool_declarations import warm_declarations
+    from utils.sensor_acquisition import start_from_env as start_sensor_acquisition
+    from .sub_agents.water import WaterQualityAgent
+    from .sub_agents.fish import FishHealthAgent
+    from .sub_agents.plant import PlantGrowthAgent
+    from .sub_agents.bacteria import BacteriaAgent
+    from .sub_agents.environment import EnvironmentAgent
+
+    water_agent_instance = WaterQualityAgent(name="HydroGuardian")
+    fish_agent_instance = FishHealthAgent(name="PiscinePro", orchestrator_id="orchestrator")
+    plant_agent_instance = PlantGrowthAgent(name="FloraFriend", orchestrator_id="orchestrator")
+    environment_agent_instance = EnvironmentAgent(name="ClimateController", orchestrator_id="orchestrator", target_temp=25.0, target_humidity=65.0)
+
+    # Hedge slow delegations on the fast tier and fall back to tool output at the deadline
+    delegate = HedgedAgentTool if hedging_enabled() else AgentTool
+
+    orchestrator = LlmAgent(
+        name="AquaMaestro",
+        model=MODEL,
+        description=ORCHESTRATOR_DESCRIPTION,
+        instruction=prompt.MINDPONICS_PROMPT,
+        output_key="mindponics_output",
+        tools=[
+            delegate(agent=water_agent_instance),
+            delegate(agent=fish_agent_instance),
+            delegate(agent=plant_agent_instance),
+            delegate(agent=BacteriaAgent),
+            delegate(agent=environment_agent_instance),
+            SpeciesCompatibilityTool,
+        ],
+    )
+
+    if routing_enabled():
+        # Pick the fast or pro model per request for the orchestrator and every specialist
+        model_router.install(orchestrator)
+    if context_budget_enabled():
+        # Keep prompts, tool payloads and stored agent outputs within the token budget
+        context_budget.install(orchestrator)
+    if state_compaction_enabled():
+        # Fold replaced agent outputs into summaries and cap the size of each state key
+        state_compactor.install(orchestrator)
+    if compact_mode_enabled():
+        compact_tool_results.install(orchestrator)
+    if prefetch_enabled():
+        # Read sensors and run diagnoses while the first model call is in flight
+        session_prefetcher.install(orchestrator)
+    # Poll the configured probes and accept pushed readings in the background; tools read the latest snapshot
+    start_sensor_acquisition()
+    start_ingestion_gateway()
+    # Introspect every tool function now rather than on the first requests
+    warm_declarations(orchestrator)
+    if scheduler_enabled():
+        # Coalesce identical requests and queue bursts per model, critical turns first
+        model_scheduler.install(orchestrator)
+    if telemetry_enabled():
+        # Installed last so its observers run first and time the other callbacks too
+        telemetry.install(orchestrator)
+        if os.getenv("MINDPONICS_TELEMETRY_DIR"):
+            telemetry.start_file_exporter(
+                os.environ["MINDPONICS_TELEMETRY_DIR"], float(os.getenv("MINDPONICS_TELEMETRY_INTERVAL_S", "60"))
+            )
+
+    # Stream each specialist's section to the client before the final synthesis
+    return ProgressiveOrchestrator(orchestrator) if progressive_mode_enabled() else orchestrator
+
+
+def __getattr__(name):
+    # `from mindponics.agent import root_agent` and ADK's agent loader both land here
+    if name == "root_agent":
+        return build_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
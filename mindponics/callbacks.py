@@ -0,0 +1,47 @@
+"""Helpers for attaching callbacks to every LlmAgent in the Mindponics agent tree."""
+
+from google.adk.agents import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+
+CALLBACK_SLOTS = (
+    "before_agent_callback",
+    "after_agent_callback",
+    "before_model_callback",
+    "after_model_callback",
+    "on_model_error_callback",
+    "before_tool_callback",
+    "after_tool_callback",
+)
+
+
+def iter_llm_agents(root) -> list:
+    """Returns root and every LlmAgent reachable through sub_agents or AgentTools, once each."""
+    seen, stack, agents = set(), [root], []
+    while stack:
+        agent = stack.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        if isinstance(agent, LlmAgent):
+            agents.append(agent)
+            stack.extend(tool.agent for tool in agent.tools if isinstance(tool, AgentTool))
+        stack.extend(getattr(agent, "sub_agents", []))
+    return agents
+
+
+def add_callbacks(agent, prepend: bool = False, **callbacks) -> None:
+    """
+    Appends callbacks to an agent's callback slots, keeping any already set.
+    ADK stops at the first callback in a slot that returns a value, so observers
+    should return None and be prepended to run ahead of callbacks that replace results.
+    """
+    for slot, callback in callbacks.items():
+        if slot not in CALLBACK_SLOTS:
+            raise ValueError(f"Unknown callback slot: {slot}")
+        current = getattr(agent, slot)
+        if current is None:
+            current = []
+        elif not isinstance(current, list):
+            current = [current]
+        if callback not in current:
+            setattr(agent, slot, [callback] + current if prepend else current + [callback])
@@ -0,0 +1,157 @@
+"""Compact serialization of tool results to cut LLM input tokens.
+
+In compact mode every FunctionTool result is rewritten before it reaches the
+model: empty values, fields that only echo the call arguments and fields listed
+as redundant for the tool are dropped, floats are rounded to sensor precision,
+and well-known keys are shortened. Before each model call, a legend covering
+only the short keys present in that request's tool results is appended to the
+system instruction, so the model can read them without paying for the full table.
+
+Enable it with MINDPONICS_COMPACT_TOOL_RESULTS=true.
+"""
+
+import logging
+import os
+
+from google.adk.tools import FunctionTool
+
+from .context_budget import estimate_tokens
+
+# Long key -> short key; data keys such as parameter names are kept as they are
+KEY_LEGEND = {
+    "parameters": "P", "parameter": "p", "value": "v", "issues": "I", "issue": "is",
+    "severity": "sv", "priority": "pr", "status": "st", "diagnosis": "dx", "actions": "A",
+    "recommendation": "rec", "treatment": "tx", "symptom": "sy", "symptoms": "SY",
+    "disease": "dz", "matches": "M", "scientific_name": "sci", "optimal_temp": "oT",
+    "optimal_ph": "oPH", "feeding_rate": "fr", "life_stages": "LS", "life_stage": "ls",
+    "feed_multiplier": "fm", "temp_adjustment": "ta", "light_hours": "lh",
+    "light_multiplier": "lm", "nutrient_adjust": "na", "nutrient_needs": "nn",
+    "nutrient_ranges": "nr", "nutrient_levels": "nl", "deficiencies": "D", "cause": "cz",
+    "forecasts": "F", "forecast_at_horizon": "fh", "trend_per_hour": "tr",
+    "hours_to_threshold": "eta", "threshold": "th", "crosses": "x",
+    "hours_to_warning": "etaW", "hours_to_critical": "etaC", "horizon_hours": "hh",
+    "current": "cur", "compatible": "C", "partner": "pt", "partner_life_stage": "pls",
+    "shared_temp": "sT", "shared_ph": "sPH", "score": "sc", "total_weight_kg": "wkg",
+    "daily_feed_kg": "fkg", "species": "sp", "tank_id": "tk", "upcoming_issues": "UI",
+}
+
+# Decimal places matching the sensors' reporting precision
+SENSOR_PRECISION = {
+    "ph": 1, "ammonia": 2, "nitrite": 2, "nitrate": 1, "temperature": 1,
+    "dissolved_oxygen": 1, "humidity": 1, "light_level": 0,
+}
+DEFAULT_PRECISION = 3
+
+# Fields that add nothing once the tool has applied them
+REDUNDANT_FIELDS = {
+    "get_fish_species_info": ("life_stages",),
+    "get_plant_species_info": ("life_stages",),
+}
+
+_LONG_KEYS = {short: long for long, short in KEY_LEGEND.items()}
+assert len(_LONG_KEYS) == len(KEY_LEGEND) and not _LONG_KEYS.keys() & KEY_LEGEND.keys(), "ambiguous compact keys"
+
+
+def compact_legend(short_keys) -> str:
+    """Returns the legend for the given short keys, or "" when there are none."""
+    keys = [key for key in _LONG_KEYS if key in short_keys]
+    if not keys:
+        return ""
+    return (
+        "Tool results use compact keys: " + ", ".join(f"{key}={_LONG_KEYS[key]}" for key in keys)
+        + ". Empty fields and values echoing your call arguments are omitted."
+    )
+
+
+def short_keys_in(value, found: set = None) -> set:
+    """Collects the compact keys used anywhere in a compacted value."""
+    found = set() if found is None else found
+    if isinstance(value, dict):
+        found.update(key for key in value if key in _LONG_KEYS)
+        for v in value.values():
+            short_keys_in(v, found)
+    elif isinstance(value, list):
+        for v in value:
+            short_keys_in(v, found)
+    return found
+
+
+def _round(value: float, key: str):
+    digits = SENSOR_PRECISION.get(key, DEFAULT_PRECISION)
+    rounded = round(value, digits)
+    return int(rounded) if digits == 0 else rounded
+
+
+def compact_value(value, key: str = "", shorten: bool = True):
+    """Recursively drops empty values, rounds floats and, if shorten is set, shortens known keys."""
+    if isinstance(value, float):
+        return _round(value, key)
+    if isinstance(value, dict):
+        result = {}
+        for k, v in value.items():
+            v = compact_value(v, k, shorten)
+            if v is None or v == "" or v == [] or v == {}:
+                continue
+            result[KEY_LEGEND.get(k, k) if shorten else k] = v
+        return result
+    if isinstance(value, (list, tuple)):
+        return [compact_value(v, key, shorten) for v in value]
+    return value
+
+
+def compact_tool_result(tool_name: str, args: dict, result, shorten: bool = None):
+    """
+    Returns the compact form of a tool result for a call with the given args.
+
+    Args:
+        shorten: Whether to shorten keys. By default keys are shortened only when
+            the saving outweighs the legend the short keys add to the prompt
+    """
+    if isinstance(result, dict):
+        echoed = {k for k, v in result.items() if k in args and args[k] == v}
+        redundant = set(REDUNDANT_FIELDS.get(tool_name, ()))
+        result = {k: v for k, v in result.items() if k not in echoed | redundant}
+    if shorten is not None:
+        return compact_value(result, shorten=shorten)
+    short, long = compact_value(result), compact_value(result, shorten=False)
+    short_cost = estimate_tokens(short) + estimate_tokens(compact_legend(short_keys_in(short)))
+    return short if short_cost < estimate_tokens(long) else long
+
+
+def compact_mode_enabled() -> bool:
+    return os.getenv("MINDPONICS_COMPACT_TOOL_RESULTS", "false").lower() in ("1", "true", "yes")
+
+
+class CompactToolResults:
+    """Installs compact tool-result serialization on an agent tree."""
+
+    def install(self, root) -> None:
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        for agent in iter_llm_agents(root):
+            if not any(isinstance(tool, FunctionTool) for tool in agent.tools):
+                continue
+            add_callbacks(agent, before_model_callback=self.before_model, after_tool_callback=self.after_tool)
+        logging.info("[CompactToolResults] Compact tool results enabled")
+
+    def before_model(self, callback_context, llm_request):
+        # Explain only the short keys this request's tool results actually use
+        found = set()
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                if part.function_response:
+                    short_keys_in(part.function_response.response, found)
+        legend = compact_legend(found)
+        config = llm_request.config
+        if legend and config is not None and isinstance(config.system_instruction, (str, type(None))):
+            config.system_instruction = f"{config.system_instruction or ''}\n\n{legend}".lstrip()
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        # AgentTool results are free text and stay untouched
+        if not isinstance(tool, FunctionTool):
+            return None
+        return compact_tool_result(tool.name, args, tool_response)
+
+
+compact_tool_results = CompactToolResults()
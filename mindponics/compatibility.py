@@ -0,0 +1,207 @@
+"""Fish-plant compatibility index over species temperature and pH ranges."""
+
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from .sub_agents.fish.agent import FISH_DATABASE
+from .sub_agents.plant.agent import PLANT_DATABASE
+from .tool_declarations import CachedFunctionTool
+
+
+def _overlap_fraction(a: tuple, b: tuple) -> float:
+    """
+    Shared width of two ranges relative to the narrower one. Ranges that are
+    disjoint or only touch at an end point score 0.
+    """
+    shared = min(a[1], b[1]) - max(a[0], b[0])
+    narrower = min(a[1] - a[0], b[1] - b[0])
+    if shared < 0 or (shared == 0 and narrower > 0):
+        return 0.0
+    return 1.0 if narrower <= 0 else min(shared / narrower, 1.0)
+
+
+class _Node:
+    __slots__ = ("center", "by_low", "by_high", "left", "right")
+
+    def __init__(self, center, by_low, by_high, left, right):
+        self.center, self.by_low, self.by_high, self.left, self.right = center, by_low, by_high, left, right
+
+
+class IntervalIndex:
+    """
+    Static centered interval tree over closed intervals.
+    Counting overlaps with a query range takes two binary searches; listing them
+    takes O(log n + k) for k overlapping intervals.
+    """
+
+    def __init__(self, intervals: list):
+        self._intervals = list(intervals)
+        lows = sorted(low for low, _ in self._intervals)
+        highs = sorted(high for _, high in self._intervals)
+        self._lows, self._highs = lows, highs
+        self._root = self._build(list(range(len(self._intervals))))
+
+    def _build(self, ids: list):
+        if not ids:
+            return None
+        points = sorted(p for i in ids for p in self._intervals[i])
+        center = points[len(points) // 2]
+        here = [i for i in ids if self._intervals[i][0] <= center <= self._intervals[i][1]]
+        left = [i for i in ids if self._intervals[i][1] < center]
+        right = [i for i in ids if self._intervals[i][0] > center]
+        return _Node(
+            center,
+            sorted(here, key=lambda i: self._intervals[i][0]),
+            sorted(here, key=lambda i: -self._intervals[i][1]),
+            self._build(left),
+            self._build(right),
+        )
+
+    def count(self, low: float, high: float) -> int:
+        # Intervals ending before `low` are a subset of those starting at or before `high`
+        return bisect_right(self._lows, high) - bisect_left(self._highs, low)
+
+    def overlapping(self, low: float, high: float) -> list:
+        result, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if high < node.center:
+                # Every interval here reaches the center, so only its start can miss the query
+                for i in node.by_low:
+                    if self._intervals[i][0] > high:
+                        break
+                    result.append(i)
+                stack.append(node.left)
+            elif low > node.center:
+                for i in node.by_high:
+                    if self._intervals[i][1] < low:
+                        break
+                    result.append(i)
+                stack.append(node.right)
+            else:
+                result.extend(node.by_low)
+                stack.extend((node.left, node.right))
+        return result
+
+
+class CompatibilityIndex:
+    """
+    Temperature and pH interval indexes over every fish life stage and plant species.
+    A query costs O(log n + k_temp + k_ph), where k are the entries overlapping each range.
+    """
+
+    def __init__(self, fish_database: dict, plant_database: dict):
+        self.entries = []
+        for species, info in fish_database.items():
+            for life_stage, stage_info in info.get("life_stages", {"": {}}).items():
+                temp_adjust = stage_info.get("temp_adjustment", 0)
+                self.entries.append({
+                    "kind": "fish",
+                    "species": species,
+                    "life_stage": life_stage,
+                    "optimal_temp": (info["optimal_temp"][0] + temp_adjust, info["optimal_temp"][1] + temp_adjust),
+                    "optimal_ph": tuple(info["optimal_ph"]),
+                })
+        for species, info in plant_database.items():
+            self.entries.append({
+                "kind": "plant",
+                "species": species,
+                "life_stage": "",
+                "optimal_temp": tuple(info["optimal_temp"]),
+                "optimal_ph": tuple(info["optimal_ph"]),
+            })
+
+        self._temp = {}
+        self._ph = {}
+        self._ids = {}
+        for kind in ("fish", "plant"):
+            ids = [i for i, entry in enumerate(self.entries) if entry["kind"] == kind]
+            self._ids[kind] = ids
+            self._temp[kind] = IntervalIndex([self.entries[i]["optimal_temp"] for i in ids])
+            self._ph[kind] = IntervalIndex([self.entries[i]["optimal_ph"] for i in ids])
+
+    def lookup(self, species: str, life_stage: str = "") -> list:
+        """Returns the catalog entries for a species, optionally narrowed to one life stage."""
+        matches = [e for e in self.entries if e["species"] == species.lower()]
+        if life_stage:
+            matches = [e for e in matches if e["life_stage"] in (life_stage, "")]
+        return matches
+
+    def query(self, kind: str, temp_range: tuple, ph_range: tuple) -> list:
+        """
+        Finds entries of one kind ("fish" or "plant") overlapping the given ranges.
+        Returns (score, entry) pairs sorted by descending compatibility score.
+        """
+        results = []
+        ph_matches = set(self._ph[kind].overlapping(*ph_range))
+        for i in self._temp[kind].overlapping(*temp_range):
+            if i not in ph_matches:
+                continue
+            entry = self.entries[self._ids[kind][i]]
+            score = _overlap_fraction(temp_range, entry["optimal_temp"]) * _overlap_fraction(ph_range, entry["optimal_ph"])
+            # Ranges that only touch at an end point share no usable conditions
+            if score > 0:
+                results.append((score, entry))
+        results.sort(key=lambda item: (-item[0], item[1]["species"], item[1]["life_stage"]))
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_compatibility_index() -> CompatibilityIndex:
+    """Builds the catalog index once and reuses it for every query."""
+    return CompatibilityIndex(FISH_DATABASE, PLANT_DATABASE)
+
+
+def find_compatible_species(species: str, life_stage: str = "", min_score: float = 0.0) -> dict:
+    """
+    Finds which plants can be grown with a fish species, or which fish suit a plant,
+    based on overlapping optimal temperature and pH ranges.
+
+    Args:
+        species: Common name of a fish (e.g., "trout") or plant (e.g., "lettuce")
+        life_stage: Optional fish life stage ("fry", "juvenile", "adult"); all stages when empty
+        min_score: Minimum compatibility score between 0 and 1 to include a pairing
+
+    Returns:
+        Dictionary with compatible partners, their shared temperature and pH ranges,
+        and a compatibility score (1.0 = the narrower range fits entirely inside the other)
+    """
+    index = get_compatibility_index()
+    entries = index.lookup(species, life_stage)
+    if not entries:
+        return {"error": f"Species '{species}' not found in fish or plant database"}
+
+    pairings = []
+    for entry in entries:
+        partner_kind = "plant" if entry["kind"] == "fish" else "fish"
+        for score, partner in index.query(partner_kind, entry["optimal_temp"], entry["optimal_ph"]):
+            if score < min_score:
+                continue
+            pairings.append({
+                "species": entry["species"],
+                "life_stage": entry["life_stage"],
+                "partner": partner["species"],
+                "partner_life_stage": partner["life_stage"],
+                "shared_temp": (max(entry["optimal_temp"][0], partner["optimal_temp"][0]),
+                                min(entry["optimal_temp"][1], partner["optimal_temp"][1])),
+                "shared_ph": (max(entry["optimal_ph"][0], partner["optimal_ph"][0]),
+                              min(entry["optimal_ph"][1], partner["optimal_ph"][1])),
+                "score": round(score, 2),
+            })
+    pairings.sort(key=lambda p: -p["score"])
+
+    return {
+        "species": species.lower(),
+        "kind": entries[0]["kind"],
+        "compatible": pairings,
+        "status": "compatible_partners_found" if pairings else "no_compatible_partners"
+    }
+
+
+SpeciesCompatibilityTool = CachedFunctionTool(
+    #name="SpeciesCompatibility",
+    #description="Finds compatible fish-plant pairings by temperature and pH overlap",
+    func=find_compatible_species
+)
@@ -0,0 +1,269 @@
+"""Token budgeting for prompts, tool payloads and session state.
+
+ContextBudget runs as model and agent callbacks. Before every model call it
+measures the tokens of each prompt section, replaces tool-result sub-payloads
+that repeat data already in the context (e.g. the diagnosis echoed back by
+suggest_corrective_actions) with short references, and, when the request is
+still over budget, shortens the oldest turns first. After each agent run it
+trims oversized state entries. Tokens saved are reported per user turn.
+
+Budgeting is on by default; set MINDPONICS_CONTEXT_BUDGET=false to send
+prompts and store agent outputs untrimmed. The budgets are read from
+MINDPONICS_CONTEXT_MAX_PROMPT_TOKENS, MINDPONICS_CONTEXT_KEEP_RECENT,
+MINDPONICS_CONTEXT_MAX_OLD_PART_TOKENS and MINDPONICS_CONTEXT_MAX_STATE_TOKENS,
+and MINDPONICS_CONTEXT_DEDUPE=false keeps repeated tool payloads.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+
+from google.genai import types
+
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_PROMPT_TOKENS = 8000
+DEFAULT_KEEP_RECENT_CONTENTS = 6
+DEFAULT_MAX_OLD_PART_TOKENS = 200
+DEFAULT_MAX_STATE_TOKENS = 1500
+MIN_DEDUPE_CHARS = 48   # smaller sub-payloads are cheaper to repeat than to reference
+
+# Appended to each agent's instruction when tool payloads are deduplicated
+REF_NOTE = (
+    'A tool result value of the form {"$ref": "contents[i].tool.result.key"} repeats the payload '
+    "found at that path: turn i of this conversation, the named tool's call args or result, then the keys."
+)
+
+# Accumulates savings across the orchestrator and the sub-agents it calls in one turn
+_current_turn = contextvars.ContextVar("mindponics_budget_turn", default=None)
+
+
+def context_budget_enabled() -> bool:
+    return os.getenv("MINDPONICS_CONTEXT_BUDGET", "true").lower() in ("1", "true", "yes")
+
+
+def estimate_tokens(value) -> int:
+    """Approximates the token count of a string or JSON-serializable value."""
+    if value is None:
+        return 0
+    text = value if isinstance(value, str) else json.dumps(value, default=str, separators=(",", ":"))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _part_tokens(part: types.Part) -> int:
+    if part.text:
+        return estimate_tokens(part.text)
+    if part.function_call:
+        return estimate_tokens({"name": part.function_call.name, "args": part.function_call.args})
+    if part.function_response:
+        return estimate_tokens({"name": part.function_response.name, "response": part.function_response.response})
+    return 0
+
+
+def measure_prompt_sections(llm_request) -> dict:
+    """Returns estimated tokens for the system instruction, tool declarations and each turn."""
+    config = llm_request.config
+    tools = (config.tools or []) if config is not None else []
+    declarations = [
+        d.model_dump(exclude_none=True)
+        for tool in tools
+        for d in (getattr(tool, "function_declarations", None) or [])
+    ]
+    sections = {
+        "system_instruction": estimate_tokens(config.system_instruction if config and isinstance(config.system_instruction, str) else None),
+        "tools": estimate_tokens(declarations) if declarations else 0,
+    }
+    for i, content in enumerate(llm_request.contents):
+        sections[f"contents[{i}].{content.role}"] = sum(_part_tokens(p) for p in content.parts or [])
+    return sections
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def dedupe_payload(value, seen: dict, path: str = "$"):
+    """
+    Replaces dict and list nodes already present in `seen` (canonical JSON -> path)
+    with {"$ref": path}, registering new nodes as it walks. Returns the new value.
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    key = _canonical(value)
+    if len(key) >= MIN_DEDUPE_CHARS:
+        if key in seen:
+            return {"$ref": seen[key]}
+    if isinstance(value, dict):
+        result = {k: dedupe_payload(v, seen, f"{path}.{k}") for k, v in value.items()}
+    else:
+        result = [dedupe_payload(v, seen, f"{path}[{i}]") for i, v in enumerate(value)]
+    if len(key) >= MIN_DEDUPE_CHARS:
+        seen.setdefault(key, path)
+    return result
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    dropped = estimate_tokens(text[max_chars:])
+    return f"{text[:max_chars]}… [truncated {dropped} tokens]"
+
+
+class ContextBudget:
+    """
+    Keeps model requests and session state within a token budget.
+
+    Args:
+        max_prompt_tokens: Budget for the turns sent to the model (instruction and tools excluded)
+        keep_recent_contents: Number of most recent contents never shortened
+        max_old_part_tokens: Size old text parts and tool payloads are cut to when over budget
+        max_state_tokens: Budget for each agent output stored in session state
+        dedupe: Whether to replace repeated tool sub-payloads with references
+    """
+
+    def __init__(self, max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+                 keep_recent_contents: int = DEFAULT_KEEP_RECENT_CONTENTS,
+                 max_old_part_tokens: int = DEFAULT_MAX_OLD_PART_TOKENS,
+                 max_state_tokens: int = DEFAULT_MAX_STATE_TOKENS, dedupe: bool = True):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.keep_recent_contents = keep_recent_contents
+        self.max_old_part_tokens = max_old_part_tokens
+        self.max_state_tokens = max_state_tokens
+        self.dedupe = dedupe
+        self.last_sections = {}
+        self._output_keys = {}
+        self._lock = threading.Lock()
+        self.totals = {"turns": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0}
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def install(self, root) -> None:
+        """Adds the budgeting callbacks to root and every agent below it."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        add_callbacks(root, before_agent_callback=self.start_turn)
+        for agent in iter_llm_agents(root):
+            self._output_keys[agent.name] = agent.output_key
+            if self.dedupe and agent.tools and isinstance(agent.instruction, str) and REF_NOTE not in agent.instruction:
+                agent.instruction = f"{agent.instruction}\n\n{REF_NOTE}\n"
+            add_callbacks(agent, before_model_callback=self.before_model, after_agent_callback=self.after_agent)
+
+    def start_turn(self, callback_context):
+        _current_turn.set({"invocation_id": callback_context.invocation_id, "before": 0, "after": 0})
+        return None
+
+    def _record(self, before: int, after: int) -> None:
+        turn = _current_turn.get()
+        if turn is not None:
+            turn["before"] += before
+            turn["after"] += after
+
+    def before_model(self, callback_context, llm_request):
+        sections = measure_prompt_sections(llm_request)
+        before = sum(sections.values())
+        contents = list(llm_request.contents)
+        if self.dedupe:
+            contents = self._dedupe_tool_payloads(contents)
+        contents = self._fit_budget(contents)
+        llm_request.contents = contents
+        self.last_sections = measure_prompt_sections(llm_request)
+        after = sum(self.last_sections.values())
+        self._record(before, after)
+        if after < before:
+            logging.debug(f"[ContextBudget] {callback_context.agent_name}: {before} -> {after} tokens")
+        return None
+
+    def _dedupe_tool_payloads(self, contents: list) -> list:
+        seen = {}
+        result = []
+        for i, content in enumerate(contents):
+            parts, changed = [], False
+            for part in content.parts or []:
+                # The content index keeps paths unique when a tool is called more than once
+                if part.function_call and part.function_call.args:
+                    dedupe_payload(part.function_call.args, seen, f"contents[{i}].{part.function_call.name}.args")
+                elif part.function_response and isinstance(part.function_response.response, dict):
+                    response = part.function_response.response
+                    deduped = dedupe_payload(response, seen, f"contents[{i}].{part.function_response.name}.result")
+                    if deduped != response:
+                        changed = True
+                        part = part.model_copy(update={
+                            "function_response": part.function_response.model_copy(update={"response": deduped})
+                        })
+                parts.append(part)
+            result.append(content.model_copy(update={"parts": parts}) if changed else content)
+        return result
+
+    def _fit_budget(self, contents: list) -> list:
+        total = sum(_part_tokens(p) for c in contents for p in c.parts or [])
+        cutoff = max(len(contents) - self.keep_recent_contents, 0)
+        for i in range(cutoff):
+            if total <= self.max_prompt_tokens:
+                break
+            content = contents[i]
+            parts = []
+            for part in content.parts or []:
+                before = _part_tokens(part)
+                if part.text:
+                    part = types.Part(text=_truncate(part.text, self.max_old_part_tokens))
+                elif part.function_response and before > self.max_old_part_tokens:
+                    summary = _truncate(_canonical(part.function_response.response), self.max_old_part_tokens)
+                    part = types.Part(function_response=types.FunctionResponse(
+                        id=part.function_response.id, name=part.function_response.name,
+                        response={"summary": summary},
+                    ))
+                total -= before - _part_tokens(part)
+                parts.append(part)
+            contents[i] = content.model_copy(update={"parts": parts})
+        return contents
+
+    def after_agent(self, callback_context):
+        state = callback_context.state
+        output_key = self._output_keys.get(callback_context.agent_name)
+        if output_key and isinstance(state.get(output_key), str):
+            value = state[output_key]
+            trimmed = _truncate(value, self.max_state_tokens)
+            if trimmed != value:
+                state[output_key] = trimmed
+                self._record(estimate_tokens(value), estimate_tokens(trimmed))
+        turn = _current_turn.get()
+        if turn is not None and turn["invocation_id"] == callback_context.invocation_id:
+            self._finish_turn(turn)
+            _current_turn.set(None)
+        return None
+
+    def _finish_turn(self, turn: dict) -> None:
+        saved = turn["before"] - turn["after"]
+        with self._lock:
+            self.totals["turns"] += 1
+            self.totals["tokens_before"] += turn["before"]
+            self.totals["tokens_after"] += turn["after"]
+            self.totals["tokens_saved"] += saved
+        logging.info(
+            f"[ContextBudget] turn={turn['invocation_id']} tokens_before={turn['before']} "
+            f"tokens_after={turn['after']} tokens_saved={saved}"
+        )
+
+
+def budget_from_env() -> ContextBudget:
+    """Builds a ContextBudget with the budgets set in the MINDPONICS_CONTEXT_* variables."""
+    return ContextBudget(
+        max_prompt_tokens=int(os.getenv("MINDPONICS_CONTEXT_MAX_PROMPT_TOKENS", DEFAULT_MAX_PROMPT_TOKENS)),
+        keep_recent_contents=int(os.getenv("MINDPONICS_CONTEXT_KEEP_RECENT", DEFAULT_KEEP_RECENT_CONTENTS)),
+        max_old_part_tokens=int(os.getenv("MINDPONICS_CONTEXT_MAX_OLD_PART_TOKENS", DEFAULT_MAX_OLD_PART_TOKENS)),
+        max_state_tokens=int(os.getenv("MINDPONICS_CONTEXT_MAX_STATE_TOKENS", DEFAULT_MAX_STATE_TOKENS)),
+        dedupe=os.getenv("MINDPONICS_CONTEXT_DEDUPE", "true").lower() in ("1", "true", "yes"),
+    )
+
+
+context_budget = budget_from_env()
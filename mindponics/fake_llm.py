@@ -0,0 +1,249 @@
+"""Offline, deterministic stand-in for Gemini for benchmarks, load tests and CI.
+
+FakeLlm is an ADK BaseLlm. Installed on every LlmAgent with install_fake_llm(),
+it drives the full InMemoryRunner path, including the orchestrator, AgentTool
+delegation and FunctionTools, without network access. Each agent's responses
+come from a script (agent name -> list of steps, replayed on every user turn)
+or, when no script entry exists, from a default policy:
+
+* the orchestrator delegates to the specialists whose domain the query
+  mentions, or to all of them when it mentions none;
+* a specialist calls each of its tools that needs no arguments;
+* once the calls return, the agent answers with a short summary of the results.
+
+A scripted agent that runs past the end of its steps also answers with the
+summary, so a script ending on a function call still terminates.
+
+Latency and token counts are synthetic and configurable. ResponseRecorder
+captures the responses of a live run in the same script format for replay.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+import pathlib
+import random
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from pydantic import PrivateAttr
+
+from .context_budget import estimate_tokens
+from .routing import detect_domains
+
+FAKE_MODEL = "mindponics-fake"
+
+# Specialist agent name -> routing domain, for the orchestrator's default policy
+AGENT_DOMAINS = {
+    "HydroGuardian": "water",
+    "PiscinePro": "fish",
+    "FloraFriend": "plant",
+    "bacteria_agent": "bacteria",
+    "ClimateController": "environment",
+}
+
+MAX_SUMMARY_CHARS = 160
+
+
+def _is_user_text(content: types.Content) -> bool:
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def _turn_position(llm_request: LlmRequest) -> tuple:
+    """Returns (latest user text, number of model responses since it, results of the last tool calls)."""
+    contents = llm_request.contents
+    start = max((i for i, c in enumerate(contents) if _is_user_text(c)), default=-1)
+    user_text = " ".join(p.text for p in contents[start].parts if p.text) if start >= 0 else ""
+    step = sum(1 for c in contents[start + 1:] if c.role == "model")
+    responses = [
+        part.function_response
+        for content in contents[start + 1:]
+        for part in content.parts or []
+        if part.function_response
+    ]
+    return user_text, step, responses
+
+
+def _required_params(tool) -> list:
+    declaration = tool._get_declaration()
+    if declaration is None:
+        return []
+    if declaration.parameters_json_schema:
+        return list(declaration.parameters_json_schema.get("required", []))
+    return list(declaration.parameters.required or []) if declaration.parameters else []
+
+
+def _summarize(value) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str, separators=(",", ":"))
+    return text if len(text) <= MAX_SUMMARY_CHARS else text[:MAX_SUMMARY_CHARS] + "…"
+
+
+class FakeLlm(BaseLlm):
+    """
+    Scripted model for one agent.
+
+    Args:
+        agent_name: Agent this model answers for, used to pick its script
+        script: Agent name -> list of steps. A step is {"text": str} or
+            {"function_calls": [{"name": str, "args": dict}]}, optionally with
+            "prompt_tokens" and "completion_tokens" overriding the estimates
+        latency_s: Fixed delay before every response
+        latency_jitter_s: Upper bound of an extra uniform random delay
+        output_token_latency_s: Extra delay per completion token
+        seed: Seed for the jitter
+    """
+
+    model: str = FAKE_MODEL
+    agent_name: str = ""
+    script: dict = {}
+    latency_s: float = 0.0
+    latency_jitter_s: float = 0.0
+    output_token_latency_s: float = 0.0
+    seed: int = 0
+    calls: int = 0
+
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        self._rng = random.Random(f"{self.seed}:{self.agent_name}")
+
+    def next_step(self, llm_request: LlmRequest) -> dict:
+        """Returns the step to answer llm_request with."""
+        user_text, step, responses = _turn_position(llm_request)
+        steps = self.script.get(self.agent_name)
+        if steps is not None and step < len(steps):
+            return steps[step]
+        if steps is None and step == 0:
+            calls = self._default_calls(llm_request, user_text)
+            if calls:
+                return {"function_calls": calls}
+        findings = "; ".join(f"{r.name}: {_summarize(r.response)}" for r in responses)
+        return {"text": f"{self.agent_name} summary for '{user_text[:80]}'. {findings}".strip()}
+
+    def _default_calls(self, llm_request: LlmRequest, user_text: str) -> list:
+        tools = list(llm_request.tools_dict.values())
+        delegates = [tool for tool in tools if isinstance(tool, AgentTool)]
+        if delegates:
+            domains = set(detect_domains(user_text))
+            chosen = [tool for tool in delegates if AGENT_DOMAINS.get(tool.name) in domains] or delegates
+            return [{"name": tool.name, "args": {"request": user_text}} for tool in chosen]
+        return [{"name": tool.name, "args": {}} for tool in tools if not _required_params(tool)]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        step = self.next_step(llm_request)
+        if "function_calls" in step:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+                for call in step["function_calls"]
+            ]
+        else:
+            parts = [types.Part(text=step.get("text", ""))]
+        content = types.Content(role="model", parts=parts)
+
+        system = llm_request.config.system_instruction if llm_request.config else None
+        prompt_tokens = step.get("prompt_tokens", estimate_tokens(
+            [system if isinstance(system, str) else ""] + [c.model_dump(exclude_none=True) for c in llm_request.contents]
+        ))
+        completion_tokens = step.get("completion_tokens", estimate_tokens(content.model_dump(exclude_none=True)))
+        delay = self.latency_s + self._rng.uniform(0, self.latency_jitter_s) + completion_tokens * self.output_token_latency_s
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=completion_tokens,
+            total_token_count=prompt_tokens + completion_tokens,
+        )
+
+        text = step.get("text")
+        if stream and text:
+            # Stream the text in two halves, then the aggregated response
+            half = len(text) // 2
+            for chunk in (text[:half], text[half:]):
+                await asyncio.sleep(delay / 2)
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        elif delay:
+            await asyncio.sleep(delay)
+        yield LlmResponse(content=content, usage_metadata=usage, model_version=self.model)
+
+    @classmethod
+    def supported_models(cls) -> list:
+        return [FAKE_MODEL]
+
+
+def load_script(path) -> dict:
+    """Reads a script saved by ResponseRecorder.save() or written by hand."""
+    return json.loads(pathlib.Path(path).read_text())
+
+
+def install_fake_llm(root, script: Optional[dict] = None, **settings) -> dict:
+    """
+    Replaces the model of root and every agent below it with a FakeLlm.
+
+    Args:
+        root: Root of the agent tree
+        script: Agent name -> list of steps, see FakeLlm
+        **settings: Latency and seed settings passed to every FakeLlm
+
+    Returns:
+        Dictionary of agent name -> the FakeLlm installed on it
+    """
+    from .callbacks import iter_llm_agents
+
+    # A private copy, so a ResponseRecorder writing to the same dict cannot change the replay
+    script = copy.deepcopy(script or {})
+    installed = {}
+    for agent in iter_llm_agents(root):
+        agent.model = installed[agent.name] = FakeLlm(agent_name=agent.name, script=script, **settings)
+    return installed
+
+
+@contextlib.contextmanager
+def fake_llm(root, script: Optional[dict] = None, **settings):
+    """Installs FakeLlm on the agent tree for the duration of the block, then restores the real models."""
+    from .callbacks import iter_llm_agents
+
+    originals = [(agent, agent.model) for agent in iter_llm_agents(root)]
+    try:
+        yield install_fake_llm(root, script, **settings)
+    finally:
+        for agent, model in originals:
+            agent.model = model
+
+
+class ResponseRecorder:
+    """Records the model responses of each agent's latest turn as a FakeLlm script."""
+
+    def __init__(self):
+        self.script = {}
+
+    def install(self, root) -> None:
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        for agent in iter_llm_agents(root):
+            add_callbacks(agent, prepend=True, after_model_callback=self.after_model)
+
+    def after_model(self, callback_context, llm_response):
+        if llm_response.partial or llm_response.content is None:
+            return None
+        parts = llm_response.content.parts or []
+        calls = [{"name": p.function_call.name, "args": dict(p.function_call.args or {})} for p in parts if p.function_call]
+        step = {"function_calls": calls} if calls else {"text": "".join(p.text for p in parts if p.text)}
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            step["prompt_tokens"] = usage.prompt_token_count or 0
+            step["completion_tokens"] = usage.candidates_token_count or 0
+        steps = self.script.setdefault(callback_context.agent_name, [])
+        # A text answer ends the agent's turn; the next response starts a new recording
+        if steps and "text" in steps[-1]:
+            steps.clear()
+        steps.append(step)
+        return None
+
+    def save(self, path) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.script, indent=2) + "\n")
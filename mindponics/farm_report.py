@@ -0,0 +1,228 @@
+"""Farm-wide daily report for many tanks in a single model call.
+
+Running an orchestrator turn per tank costs one orchestrator and up to five
+specialist model calls per tank. Most of that is not needed for a report,
+because the diagnoses themselves are deterministic tools. The report pipeline:
+
+1. runs diagnose_water_quality, monitor_nitrification_cycle and
+   suggest_corrective_actions on every tank's readings;
+2. groups tanks whose issue signature is the same (the issues and their
+   severity, plus the nitrification status, but not the exact values);
+3. sends one representative per group with issues to the model in one batched
+   prompt, asking for a short narrative per group;
+4. copies each group's narrative to all of its tanks, next to that tank's own
+   readings, issues and actions.
+
+A report therefore makes one model call, or none when every tank is optimal,
+and its prompt grows with the number of distinct problems rather than tanks.
+Groups the model's answer does not cover get a narrative built from their
+diagnosis.
+
+Usage:
+    python -m mindponics.farm_report --tanks 200 --fake --output farm_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import time
+
+from .routing import MODEL_TIERS
+
+SYSTEM_INSTRUCTION = (
+    "You write the daily status report of an aquaponics farm. Each group below is a set of tanks "
+    "with the same water quality issues; one representative tank's readings are shown. For every "
+    "group write two or three sentences for the farm operator: what is wrong, how urgent it is and "
+    "what to do first. Answer with a JSON object mapping each group id to its narrative, and nothing else."
+)
+OPTIMAL_NARRATIVE = "All water parameters are within optimal ranges and the nitrification cycle is healthy. No action needed."
+
+
+def diagnose_tank(readings: dict) -> dict:
+    """Runs the deterministic water and nitrification diagnoses and corrective actions for one tank."""
+    from .sub_agents.bacteria.agent import monitor_nitrification_cycle
+    from .sub_agents.water.agent import diagnose_water_quality, suggest_corrective_actions
+
+    diagnosis = diagnose_water_quality(readings)
+    actions = suggest_corrective_actions(readings, diagnosis)
+    return {
+        "readings": readings,
+        "status": diagnosis["status"],
+        "issues": diagnosis["issues"],
+        "nitrification_status": monitor_nitrification_cycle(
+            readings["ammonia"], readings["nitrite"], readings["nitrate"]),
+        "actions": actions["actions"],
+        "priority": actions["priority"],
+    }
+
+
+def issue_signature(tank: dict) -> tuple:
+    """Returns what makes two tanks' reports the same: their issues and severities and nitrification status."""
+    return tuple(sorted((i["issue"], i["severity"]) for i in tank["issues"])), tank["nitrification_status"]
+
+
+def cluster_tanks(tanks: dict) -> list:
+    """Groups diagnosed tanks by issue signature, most urgent and then largest groups first."""
+    groups = {}
+    for tank_id, tank in tanks.items():
+        groups.setdefault(issue_signature(tank), []).append(tank_id)
+    ordered = sorted(groups.items(), key=lambda g: (tanks[g[1][0]]["priority"] != "immediate", -len(g[1]), g[0]))
+    return [
+        {"id": f"group-{i + 1}", "signature": signature, "tanks": sorted(tank_ids)}
+        for i, (signature, tank_ids) in enumerate(ordered)
+    ]
+
+
+def deterministic_narrative(tank: dict) -> str:
+    """Builds a narrative from a tank's diagnosis, used when the model's answer is missing."""
+    if not tank["issues"]:
+        return OPTIMAL_NARRATIVE
+    issues = ", ".join(f"{i['issue']} ({i['severity']})" for i in tank["issues"])
+    return f"{issues}; nitrification cycle {tank['nitrification_status']}. First: {tank['actions'][0]}."
+
+
+def build_prompt(clusters: list, tanks: dict) -> str:
+    """Describes each cluster once, through its first tank, for the batched narrative request."""
+    groups = []
+    for cluster in clusters:
+        tank = tanks[cluster["tanks"][0]]
+        groups.append({
+            "id": cluster["id"],
+            "tank_count": len(cluster["tanks"]),
+            "readings": tank["readings"],
+            "issues": [{k: i[k] for k in ("issue", "severity")} for i in tank["issues"]],
+            "nitrification_status": tank["nitrification_status"],
+            "suggested_actions": tank["actions"],
+        })
+    return json.dumps({"groups": groups}, separators=(",", ":"))
+
+
+def parse_narratives(text: str) -> dict:
+    """Returns the group id -> narrative object in the model's answer, or {} if there is none."""
+    text = (text or "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        narratives = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return {k: v for k, v in narratives.items() if isinstance(v, str)} if isinstance(narratives, dict) else {}
+
+
+async def _ask_model(model, prompt: str) -> tuple:
+    from google.adk.models import LlmRequest
+    from google.genai import types
+
+    request = LlmRequest(
+        model=model.model,
+        contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+        config=types.GenerateContentConfig(
+            system_instruction=SYSTEM_INSTRUCTION, response_mime_type="application/json"),
+    )
+    text, usage = "", None
+    async for response in model.generate_content_async(request):
+        if response.content and response.content.parts:
+            text += "".join(p.text or "" for p in response.content.parts)
+        usage = response.usage_metadata or usage
+    return text, usage
+
+
+async def generate_farm_report(readings_by_tank: dict, model=None) -> dict:
+    """
+    Produces the report for every tank with at most one model call.
+
+    Args:
+        readings_by_tank: Tank id -> water parameters, as returned by get_water_parameters
+        model: BaseLlm or model name for the narratives, defaults to the fast tier
+
+    Returns:
+        Per-tank diagnosis and narrative, the clusters, and model call and token counts
+    """
+    started = time.perf_counter()
+    tanks = {tank_id: diagnose_tank(readings) for tank_id, readings in readings_by_tank.items()}
+    clusters = cluster_tanks(tanks)
+    needs_model = [c for c in clusters if tanks[c["tanks"][0]]["issues"]]
+
+    narratives, usage, model_calls = {}, None, 0
+    if needs_model:
+        if model is None or isinstance(model, str):
+            from google.adk.models.registry import LLMRegistry
+
+            model = LLMRegistry.new_llm(model or MODEL_TIERS["fast"])
+        try:
+            text, usage = await _ask_model(model, build_prompt(needs_model, tanks))
+            model_calls = 1
+            narratives = parse_narratives(text)
+        except Exception as e:
+            logging.error(f"[FarmReport] Narrative request failed, using deterministic narratives: {e}")
+
+    for cluster in clusters:
+        representative = tanks[cluster["tanks"][0]]
+        if cluster["id"] in narratives:
+            cluster["narrative"], cluster["source"] = narratives[cluster["id"]], "model"
+        else:
+            cluster["narrative"], cluster["source"] = deterministic_narrative(representative), "deterministic"
+        for tank_id in cluster["tanks"]:
+            tanks[tank_id]["cluster"] = cluster["id"]
+            tanks[tank_id]["narrative"] = cluster["narrative"]
+        issues, nitrification = cluster["signature"]
+        cluster["signature"] = {"issues": [list(i) for i in issues], "nitrification_status": nitrification}
+
+    return {
+        "generated_at": time.time(),
+        "tank_count": len(tanks),
+        "cluster_count": len(clusters),
+        "model_calls": model_calls,
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "completion_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+        "wall_s": round(time.perf_counter() - started, 3),
+        "clusters": clusters,
+        "tanks": tanks,
+    }
+
+
+def simulated_readings(tank_count: int) -> dict:
+    """Returns sensor-simulator water parameters for tank-1 ... tank-N."""
+    from utils.sensor_simulator import get_simulated_sensor_data
+
+    readings = {}
+    for i in range(tank_count):
+        data = get_simulated_sensor_data()
+        readings[f"tank-{i + 1}"] = {
+            "ph": data["ph"], "ammonia": data["ammonia"], "nitrite": data["nitrite"], "nitrate": data["nitrate"],
+            "temperature": data["temperature"], "dissolved_oxygen": data["oxygen"],
+        }
+    return readings
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tanks", type=int, default=50, help="Number of simulated tanks")
+    parser.add_argument("--model", default=MODEL_TIERS["fast"], help="Model that writes the narratives")
+    parser.add_argument("--fake", action="store_true", help="Use FakeLlm instead of a real model (offline)")
+    parser.add_argument("--output", type=pathlib.Path, help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    model = args.model
+    if args.fake:
+        from .fake_llm import FakeLlm
+
+        model = FakeLlm(agent_name="FarmReport")
+    report = asyncio.run(generate_farm_report(simulated_readings(args.tanks), model))
+    print(f"{report['tank_count']} tanks, {report['cluster_count']} issue clusters, "
+          f"{report['model_calls']} model call(s), {report['prompt_tokens']} prompt tokens, {report['wall_s']}s")
+    for cluster in report["clusters"]:
+        print(f"  {cluster['id']} ({len(cluster['tanks'])} tanks, {cluster['source']}): {cluster['narrative']}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
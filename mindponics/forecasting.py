@@ -0,0 +1,219 @@
+"""Short-horizon forecasting for water and climate parameters.
+
+Every (tank, parameter) series keeps an additive Holt-Winters state: a level, a
+trend per hour and 24 hourly diurnal seasonal offsets. States are updated
+incrementally as readings arrive and live in shared numpy arrays, so all series
+are forecast together in one vectorized call. Forecasts are cached per series
+and horizon until that series receives its next reading.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SEASON_SLOTS = 24           # one seasonal offset per hour of day
+MIN_OBSERVATIONS = 3        # below this a series reports insufficient history
+MIN_TREND_HOURS = 5 / 60    # closer readings refine the level but not the trend
+DEFAULT_SMOOTHING = {"alpha": 0.3, "beta": 0.05, "gamma": 0.1}
+CACHED_HORIZONS = 4         # (horizon, step) pairs whose forecast matrices are kept
+
+
+def _slot(timestamps: np.ndarray) -> np.ndarray:
+    return ((np.asarray(timestamps) // 3600) % SEASON_SLOTS).astype(int)
+
+
+class ForecastStore:
+    """
+    Incrementally fitted Holt-Winters states for many (tank, parameter) series.
+
+    Args:
+        alpha: Level smoothing factor
+        beta: Trend smoothing factor
+        gamma: Seasonal smoothing factor
+    """
+
+    def __init__(self, alpha: float = DEFAULT_SMOOTHING["alpha"], beta: float = DEFAULT_SMOOTHING["beta"],
+                 gamma: float = DEFAULT_SMOOTHING["gamma"], capacity: int = 64):
+        self.alpha, self.beta, self.gamma = alpha, beta, gamma
+        self._rows = {}
+        self._lock = threading.Lock()
+        self.level = np.zeros(capacity)
+        self.trend = np.zeros(capacity)
+        self.season = np.zeros((capacity, SEASON_SLOTS))
+        self.last_time = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=int)
+        # (n_steps, step_hours) -> forecast matrix and the series that changed since it was computed,
+        # least recently used first
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def series(self) -> list:
+        """Returns the (tank_id, parameter) keys in row order."""
+        return list(self._rows)
+
+    def _row(self, tank_id: str, parameter: str) -> int:
+        key = (tank_id, parameter)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._rows)
+            if row >= len(self.level):
+                self._grow()
+        return row
+
+    def _grow(self) -> None:
+        grow = lambda a, fill=0: np.concatenate([a, np.full((len(a),) + a.shape[1:], fill, dtype=a.dtype)])
+        self.level, self.trend = grow(self.level), grow(self.trend)
+        self.season, self.last_time = grow(self.season), grow(self.last_time)
+        self.count = grow(self.count)
+        self._cache.clear()
+
+    def observe(self, tank_id: str, readings: dict, timestamp: float = None) -> None:
+        """Adds one reading per parameter for a tank (e.g. the dict returned by a sensor tool)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        numeric = {p: v for p, v in readings.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+        self.observe_many([tank_id] * len(numeric), list(numeric), list(numeric.values()),
+                          np.full(len(numeric), timestamp, dtype=float))
+
+    def observe_many(self, tank_ids, parameters, values, timestamps) -> None:
+        """Adds a batch of readings; readings of the same series are applied in time order."""
+        values = np.asarray(values, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=float)
+        with self._lock:
+            rows = np.fromiter((self._row(t, p) for t, p in zip(tank_ids, parameters)), dtype=int, count=len(values))
+            order = np.argsort(timestamps, kind="stable")
+            rows, values, timestamps = rows[order], values[order], timestamps[order]
+            # Apply in rounds so every round touches each series at most once
+            while len(rows):
+                _, first = np.unique(rows, return_index=True)
+                self._update(rows[first], values[first], timestamps[first])
+                keep = np.ones(len(rows), dtype=bool)
+                keep[first] = False
+                rows, values, timestamps = rows[keep], values[keep], timestamps[keep]
+
+    def _update(self, rows: np.ndarray, y: np.ndarray, t: np.ndarray) -> None:
+        slots = _slot(t)
+        new = self.count[rows] == 0
+        dt_h = np.maximum((t - self.last_time[rows]) / 3600.0, 0.0)
+        season = self.season[rows, slots]
+        level, trend = self.level[rows], self.trend[rows]
+
+        predicted = level + trend * dt_h
+        new_level = self.alpha * (y - season) + (1 - self.alpha) * predicted
+        spaced = dt_h >= MIN_TREND_HOURS
+        slope = np.divide(new_level - level, dt_h, out=np.zeros_like(dt_h), where=spaced)
+        new_trend = np.where(spaced, self.beta * slope + (1 - self.beta) * trend, trend)
+        new_season = self.gamma * (y - new_level) + (1 - self.gamma) * season
+
+        self.level[rows] = np.where(new, y, new_level)
+        self.trend[rows] = np.where(new, 0.0, new_trend)
+        self.season[rows, slots] = np.where(new, 0.0, new_season)
+        self.last_time[rows] = np.maximum(t, self.last_time[rows])
+        self.count[rows] += 1
+        for entry in self._cache.values():
+            entry["dirty"][rows] = True
+
+    def forecast_all(self, horizon_hours: float = 24.0, step_hours: float = 1.0) -> dict:
+        """
+        Forecasts every series at step_hours resolution up to horizon_hours ahead.
+
+        Returns:
+            Dictionary with "series" keys, "hours" (n_steps,) and "values" of shape
+            (n_series, n_steps); hours are counted from each series' last reading
+        """
+        with self._lock:
+            hours, values = self._forecast_locked(horizon_hours, step_hours)
+            return {"series": self.series(), "hours": hours, "values": values.copy()}
+
+    def _forecast_locked(self, horizon_hours: float, step_hours: float) -> tuple:
+        """Returns the hours and the cached forecast rows of every series, updating dirty rows. Needs the lock."""
+        n_series = len(self._rows)
+        n_steps = max(int(np.ceil(horizon_hours / step_hours)), 1)
+        key = (n_steps, float(step_hours))
+        entry = self._cache.get(key)
+        if entry is None:
+            capacity = len(self.level)
+            entry = self._cache[key] = {
+                "hours": step_hours * np.arange(1, n_steps + 1),
+                "values": np.empty((capacity, n_steps)),
+                "dirty": np.ones(capacity, dtype=bool),
+            }
+            while len(self._cache) > CACHED_HORIZONS:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(key)
+        hours = entry["hours"]
+        dirty = np.flatnonzero(entry["dirty"][:n_series])
+        if len(dirty):
+            future = self.last_time[dirty, None] + hours[None, :] * 3600.0
+            seasonal = np.take_along_axis(self.season[dirty], _slot(future), axis=1)
+            entry["values"][dirty] = self.level[dirty, None] + self.trend[dirty, None] * hours[None, :] + seasonal
+            entry["dirty"][dirty] = False
+        return hours, entry["values"][:n_series]
+
+    def forecast(self, tank_id: str, parameters: list, thresholds: dict, horizon_hours: float = 24.0,
+                 step_hours: float = 0.5) -> dict:
+        """
+        Summarises the forecast for a tank's parameters and the time until each
+        crosses its thresholds.
+
+        Args:
+            tank_id: Tank identifier
+            parameters: Parameter names to report
+            thresholds: Parameter -> (low, high) bounds; either bound may be None
+            horizon_hours: How far ahead to look
+            step_hours: Resolution of the time-to-threshold estimate
+
+        Returns:
+            Dictionary keyed by parameter with the current level, the forecast at the
+            horizon and the first threshold crossing (if any) with its ETA in hours
+        """
+        # Copy the tank's state under the lock, so concurrent readings cannot change it mid-report
+        states = {}
+        with self._lock:
+            hours, values = self._forecast_locked(horizon_hours, step_hours)
+            for parameter in parameters:
+                row = self._rows.get((tank_id, parameter))
+                if row is not None:
+                    states[parameter] = (int(self.count[row]), float(self.level[row]), float(self.trend[row]),
+                                         values[row].copy())
+        report = {}
+        for parameter in parameters:
+            count, level, trend, path = states.get(parameter, (0, 0.0, 0.0, None))
+            if count < MIN_OBSERVATIONS:
+                report[parameter] = {"status": "insufficient_history", "observations": count}
+                continue
+            low, high = thresholds.get(parameter, (None, None))
+            entry = {
+                "current": round(level, 3),
+                "trend_per_hour": round(trend, 4),
+                "forecast_at_horizon": round(float(path[-1]), 3),
+            }
+            for bound, crossed in (("high", None if high is None else path > high),
+                                   ("low", None if low is None else path < low)):
+                if crossed is not None and crossed.any():
+                    k = int(np.argmax(crossed))
+                    if "hours_to_threshold" not in entry or hours[k] < entry["hours_to_threshold"]:
+                        entry.update({"crosses": bound, "threshold": high if bound == "high" else low,
+                                      "hours_to_threshold": float(hours[k])})
+            report[parameter] = entry
+        return report
+
+
+_default_store = ForecastStore()
+
+
+def get_forecast_store() -> ForecastStore:
+    """Returns the process-wide store that the sensor tools feed."""
+    return _default_store
+
+
+def record_readings(readings: dict, tank_id: str = "default", timestamp: float = None) -> None:
+    """Feeds a sensor reading into the shared forecast store without failing the caller."""
+    try:
+        _default_store.observe(tank_id, readings, timestamp)
+    except Exception as e:
+        logging.error(f"Error recording readings for forecasting: {e}")
@@ -0,0 +1,168 @@
+"""Deadline-bounded and hedged specialist delegations.
+
+One slow AgentTool call holds up the orchestrator's whole turn. HedgedAgentTool
+replaces AgentTool for the specialists and bounds each delegation:
+
+* the latency of every delegation is tracked per specialist. When a call has
+  not answered within that specialist's p95 (or hedge_after_s before enough
+  samples exist), a duplicate request is sent on the fast model tier (through
+  the model router, so with MINDPONICS_MODEL_ROUTING=false it uses the
+  specialist's own model), and whichever answer arrives first is used;
+* at deadline_s both are cancelled and the specialist's deterministic tool
+  output is returned instead: the results of its tools that need no
+  arguments, so the orchestrator still has current readings to work with.
+
+The orchestrator's turn is therefore bounded by the deadline. Hedge, hedge-win
+and fallback counts and rates are reported per specialist by HedgingPolicy.report().
+
+Enable it with MINDPONICS_HEDGED_DELEGATION=true.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from collections import deque
+
+from google.adk.tools import FunctionTool
+from google.adk.tools.agent_tool import AgentTool
+
+DEFAULT_HEDGE_AFTER_S = 10.0
+DEFAULT_DEADLINE_S = 30.0
+MIN_SAMPLES = 20       # delegations seen before the tracked p95 replaces hedge_after_s
+LATENCY_WINDOW = 200   # most recent delegations the p95 is computed from
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("MINDPONICS_HEDGED_DELEGATION", "false").lower() in ("1", "true", "yes")
+
+
+def deterministic_output(agent) -> dict:
+    """Runs the agent's tools that need no arguments and returns their results by tool name."""
+    results = {}
+    for tool in agent.tools:
+        func = getattr(tool, "func", None) if isinstance(tool, FunctionTool) else None
+        if func is None:
+            continue
+        required = [
+            p for p in inspect.signature(func).parameters.values()
+            if p.default is inspect.Parameter.empty and p.name != "tool_context"
+            and p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+        ]
+        if required:
+            continue
+        try:
+            results[tool.name] = func()
+        except Exception as e:
+            results[tool.name] = {"error": str(e)}
+    return results
+
+
+class HedgingPolicy:
+    """
+    Latency tracking, hedging and deadline settings shared by the HedgedAgentTools.
+
+    Args:
+        hedge_after_s: Hedge delay before a specialist has MIN_SAMPLES delegations
+        deadline_s: Time after which the deterministic fallback is returned
+        hedge_tier: Model tier of the duplicate request, or None to not hedge
+        fallback: Whether to return deterministic tool output at the deadline
+    """
+
+    def __init__(self, hedge_after_s: float = DEFAULT_HEDGE_AFTER_S, deadline_s: float = DEFAULT_DEADLINE_S,
+                 hedge_tier: str = "fast", fallback: bool = True):
+        self.hedge_after_s = hedge_after_s
+        self.deadline_s = deadline_s
+        self.hedge_tier = hedge_tier
+        self.fallback = fallback
+        self._latencies = {}
+        self._stats = {}
+
+    def record(self, agent_name: str, seconds: float) -> None:
+        self._latencies.setdefault(agent_name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, agent_name: str) -> float:
+        """Returns the specialist's p95 delegation latency, or hedge_after_s while it has too few samples."""
+        samples = self._latencies.get(agent_name)
+        if not samples or len(samples) < MIN_SAMPLES:
+            return self.hedge_after_s
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def count(self, agent_name: str, **values) -> None:
+        stats = self._stats.setdefault(agent_name, {"calls": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0})
+        for name, value in values.items():
+            stats[name] += value
+
+    def report(self) -> dict:
+        """Returns per-specialist counts, hedge, hedge-win and fallback rates and the current hedge delay."""
+        return {
+            name: {
+                **stats,
+                "hedge_rate": stats["hedged"] / stats["calls"] if stats["calls"] else 0.0,
+                "hedge_win_rate": stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0,
+                "fallback_rate": stats["fallbacks"] / stats["calls"] if stats["calls"] else 0.0,
+                "hedge_after_s": round(self.hedge_delay(name), 3),
+            }
+            for name, stats in self._stats.items()
+        }
+
+
+hedging_policy = HedgingPolicy()
+
+
+class HedgedAgentTool(AgentTool):
+    """AgentTool whose delegations are hedged after the specialist's p95 and bounded by a deadline."""
+
+    def __init__(self, agent, policy: HedgingPolicy = None, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.policy = policy or hedging_policy
+
+    async def run_async(self, *, args, tool_context):
+        from .routing import forced_tier
+
+        policy, name = self.policy, self.agent.name
+        policy.count(name, calls=1)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(super().run_async(args=args, tool_context=tool_context))
+        running = {primary}
+        hedge = None
+        try:
+            done, _ = await asyncio.wait(running, timeout=min(policy.hedge_delay(name), policy.deadline_s))
+            if not done and policy.hedge_tier:
+                # The task copies the context here, so only the hedge's model calls use the forced tier
+                with forced_tier(policy.hedge_tier):
+                    hedge = asyncio.ensure_future(super().run_async(args=args, tool_context=tool_context))
+                running.add(hedge)
+                policy.count(name, hedged=1)
+                logging.info(f"[HedgedAgentTool] {name} slower than {policy.hedge_delay(name):.1f}s, hedging")
+            while not done:
+                remaining = policy.deadline_s - (time.perf_counter() - started)
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(running, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                # A failed attempt leaves the other to finish
+                for task in [t for t in done if t.exception() is not None]:
+                    running.discard(task)
+                    if not running:
+                        raise task.exception()
+                    logging.warning(f"[HedgedAgentTool] {name} attempt failed: {task.exception()}")
+                done = {t for t in done if t.exception() is None}
+
+            if done:
+                winner = next(iter(done))
+                if winner is hedge:
+                    policy.count(name, hedge_wins=1)
+                policy.record(name, time.perf_counter() - started)
+                return winner.result()
+
+            policy.record(name, policy.deadline_s)
+            if not policy.fallback:
+                return {"error": f"{name} did not answer within {policy.deadline_s:.0f}s"}
+            policy.count(name, fallbacks=1)
+            logging.warning(f"[HedgedAgentTool] {name} missed the {policy.deadline_s:.0f}s deadline, using tool output")
+            return {"fallback": "deterministic", "agent": name, "tool_results": deterministic_output(self.agent)}
+        finally:
+            for task in running:
+                task.cancel()
@@ -0,0 +1,450 @@
+"""Ingestion gateway for sensor readings pushed by probes and controllers.
+
+Probes and controllers push readings over UDP (one batch per datagram) or
+HTTP (POST /ingest, one batch per request body) in either of two formats:
+
+* line format, one tank per line with an optional Unix timestamp:
+  "tank-1 ph=7.1,ammonia=0.25,dissolved_oxygen=6.4 1718000000.5"
+* binary format, BINARY_MAGIC followed by packed little-endian records of
+  RECORD_DTYPE (tank number, parameter code, value, timestamp). The parameter
+  code is the position of the parameter in OPTIMAL_RANGES, and a zero
+  timestamp means the time of arrival. Tank number 0 is the "default" tank
+  and tank n is "tank-<n>".
+
+Tank ids are the ids the tools take: a reading for "tank-3" is what
+get_water_parameters(tank_id="tank-3") and forecast_water_parameters(tank_id="tank-3")
+see, and readings for "default" are what they see when called without one.
+
+Only the parameters in the water agent's OPTIMAL_RANGES are accepted. Values
+must be finite and physically plausible (PLAUSIBLE_RANGES), and anything else
+is rejected and counted. Accepted readings are queued as numpy columns. A
+writer applies them to the forecast store in batches of up to
+batch_size through ForecastStore.observe_many, and runs the range detector,
+which records readings outside OPTIMAL_RANGES as alerts. It also publishes
+each tank's latest values to the sensor snapshot that get_sensor_data()
+serves to the tools.
+
+Backpressure: at most max_pending readings wait for the writer. Past that,
+an HTTP request gets 429 with Retry-After and a UDP datagram is dropped; both
+are counted.
+
+Set MINDPONICS_INGEST_UDP_PORT and/or MINDPONICS_INGEST_HTTP_PORT to start the
+gateway in the agent's process when the agent is built.
+"""
+
+import asyncio
+import collections
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+BINARY_MAGIC = b"MPB1"
+RECORD_DTYPE = np.dtype([("tank", "<u4"), ("parameter", "u1"), ("value", "<f4"), ("timestamp", "<f8")])
+PLAUSIBLE_RANGES = {
+    "ph": (0.0, 14.0),
+    "ammonia": (0.0, 100.0),            # mg/L
+    "nitrite": (0.0, 100.0),            # mg/L
+    "nitrate": (0.0, 2000.0),           # mg/L
+    "temperature": (-5.0, 50.0),        # °C
+    "dissolved_oxygen": (0.0, 30.0),    # mg/L
+}
+# Parameter names the sensor snapshot (and so get_water_parameters) uses where they differ
+SNAPSHOT_NAMES = {"dissolved_oxygen": "oxygen"}
+DEFAULT_MAX_PENDING = 200_000
+DEFAULT_BATCH_SIZE = 20_000
+DEFAULT_FLUSH_INTERVAL_S = 0.05
+MAX_ALERTS = 1000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def parameter_table() -> tuple:
+    """Returns the parameter names and their plausible and optimal (low, high) arrays, indexed by parameter code."""
+    from .sub_agents.water.agent import OPTIMAL_RANGES
+
+    names = tuple(OPTIMAL_RANGES)
+    plausible = np.array([PLAUSIBLE_RANGES.get(p, (-np.inf, np.inf)) for p in names], dtype=float)
+    optimal = np.array([OPTIMAL_RANGES[p] for p in names], dtype=float)
+    return names, plausible, optimal
+
+
+def binary_tank_id(number: int) -> str:
+    """Returns the tank id for a binary record's tank number: 0 is the default tank."""
+    return "default" if number == 0 else f"tank-{number}"
+
+
+class Backpressure(Exception):
+    """The gateway has max_pending readings waiting; the sender should retry later."""
+
+
+class MalformedPayload(ValueError):
+    """The payload is neither valid line nor binary format."""
+
+
+def encode_lines(readings: list) -> bytes:
+    """Encodes (tank_id, {parameter: value}, timestamp or None) tuples in the line format."""
+    lines = []
+    for tank_id, values, timestamp in readings:
+        fields = ",".join(f"{p}={v}" for p, v in values.items())
+        lines.append(f"{tank_id} {fields}" + (f" {timestamp}" if timestamp is not None else ""))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def encode_binary(tanks, parameters, values, timestamps) -> bytes:
+    """Encodes columns of tank numbers, parameter names, values and timestamps in the binary format."""
+    names = parameter_table()[0]
+    records = np.empty(len(values), dtype=RECORD_DTYPE)
+    records["tank"] = tanks
+    records["parameter"] = [names.index(p) for p in parameters]
+    records["value"] = values
+    records["timestamp"] = timestamps
+    return BINARY_MAGIC + records.tobytes()
+
+
+def decode(data: bytes, now: float = None) -> tuple:
+    """
+    Decodes a line or binary payload into columns.
+
+    Returns:
+        (tank ids, parameter codes, values, timestamps) arrays and the number of
+        readings rejected: unknown parameters, or values that are not finite or not plausible
+    """
+    names, plausible, _ = parameter_table()
+    now = time.time() if now is None else now
+    if data.startswith(BINARY_MAGIC):
+        body = memoryview(data)[len(BINARY_MAGIC):]
+        if len(body) % RECORD_DTYPE.itemsize:
+            raise MalformedPayload(f"binary body of {len(body)} bytes is not a whole number of records")
+        records = np.frombuffer(body, dtype=RECORD_DTYPE)
+        numbers, inverse = np.unique(records["tank"], return_inverse=True)
+        tanks = np.array([binary_tank_id(n) for n in numbers], dtype=object)[inverse]
+        codes = records["parameter"].astype(np.int64)
+        values = records["value"].astype(float)
+        timestamps = np.where(records["timestamp"] > 0, records["timestamp"], now)
+        known = codes < len(names)
+    else:
+        tanks, codes, values, timestamps = _decode_lines(data, names, now)
+        known = codes >= 0
+    codes = np.where(known, codes, 0)
+    bounds = plausible[codes]
+    with np.errstate(invalid="ignore"):
+        valid = known & np.isfinite(values) & (values >= bounds[:, 0]) & (values <= bounds[:, 1])
+    return (tanks[valid], codes[valid], values[valid], timestamps[valid]), int(len(valid) - valid.sum())
+
+
+def _decode_lines(data: bytes, names: tuple, now: float) -> tuple:
+    code_of = {name: i for i, name in enumerate(names)}
+    tanks, codes, values, timestamps = [], [], [], []
+    try:
+        text = data.decode()
+    except UnicodeDecodeError as e:
+        raise MalformedPayload(f"payload is not UTF-8: {e}")
+    for number, line in enumerate(text.splitlines(), 1):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) not in (2, 3):
+            raise MalformedPayload(f"line {number}: expected 'tank_id name=value,... [timestamp]'")
+        try:
+            timestamp = float(fields[2]) if len(fields) == 3 else now
+            for pair in fields[1].split(","):
+                name, _, value = pair.partition("=")
+                tanks.append(fields[0])
+                codes.append(code_of.get(name, -1))
+                values.append(float(value))
+                timestamps.append(timestamp)
+        except ValueError:
+            raise MalformedPayload(f"line {number}: bad number")
+    return (np.array(tanks, dtype=object), np.array(codes, dtype=np.int64),
+            np.array(values, dtype=float), np.array(timestamps, dtype=float))
+
+
+class IngestionGateway:
+    """
+    Validates pushed readings and writes them to the forecast store and sensor snapshot in batches.
+
+    Args:
+        store: ForecastStore to feed, defaults to the shared store
+        snapshot: SensorSnapshot to publish the latest values to, defaults to the shared snapshot
+        max_pending: Readings allowed to wait for the writer before senders are pushed back
+        batch_size: Most readings per observe_many call
+        flush_interval_s: Longest a reading waits for its batch to fill
+    """
+
+    def __init__(self, store=None, snapshot=None, max_pending: int = DEFAULT_MAX_PENDING,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S):
+        from utils.sensor_acquisition import sensor_snapshot
+
+        from .forecasting import get_forecast_store
+
+        self.store = store if store is not None else get_forecast_store()
+        self.snapshot = snapshot if snapshot is not None else sensor_snapshot
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.stats = {"payloads": 0, "accepted": 0, "rejected": 0, "malformed": 0,
+                      "backpressured": 0, "written": 0, "batches": 0, "alerts": 0}
+        self.alerts = collections.deque(maxlen=MAX_ALERTS)
+        self._queue = collections.deque()
+        self._pending = 0
+        self._wake = None
+        self._writer = None
+        self._closing = False
+        self._servers = []
+        self._thread = None
+        self._loop = None
+        self.ports = {}
+
+    # Intake
+
+    def submit(self, data: bytes) -> dict:
+        """
+        Decodes and queues one payload.
+
+        Returns:
+            Accepted and rejected reading counts
+
+        Raises:
+            MalformedPayload: The payload cannot be decoded
+            Backpressure: Queuing it would exceed max_pending
+        """
+        self.stats["payloads"] += 1
+        try:
+            columns, rejected = decode(data)
+        except MalformedPayload:
+            self.stats["malformed"] += 1
+            raise
+        accepted = len(columns[2])
+        if self._pending + accepted > self.max_pending:
+            self.stats["backpressured"] += 1
+            raise Backpressure(f"{self._pending} readings pending")
+        self.stats["accepted"] += accepted
+        self.stats["rejected"] += rejected
+        if accepted:
+            self._queue.append(columns)
+            self._pending += accepted
+            if self._pending >= self.batch_size and self._wake is not None:
+                self._wake.set()
+        return {"accepted": accepted, "rejected": rejected}
+
+    # Writer
+
+    def _take_batch(self):
+        parts, taken = [], 0
+        while self._queue and taken < self.batch_size:
+            part = self._queue.popleft()
+            room = self.batch_size - taken
+            if len(part[2]) > room:
+                # Split a payload larger than the rest of the batch; the remainder goes first next time
+                self._queue.appendleft(tuple(column[room:] for column in part))
+                part = tuple(column[:room] for column in part)
+            parts.append(part)
+            taken += len(part[2])
+        return [np.concatenate(column) for column in zip(*parts)] if parts else None
+
+    def _write(self, tanks, codes, values, timestamps) -> None:
+        names, _, optimal = parameter_table()
+        parameters = np.array(names, dtype=object)[codes]
+        self.store.observe_many(tanks, parameters, values, timestamps)
+
+        # Range detector: readings outside the optimal range become alerts
+        bounds = optimal[codes]
+        outside = np.flatnonzero((values < bounds[:, 0]) | (values > bounds[:, 1]))
+        for i in outside[-MAX_ALERTS:]:
+            self.alerts.append({"tank_id": tanks[i], "parameter": parameters[i], "value": float(values[i]),
+                                "timestamp": float(timestamps[i]),
+                                "bound": "low" if values[i] < bounds[i, 0] else "high"})
+        self.stats["alerts"] += len(outside)
+
+        latest = {}
+        for tank_id, parameter, value in zip(tanks, parameters, values.tolist()):
+            latest.setdefault(tank_id, {})[SNAPSHOT_NAMES.get(parameter, parameter)] = value
+        for tank_id, reading in latest.items():
+            self.snapshot.publish(tank_id, reading)
+
+    async def flush(self) -> int:
+        """Writes every queued reading. Returns how many were written."""
+        written = 0
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return written
+            try:
+                # numpy releases the GIL for much of the update, so intake keeps running meanwhile
+                await loop.run_in_executor(None, self._write, *batch)
+            except Exception as e:
+                logging.error(f"[IngestionGateway] Writing {len(batch[2])} readings failed: {e}")
+            else:
+                self.stats["written"] += len(batch[2])
+                self.stats["batches"] += 1
+                written += len(batch[2])
+            finally:
+                self._pending -= len(batch[2])
+
+    async def _run_writer(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    # Transports
+
+    async def _handle_http(self, reader, writer) -> None:
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                method, path, *_ = request.decode("latin-1").split() + ["", ""]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "payload too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                if (method, path) != ("POST", "/ingest"):
+                    await self._respond(writer, 404, {"error": "POST payloads to /ingest"})
+                else:
+                    try:
+                        await self._respond(writer, 202, self.submit(body))
+                    except MalformedPayload as e:
+                        await self._respond(writer, 400, {"error": str(e)})
+                    except Backpressure as e:
+                        await self._respond(writer, 429, {"error": str(e)}, retry_after=1)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, body: dict, retry_after: int = None, close: bool = False) -> None:
+        reasons = {202: "Accepted", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                   429: "Too Many Requests"}
+        payload = json.dumps(body).encode()
+        head = [f"HTTP/1.1 {status} {reasons[status]}", "Content-Type: application/json",
+                f"Content-Length: {len(payload)}"]
+        if retry_after is not None:
+            head.append(f"Retry-After: {retry_after}")
+        if close:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", udp_port: int = None, http_port: int = None) -> dict:
+        """Starts the writer and the requested listeners. Returns the bound ports by transport."""
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._writer = asyncio.ensure_future(self._run_writer())
+        ports = {}
+        try:
+            if udp_port is not None:
+                transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                    lambda: _DatagramIntake(self), local_addr=(host, udp_port))
+                self._servers.append(transport)
+                ports["udp"] = transport.get_extra_info("sockname")[1]
+            if http_port is not None:
+                server = await asyncio.start_server(self._handle_http, host, http_port)
+                self._servers.append(server)
+                ports["http"] = server.sockets[0].getsockname()[1]
+        except BaseException:
+            # Close whatever did start, so a failed start leaves nothing listening or running
+            await self.stop()
+            raise
+        logging.info(f"[IngestionGateway] Listening on {host} {ports}")
+        return ports
+
+    async def stop(self) -> None:
+        """Closes the listeners and writes the readings still queued."""
+        for server in self._servers:
+            server.close()
+            if hasattr(server, "wait_closed"):
+                await server.wait_closed()
+        self._servers = []
+        if self._writer is not None:
+            # Let the writer finish the batch it is on rather than cancel it mid-write
+            self._closing = True
+            self._wake.set()
+            await self._writer
+            self._writer = None
+        await self.flush()
+
+    def start_in_thread(self, host: str = "0.0.0.0", udp_port: int = None, http_port: int = None) -> dict:
+        """
+        Runs the gateway on an event loop in a daemon thread, apart from the agent's loop.
+
+        Returns:
+            The bound ports by transport
+
+        Raises:
+            OSError: A listener could not be started (e.g. the port is in use); nothing is left running
+        """
+        if self._thread is not None:
+            return self.ports
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        outcome = {}
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            try:
+                outcome["ports"] = loop.run_until_complete(self.start(host, udp_port, http_port))
+            except Exception as e:
+                outcome["error"] = e
+                loop.close()
+                return
+            finally:
+                started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=serve, name="ingestion-gateway", daemon=True)
+        thread.start()
+        started.wait()
+        if "error" in outcome:
+            thread.join()
+            logging.error(f"[IngestionGateway] Could not start on {host}: {outcome['error']}")
+            raise outcome["error"]
+        self._thread, self._loop, self.ports = thread, loop, outcome["ports"]
+        return self.ports
+
+
+class _DatagramIntake(asyncio.DatagramProtocol):
+    """Submits each datagram as one payload; UDP cannot push back, so refused payloads are dropped."""
+
+    def __init__(self, gateway: IngestionGateway):
+        self.gateway = gateway
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            self.gateway.submit(data)
+        except (MalformedPayload, Backpressure) as e:
+            logging.debug(f"[IngestionGateway] Dropped datagram from {addr}: {e}")
+
+
+def start_from_env():
+    """
+    Starts the gateway on the ports in MINDPONICS_INGEST_UDP_PORT/HTTP_PORT, if set. Returns it or None.
+    A port that cannot be bound raises, so a misconfigured gateway does not go unnoticed.
+    """
+    udp_port, http_port = os.getenv("MINDPONICS_INGEST_UDP_PORT"), os.getenv("MINDPONICS_INGEST_HTTP_PORT")
+    if not udp_port and not http_port:
+        return None
+    gateway = IngestionGateway()
+    gateway.start_in_thread(os.getenv("MINDPONICS_INGEST_HOST", "0.0.0.0"),
+                            int(udp_port) if udp_port else None, int(http_port) if http_port else None)
+    return gateway
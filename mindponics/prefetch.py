@@ -0,0 +1,172 @@
+"""Background prefetch of the sensor snapshot and diagnoses at session start.
+
+The first question of a session is usually "how is my system?", which costs
+the specialists a model round trip per sensor read and diagnosis. When a turn
+begins without a fresh snapshot (the first turn of a session, or one after the
+snapshot expired), SessionPrefetcher starts reading the sensors and running the
+deterministic diagnoses in a worker thread while the orchestrator makes its
+first model call. The result is stored in session state under
+SNAPSHOT_KEY before the orchestrator's first delegation; specialists run on a
+copy of that state, and their calls to
+
+* get_water_parameters and get_ambient_conditions,
+* diagnose_water_quality and monitor_nitrification_cycle on the prefetched readings
+
+are answered from the snapshot without running the tool, for max_age_s
+seconds. Calls with other arguments, and any call once the snapshot is older,
+run the tool as usual.
+
+Enable it with MINDPONICS_SESSION_PREFETCH=true.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+
+SNAPSHOT_KEY = "session_snapshot"
+DEFAULT_MAX_AGE_S = 120.0
+DEFAULT_WAIT_S = 5.0
+
+
+def prefetch_enabled() -> bool:
+    return os.getenv("MINDPONICS_SESSION_PREFETCH", "false").lower() in ("1", "true", "yes")
+
+
+def take_snapshot() -> dict:
+    """Reads water and climate sensors and runs the deterministic diagnoses on the readings."""
+    from .sub_agents.bacteria.agent import monitor_nitrification_cycle
+    from .sub_agents.environment.agent import get_ambient_conditions
+    from .sub_agents.water.agent import diagnose_water_quality, get_water_parameters
+
+    parameters = get_water_parameters()
+    return {
+        "taken_at": time.time(),
+        "water_parameters": parameters,
+        "water_diagnosis": diagnose_water_quality(parameters),
+        "ambient_conditions": get_ambient_conditions(),
+        "nitrification_status": monitor_nitrification_cycle(
+            parameters["ammonia"], parameters["nitrite"], parameters["nitrate"]),
+    }
+
+
+def _served_value(snapshot: dict, tool_name: str, args: dict):
+    """Returns the snapshot's answer to a tool call, or None when the snapshot cannot answer it."""
+    parameters = snapshot.get("water_parameters")
+    # The snapshot holds the default tank's readings only
+    default_tank = set(args) <= {"tank_id"} and args.get("tank_id", "default") == "default"
+    if tool_name == "get_water_parameters" and default_tank:
+        return parameters
+    if tool_name == "get_ambient_conditions" and default_tank:
+        return snapshot.get("ambient_conditions")
+    if tool_name == "diagnose_water_quality" and args.get("parameters") == parameters:
+        return snapshot.get("water_diagnosis")
+    if tool_name == "monitor_nitrification_cycle" and parameters and args == {
+            c: parameters[c] for c in ("ammonia", "nitrite", "nitrate")}:
+        return {"result": snapshot.get("nitrification_status")}
+    return None
+
+
+class SessionPrefetcher:
+    """
+    Prefetches the sensor snapshot when a session starts and answers matching tool calls from it.
+
+    Args:
+        max_age_s: Seconds after it is taken that the snapshot answers tool calls
+        wait_s: Longest the orchestrator's first delegation waits for an unfinished prefetch
+    """
+
+    def __init__(self, max_age_s: float = DEFAULT_MAX_AGE_S, wait_s: float = DEFAULT_WAIT_S):
+        self.max_age_s = max_age_s
+        self.wait_s = wait_s
+        self.counts = {"prefetched": 0, "served": 0, "expired": 0, "failed": 0}
+        self._pending = {}   # invocation_id -> future of the snapshot
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks and futures cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_pending"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def install(self, root) -> None:
+        """Starts the prefetch from root's turns and serves the snapshot to the tools of every agent below it."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        add_callbacks(root, prepend=True, before_agent_callback=self.start_turn,
+                      before_model_callback=self.store_ready, after_agent_callback=self.end_turn)
+        for agent in iter_llm_agents(root):
+            add_callbacks(agent, before_tool_callback=self.before_tool)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def start_turn(self, callback_context):
+        snapshot = callback_context.state.get(SNAPSHOT_KEY)
+        if isinstance(snapshot, dict) and time.time() - snapshot.get("taken_at", 0) <= self.max_age_s:
+            return None
+        loop = asyncio.get_running_loop()
+        self._pending[callback_context.invocation_id] = loop.run_in_executor(None, take_snapshot)
+        return None
+
+    def _store(self, state, future) -> None:
+        try:
+            state[SNAPSHOT_KEY] = future.result()
+            self._count("prefetched")
+        except Exception as e:
+            self._count("failed")
+            logging.warning(f"[SessionPrefetcher] Prefetch failed, tools will run live: {e}")
+
+    def store_ready(self, callback_context, llm_request):
+        future = self._pending.get(callback_context.invocation_id)
+        if future is not None and future.done():
+            self._store(callback_context.state, self._pending.pop(callback_context.invocation_id))
+        return None
+
+    def end_turn(self, callback_context):
+        future = self._pending.pop(callback_context.invocation_id, None)
+        if future is None:
+            return None
+        if future.done():
+            # Nothing was delegated this turn; keep the snapshot for the next one
+            self._store(callback_context.state, future)
+        else:
+            future.cancel()
+        return None
+
+    async def before_tool(self, tool, args, tool_context):
+        future = self._pending.get(tool_context.invocation_id)
+        if future is not None:
+            # The orchestrator is about to delegate: the specialist gets a copy of state, so the snapshot goes in now.
+            # Parallel delegations all wait for it; the first to resume stores it.
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.wait_s)
+            except asyncio.TimeoutError:
+                logging.warning(f"[SessionPrefetcher] Prefetch not ready after {self.wait_s:.0f}s, tools will run live")
+            except Exception:
+                pass
+            if self._pending.pop(tool_context.invocation_id, None) is not None and future.done():
+                self._store(tool_context.state, future)
+
+        snapshot = tool_context.state.get(SNAPSHOT_KEY)
+        if not isinstance(snapshot, dict):
+            return None
+        value = _served_value(snapshot, tool.name, args)
+        if value is None:
+            return None
+        if time.time() - snapshot.get("taken_at", 0) > self.max_age_s:
+            self._count("expired")
+            return None
+        self._count("served")
+        return copy.deepcopy(value)
+
+
+session_prefetcher = SessionPrefetcher()
@@ -0,0 +1,237 @@
+"""Profile a scripted conversation against root_agent and write hot-path reports.
+
+Each user turn runs through the full InMemoryRunner path with FakeLlm in place
+of Gemini, answering from a recorded script (see fake_llm.ResponseRecorder) or
+from the default policy, so the reports show our own code and ADK overhead
+rather than network time. --latency adds a synthetic model delay.
+
+For every turn the output directory receives:
+
+* turnN.prof: cProfile stats of the whole turn (open with pstats or snakeviz);
+* turnN.AGENT.prof: cProfile stats of each specialist the orchestrator delegated
+  to, re-run on its own with the same request so other agents do not mix in;
+* turnN.alloc.txt: tracemalloc summary of a second run of the turn (peak,
+  net growth and the top allocation sites), kept apart so tracing does not skew timings;
+* stacks.collapsed: samples of the running stack for all turns, prefixed with
+  the turn and the innermost running agent, for flamegraph.pl or speedscope.
+
+Usage:
+    python -m mindponics.profile [--script recorded.json] [--turns turns.txt] [--latency 0.0] [--output profile_output]
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import pathlib
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+DEFAULT_OUTPUT = pathlib.Path("profile_output")
+DEFAULT_TURNS = (
+    "What is the ammonia level in the water?",
+    "My fish are gasping and the lettuce leaves are yellow",
+    "Give me a full status report",
+)
+SAMPLE_INTERVAL_S = 0.001
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 25
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread and counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval_s: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks = Counter()
+        self.prefix = ""
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mindponics-profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    def _collapse(self, frame) -> str:
+        from google.adk.agents import BaseAgent
+
+        names, agent = [], "-"
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({pathlib.Path(code.co_filename).name}:{code.co_firstlineno})")
+            # ADK runs every agent through BaseAgent.run_async; the innermost one is the agent doing the work
+            if agent == "-" and code.co_name == "run_async" and isinstance(frame.f_locals.get("self"), BaseAgent):
+                agent = frame.f_locals["self"].name
+            frame = frame.f_back
+        return ";".join([self.prefix, f"agent:{agent}"] + names[::-1])
+
+    def write(self, path: pathlib.Path) -> None:
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())))
+
+
+def _top_functions(profile: cProfile.Profile) -> list:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{name} ({pathlib.Path(filename).name}:{line})", "calls": calls,
+                     "own_ms": round(own * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)})
+    return sorted(rows, key=lambda r: r["own_ms"], reverse=True)[:TOP_FUNCTIONS]
+
+
+def _delegations(events: list, specialists: dict) -> list:
+    """Returns (agent name, request) for every AgentTool call in a turn's events."""
+    return [
+        (part.function_call.name, (part.function_call.args or {}).get("request", ""))
+        for event in events if event.content
+        for part in event.content.parts or []
+        if part.function_call and part.function_call.name in specialists
+    ]
+
+
+async def _run_turn(runner, user_id: str, session_id: str, text: str) -> list:
+    from google.genai import types
+
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    return [event async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message)]
+
+
+def _profile_call(func):
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        result = func()
+    finally:
+        profile.disable()
+    return result, profile, time.perf_counter() - started
+
+
+def _allocations(func) -> dict:
+    tracemalloc.start(10)
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    return {
+        "peak_kib": round(peak / 1024, 1),
+        "net_kib": round(sum(d.size_diff for d in diff) / 1024, 1),
+        "top": [str(d) for d in diff[:TOP_ALLOCATIONS]],
+    }
+
+
+def run(turns: list, output: pathlib.Path, script: dict = None, latency_s: float = 0.0) -> dict:
+    """
+    Runs turns as one session and writes the reports to output.
+
+    Args:
+        turns: User messages, in order
+        output: Directory for the report files
+        script: FakeLlm script to replay, or None for the default policy
+        latency_s: Synthetic delay of every model response
+
+    Returns:
+        Summary with the wall time, top functions per agent and allocations of each turn
+    """
+    from google.adk.runners import InMemoryRunner
+    from google.adk.tools.agent_tool import AgentTool
+
+    from .agent import build_root_agent
+    from .callbacks import iter_llm_agents
+    from .fake_llm import fake_llm
+
+    output.mkdir(parents=True, exist_ok=True)
+    root = build_root_agent()
+    specialists = {
+        tool.agent.name: tool.agent
+        for agent in iter_llm_agents(root) for tool in agent.tools if isinstance(tool, AgentTool)
+    }
+    sampler = StackSampler(threading.get_ident())
+    summary = {"turns": []}
+
+    with fake_llm(root, script, latency_s=latency_s):
+        runner = InMemoryRunner(agent=root, app_name="mindponics-profile")
+        session = asyncio.run(runner.session_service.create_session(app_name=runner.app_name, user_id="profile"))
+        # Throwaway session for the tracemalloc re-runs, so the profiled session sees each turn once
+        shadow = asyncio.run(runner.session_service.create_session(app_name=runner.app_name, user_id="profile"))
+
+        for n, text in enumerate(turns, 1):
+            sampler.prefix = f"turn{n}"
+            sampler.start()
+            try:
+                events, profile, wall_s = _profile_call(
+                    lambda: asyncio.run(_run_turn(runner, "profile", session.id, text)))
+            finally:
+                sampler.stop()
+            profile.dump_stats(output / f"turn{n}.prof")
+            turn = {"turn": n, "text": text, "wall_ms": round(wall_s * 1000, 3),
+                    "agents": {root.name: _top_functions(profile)}}
+
+            for name, request in _delegations(events, specialists):
+                agent_runner = InMemoryRunner(agent=specialists[name], app_name="mindponics-profile")
+                agent_session = asyncio.run(agent_runner.session_service.create_session(
+                    app_name=agent_runner.app_name, user_id="profile"))
+                _, agent_profile, _ = _profile_call(
+                    lambda: asyncio.run(_run_turn(agent_runner, "profile", agent_session.id, request)))
+                agent_profile.dump_stats(output / f"turn{n}.{name}.prof")
+                turn["agents"][name] = _top_functions(agent_profile)
+
+            turn["allocations"] = _allocations(lambda: asyncio.run(_run_turn(runner, "profile", shadow.id, text)))
+            (output / f"turn{n}.alloc.txt").write_text(
+                f"peak {turn['allocations']['peak_kib']} KiB, net {turn['allocations']['net_kib']} KiB\n"
+                + "\n".join(turn["allocations"]["top"]) + "\n"
+            )
+            summary["turns"].append(turn)
+
+    sampler.write(output / "stacks.collapsed")
+    (output / "summary.json").write_text(json.dumps(summary, indent=2) + "\n")
+    return summary
+
+
+def main() -> None:
+    from .fake_llm import load_script
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", type=pathlib.Path, help="FakeLlm script recorded with ResponseRecorder")
+    parser.add_argument("--turns", type=pathlib.Path, help="Text file with one user message per line")
+    parser.add_argument("--latency", type=float, default=0.0, help="Synthetic model latency in seconds")
+    parser.add_argument("--output", type=pathlib.Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    turns = [line.strip() for line in args.turns.read_text().splitlines() if line.strip()] if args.turns else list(DEFAULT_TURNS)
+    summary = run(turns, args.output, load_script(args.script) if args.script else None, args.latency)
+    for turn in summary["turns"]:
+        print(f"turn {turn['turn']}: {turn['wall_ms']:.1f} ms, peak {turn['allocations']['peak_kib']} KiB  {turn['text']!r}")
+        for agent, rows in turn["agents"].items():
+            hottest = rows[0] if rows else None
+            if hottest:
+                print(f"    {agent:20} hottest {hottest['function']} ({hottest['own_ms']} ms own)")
+    print(f"Reports written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Progressive responses: stream a short section per specialist as it finishes.
+
+ProgressiveOrchestrator wraps the AquaMaestro LlmAgent. While the orchestrator
+runs, an after_tool callback captures each AgentTool result (HydroGuardian,
+PiscinePro, ...) the moment that specialist returns and the wrapper yields it to
+the client as a partial event, ahead of the orchestrator's final synthesis.
+Partial events are streamed but not stored in the session.
+
+Enable it with MINDPONICS_PROGRESSIVE_RESPONSES=true.
+"""
+
+import asyncio
+import os
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+DOMAIN_LABELS = {
+    "HydroGuardian": "Water quality",
+    "PiscinePro": "Fish health",
+    "FloraFriend": "Plant growth",
+    "bacteria_agent": "Biofilter",
+    "ClimateController": "Climate",
+}
+
+MAX_SECTION_CHARS = 400
+
+# invocation_id -> queue of the ProgressiveOrchestrator run serving it
+_section_queues = {}
+
+
+def format_section(agent_name: str, response) -> str:
+    """Condenses a specialist's answer to a short labelled section."""
+    if isinstance(response, dict):
+        response = response.get("result", response)
+    text = str(response).strip().split("\n\n", 1)[0]
+    if len(text) > MAX_SECTION_CHARS:
+        text = text[:MAX_SECTION_CHARS].rsplit(" ", 1)[0] + "…"
+    label = DOMAIN_LABELS.get(agent_name, agent_name)
+    return f"**{label}** ({agent_name}): {text}\n\n"
+
+
+def _capture_section(tool, args, tool_context, tool_response):
+    queue = _section_queues.get(tool_context.invocation_id)
+    if queue is not None and isinstance(tool, AgentTool):
+        queue.put_nowait(("section", format_section(tool.name, tool_response)))
+    return None
+
+
+def progressive_mode_enabled() -> bool:
+    return os.getenv("MINDPONICS_PROGRESSIVE_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+
+class ProgressiveOrchestrator(BaseAgent):
+    """Runs the orchestrator and streams each specialist's section as soon as it returns."""
+
+    def __init__(self, orchestrator: LlmAgent, **kwargs):
+        from .callbacks import add_callbacks
+
+        add_callbacks(orchestrator, prepend=True, after_tool_callback=_capture_section)
+        super().__init__(
+            name=kwargs.pop("name", f"{orchestrator.name}Live"),
+            description=orchestrator.description,
+            sub_agents=[orchestrator],
+            **kwargs,
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        orchestrator = self.sub_agents[0]
+        queue = asyncio.Queue()
+        _section_queues[ctx.invocation_id] = queue
+
+        async def pump():
+            try:
+                async for event in orchestrator.run_async(ctx):
+                    # Wait until the runner has handled the event before the orchestrator continues
+                    handled = asyncio.get_running_loop().create_future()
+                    await queue.put(("event", (event, handled)))
+                    await handled
+            finally:
+                await queue.put(("done", None))
+
+        task = asyncio.create_task(pump())
+        try:
+            while True:
+                kind, item = await queue.get()
+                if kind == "done":
+                    break
+                if kind == "section":
+                    yield Event(
+                        invocation_id=ctx.invocation_id,
+                        author=orchestrator.name,
+                        branch=ctx.branch,
+                        partial=True,
+                        content=types.Content(role="model", parts=[types.Part(text=item)]),
+                    )
+                else:
+                    event, handled = item
+                    yield event
+                    handled.set_result(None)
+            await task
+        finally:
+            _section_queues.pop(ctx.invocation_id, None)
+            if not task.done():
+                task.cancel()
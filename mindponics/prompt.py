@@ -24,6 +24,8 @@ Delegation Guidelines:
 - Bacteria-related queries (nitrification, biofilter): Delegate to BacteriaAgent
 - Environment-related queries (temperature, humidity, light cycles): Delegate to EnvironmentAgent
 - Complex queries involving multiple domains: Delegate to relevant agents and synthesize responses
+- Fish-plant pairing queries (e.g. "which plants can I grow with trout?"): Answer directly with the
+  find_compatible_species tool instead of reasoning over species data yourself
 
 Specialized Agents Overview:
 1. HydroGuardian (WaterQualityAgent): 
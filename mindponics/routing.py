@@ -0,0 +1,206 @@
+"""Per-request model tiering between a fast model and gemini-2.5-pro.
+
+A cheap local classifier looks at the request text and the session's latest
+diagnosis and picks a tier before every model call. Routine single-domain
+questions go to the fast model; long, multi-domain or critical cases go to the
+pro model. Latency and token counts are recorded per tier so the policy can be
+tuned from real traffic.
+
+Routing is on by default; set MINDPONICS_MODEL_ROUTING=false to use each
+agent's own model instead.
+"""
+
+import contextlib
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+
+MODEL_TIERS = {
+    "fast": "gemini-1.5-flash",
+    "pro": "gemini-2.5-pro",
+}
+
+# Keywords that mark a query as touching a domain
+DOMAIN_KEYWORDS = {
+    "water": ("water", "ph", "ammonia", "nitrite", "nitrate", "oxygen", "hardness", "alkalinity"),
+    "fish": ("fish", "tilapia", "trout", "feed", "feeding", "gill", "fry", "fingerling", "disease"),
+    "plant": ("plant", "lettuce", "tomato", "leaf", "leaves", "nutrient", "harvest", "seedling", "yellow"),
+    "bacteria": ("bacteria", "biofilter", "nitrification", "cycle", "cycling"),
+    "environment": ("temperature", "humidity", "climate", "greenhouse", "light", "ventilation", "heating"),
+}
+
+# Session state keys that may hold the current diagnosis
+DIAGNOSIS_STATE_KEYS = (
+    "water_agent_output",
+    "bacteria_agent_output",
+    "environment_agent_output",
+    "fish_agent_output",
+    "plant_agent_output",
+)
+
+# Tier forced on the model calls of the current task, e.g. the fast hedge of a slow delegation
+_forced_tier = contextvars.ContextVar("mindponics_forced_tier", default=None)
+
+LONG_QUERY_CHARS = 400
+MULTI_DOMAIN_THRESHOLD = 2
+# A call still pending after this long was cancelled or lost and is no longer timed
+PENDING_TTL_S = 600.0
+
+_WORD_RE = re.compile(r"[a-z]+")
+# Structured severity fields or a "CRITICAL:" marker; prose such as "no critical issues" does not match
+_CRITICAL_RE = re.compile(r"""(?i:severity["']?\s*[:=]\s*["']?critical)|\bCRITICAL:""")
+
+
+def routing_enabled() -> bool:
+    return os.getenv("MINDPONICS_MODEL_ROUTING", "true").lower() in ("1", "true", "yes")
+
+
+def detect_domains(text: str) -> list:
+    """Returns the domains whose keywords appear in the text."""
+    words = set(_WORD_RE.findall(text.lower()))
+    return [domain for domain, keywords in DOMAIN_KEYWORDS.items() if words.intersection(keywords)]
+
+
+def has_critical_issues(state) -> bool:
+    """Checks the stored diagnoses in session state for critical issues."""
+    for key in DIAGNOSIS_STATE_KEYS:
+        value = state.get(key)
+        if isinstance(value, dict):
+            issues = value.get("issues") or value.get("diagnosis", {}).get("issues", [])
+            if any(issue.get("severity") == "critical" for issue in issues if isinstance(issue, dict)):
+                return True
+        elif isinstance(value, str) and _CRITICAL_RE.search(value):
+            return True
+    return False
+
+
+def classify_query(text: str, state=None) -> dict:
+    """
+    Picks a model tier for a request.
+
+    Returns:
+        Dictionary with the chosen "tier" and the features behind it
+    """
+    domains = detect_domains(text)
+    critical = has_critical_issues(state or {})
+    if critical:
+        tier, reason = "pro", "critical_issues"
+    elif len(domains) >= MULTI_DOMAIN_THRESHOLD:
+        tier, reason = "pro", "multi_domain"
+    elif len(text) > LONG_QUERY_CHARS:
+        tier, reason = "pro", "long_query"
+    else:
+        tier, reason = "fast", "routine"
+    return {"tier": tier, "reason": reason, "domains": domains, "length": len(text), "critical": critical}
+
+
+@contextlib.contextmanager
+def forced_tier(tier: str):
+    """Routes every model call made in this context, including tasks created in it, to `tier`."""
+    token = _forced_tier.set(tier)
+    try:
+        yield
+    finally:
+        _forced_tier.reset(token)
+
+
+def _content_text(content) -> str:
+    if content is None or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text)
+
+
+class ModelRouter:
+    """
+    Chooses the model for every LLM call of the agents it is installed on and
+    records per-tier latency and token usage.
+
+    Args:
+        tiers: Tier name -> model name, defaults to MODEL_TIERS
+        classifier: Callable(text, state) -> dict with a "tier" key
+    """
+
+    def __init__(self, tiers: dict = None, classifier=classify_query):
+        self.tiers = dict(tiers or MODEL_TIERS)
+        self.classifier = classifier
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {
+            tier: {"calls": 0, "latency_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0}
+            for tier in self.tiers
+        }
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def install(self, root) -> None:
+        """Adds the routing callbacks to root and every agent below it."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        for agent in iter_llm_agents(root):
+            add_callbacks(agent, before_model_callback=self.before_model, after_model_callback=self.after_model,
+                          on_model_error_callback=self.on_model_error)
+
+    def before_model(self, callback_context, llm_request):
+        decision = self.classifier(_content_text(callback_context.user_content), callback_context.state)
+        if _forced_tier.get() is not None:
+            decision = {**decision, "tier": _forced_tier.get(), "reason": "forced"}
+        llm_request.model = self.tiers[decision["tier"]]
+        now = time.perf_counter()
+        with self._lock:
+            # Cancelled calls reach neither after_model nor on_model_error
+            for key in [k for k, (_, started) in self._pending.items() if now - started > PENDING_TTL_S]:
+                del self._pending[key]
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = (decision, now)
+        logging.debug(f"[ModelRouter] {callback_context.agent_name} -> {llm_request.model} ({decision['reason']})")
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        with self._lock:
+            pending = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+            if pending is None:
+                return None
+            decision, started = pending
+            latency = time.perf_counter() - started
+            usage = llm_response.usage_metadata
+            prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+            completion_tokens = (usage.candidates_token_count or 0) if usage else 0
+            stats = self._stats[decision["tier"]]
+            stats["calls"] += 1
+            stats["latency_s"] += latency
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+        logging.info(
+            f"[ModelRouter] agent={callback_context.agent_name} tier={decision['tier']} "
+            f"reason={decision['reason']} latency_ms={latency * 1000:.0f} "
+            f"prompt_tokens={prompt_tokens} completion_tokens={completion_tokens}"
+        )
+        return None
+
+    def on_model_error(self, callback_context, llm_request, error):
+        with self._lock:
+            self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
+
+    def stats(self) -> dict:
+        """Returns per-tier call counts, mean latency and token totals."""
+        with self._lock:
+            return {
+                tier: {**s, "mean_latency_s": s["latency_s"] / s["calls"] if s["calls"] else 0.0}
+                for tier, s in self._stats.items()
+            }
+
+
+model_router = ModelRouter()
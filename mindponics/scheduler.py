@@ -0,0 +1,327 @@
+"""Model request scheduler: single-flight coalescing, per-model rate limits and priorities.
+
+ModelScheduler wraps the model of every LlmAgent in a ScheduledLlm. Before a
+request reaches the real model it:
+
+* coalesces identical in-flight requests: when operators ask the orchestrator
+  the same question at the same time, one call is made and every caller gets
+  a copy of its response (non-streaming requests only);
+* waits for a per-model token bucket on requests per minute and, optionally,
+  prompt tokens per minute, so bursts queue locally instead of failing with
+  quota errors; a quota error that still happens pauses the model's bucket and
+  the request is retried with backoff;
+* serves waiting critical-alert turns before routine ones. A turn is critical
+  when the stored diagnoses report a critical issue or the user message carries
+  a "CRITICAL:" marker (see routing.has_critical_issues).
+
+Queue wait is recorded per model and priority (stats(), and the
+mindponics_model_queue_wait_seconds histogram with MINDPONICS_TELEMETRY=true).
+
+Enable it with MINDPONICS_MODEL_SCHEDULER=true. Limits come from
+MINDPONICS_MODEL_LIMITS as comma-separated model=requests_per_minute[:tokens_per_minute],
+e.g. "gemini-2.5-pro=60:1000000,gemini-1.5-flash=600"; models not listed are not rate limited.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+from .context_budget import estimate_tokens
+
+CRITICAL, ROUTINE = 0, 1
+PRIORITY_NAMES = {CRITICAL: "critical", ROUTINE: "routine"}
+MAX_QUOTA_RETRIES = 3
+QUOTA_BACKOFF_S = 2.0
+
+# Priority of the model call the current task is about to make, set by ModelScheduler.mark_priority
+_priority = contextvars.ContextVar("mindponics_model_priority", default=ROUTINE)
+
+
+def parse_limits(spec: str) -> dict:
+    """Parses "model=rpm[:tpm],..." into model -> (requests per minute, tokens per minute or None)."""
+    limits = {}
+    for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+        model, _, values = item.partition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[model.strip()] = (float(rpm), float(tpm) if tpm else None)
+    return limits
+
+
+def scheduler_enabled() -> bool:
+    return os.getenv("MINDPONICS_MODEL_SCHEDULER", "false").lower() in ("1", "true", "yes")
+
+
+def _is_quota_error(error: Exception) -> bool:
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def request_key(llm_request: LlmRequest):
+    """Returns a digest identifying the request's model, contents and config, or None if it cannot be serialized."""
+    try:
+        payload = llm_request.model_dump_json(exclude={"tools_dict", "live_connect_config"}, exclude_none=True)
+    except Exception:
+        return None
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TokenBucket:
+    """Refills `rate` units per second up to `burst`; the level goes negative while paused."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.level = burst
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.burst, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        # A request larger than the burst waits for a full bucket rather than forever
+        amount = min(amount, self.burst)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.burst)
+
+    def pause(self, seconds: float) -> None:
+        self._refill()
+        self.level = min(self.level, 0.0) - seconds * self.rate
+
+
+class ModelScheduler:
+    """
+    Coalesces, rate-limits and prioritizes the model requests of the agents it is installed on.
+
+    Args:
+        limits: Model -> (requests per minute, prompt tokens per minute or None)
+        coalesce: Whether identical in-flight requests share one call
+    """
+
+    def __init__(self, limits: dict = None, coalesce: bool = True):
+        self.limits = dict(limits or {})
+        self.coalesce = coalesce
+        self._buckets = {}
+        self._waiting = {}    # model -> heap of [priority, seq, wake-up event]
+        self._inflight = {}   # request key -> future with the leader's responses
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __getstate__(self):
+        # Locks, counters and futures cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"], state["_seq"]
+        state["_waiting"], state["_inflight"], state["_buckets"] = {}, {}, {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    def install(self, root) -> None:
+        """Wraps the model of root and every agent below it, and marks critical turns before each call."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        for agent in iter_llm_agents(root):
+            if not isinstance(agent.model, ScheduledLlm):
+                agent.model = ScheduledLlm(inner=agent.canonical_model, scheduler=self)
+            add_callbacks(agent, before_model_callback=self.mark_priority)
+
+    def mark_priority(self, callback_context, llm_request):
+        from .routing import _CRITICAL_RE, _content_text, has_critical_issues
+
+        critical = has_critical_issues(callback_context.state) or bool(
+            _CRITICAL_RE.search(_content_text(callback_context.user_content)))
+        _priority.set(CRITICAL if critical else ROUTINE)
+        return None
+
+    # Statistics
+
+    def _record(self, model: str, **values) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(model, {
+                "requests": 0, "coalesced": 0, "quota_retries": 0,
+                "queue_wait_s": 0.0, "max_queue_wait_s": 0.0,
+            })
+            for name, value in values.items():
+                if name == "queue_wait_s":
+                    stats["max_queue_wait_s"] = max(stats["max_queue_wait_s"], value)
+                stats[name] += value
+
+    def stats(self) -> dict:
+        """Returns per-model request, coalescing, retry and queue-wait figures."""
+        with self._lock:
+            return {
+                model: {**s, "mean_queue_wait_s": s["queue_wait_s"] / s["requests"] if s["requests"] else 0.0}
+                for model, s in self._stats.items()
+            }
+
+    # Rate limiting
+
+    def _bucket_wait(self, model: str, tokens: int) -> float:
+        rpm, tpm = self.limits[model]
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            buckets = self._buckets[model] = (
+                TokenBucket(rpm / 60, max(rpm / 60, 1.0)),
+                TokenBucket(tpm / 60, tpm / 60) if tpm else None,
+            )
+        wait = max(bucket.wait_time(amount) for bucket, amount in ((buckets[0], 1), (buckets[1], tokens)) if bucket)
+        if wait == 0:
+            for bucket, amount in ((buckets[0], 1), (buckets[1], tokens)):
+                if bucket:
+                    bucket.take(amount)
+        return wait
+
+    async def acquire(self, model: str, tokens: int, priority: int) -> float:
+        """Waits for the model's rate limit, critical requests first. Returns the seconds waited."""
+        started = time.perf_counter()
+        if model not in self.limits:
+            return 0.0
+        heap = self._waiting.setdefault(model, [])
+        entry = [priority, next(self._seq), asyncio.Event()]
+        heapq.heappush(heap, entry)
+        if heap[0] is entry and len(heap) > 1:
+            # Wake the waiter this one displaced, so it sees it is no longer first
+            for other in heap[1:]:
+                other[2].set()
+        try:
+            while True:
+                entry[2].clear()
+                if heap[0] is not entry:
+                    await entry[2].wait()
+                    continue
+                wait = self._bucket_wait(model, tokens)
+                if wait == 0:
+                    heapq.heappop(heap)
+                    if heap:
+                        heap[0][2].set()
+                    return time.perf_counter() - started
+                try:
+                    await asyncio.wait_for(entry[2].wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            if entry in heap:
+                heap.remove(entry)
+                heapq.heapify(heap)
+                if heap:
+                    heap[0][2].set()
+            raise
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Stops admitting requests for a model for `seconds`, e.g. after a quota error."""
+        if model in self.limits:
+            self._bucket_wait(model, 0)   # creates the buckets
+            for bucket in self._buckets[model]:
+                if bucket:
+                    bucket.pause(seconds)
+
+    # Requests
+
+    async def _call(self, inner: BaseLlm, llm_request: LlmRequest, stream: bool) -> AsyncGenerator[LlmResponse, None]:
+        model = llm_request.model or inner.model
+        priority = _priority.get()
+        tokens = estimate_tokens([c.model_dump(exclude_none=True) for c in llm_request.contents])
+        for attempt in range(MAX_QUOTA_RETRIES + 1):
+            waited = await self.acquire(model, tokens, priority)
+            self._record(model, requests=1, queue_wait_s=waited)
+            self._publish(model, priority, waited)
+            yielded = False
+            try:
+                async for response in inner.generate_content_async(llm_request, stream=stream):
+                    yielded = True
+                    yield response
+                return
+            except Exception as e:
+                if yielded or not _is_quota_error(e) or attempt == MAX_QUOTA_RETRIES:
+                    raise
+                backoff = QUOTA_BACKOFF_S * 2 ** attempt
+                self.pause(model, backoff)
+                self._record(model, quota_retries=1)
+                logging.warning(f"[ModelScheduler] Quota error on {model}, retrying in {backoff:.0f}s: {e}")
+                if model not in self.limits:
+                    await asyncio.sleep(backoff)
+
+    async def generate(self, inner: BaseLlm, llm_request: LlmRequest, stream: bool) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request) if self.coalesce and not stream else None
+        if key is None:
+            async for response in self._call(inner, llm_request, stream):
+                yield response
+            return
+
+        leader = self._inflight.get(key)
+        if leader is not None and not leader.done():
+            try:
+                responses = await asyncio.shield(leader)
+            except asyncio.CancelledError:
+                if not leader.cancelled():
+                    raise
+                responses = None   # the leader was cancelled; make the call ourselves
+            if responses is not None:
+                self._record(llm_request.model or inner.model, coalesced=1)
+                for response in responses:
+                    yield response.model_copy(deep=True)
+                return
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            responses = [response async for response in self._call(inner, llm_request, stream)]
+            future.set_result(responses)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()   # retrieved, so an unawaited leader does not log a warning
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        for response in responses:
+            yield response
+
+    def _publish(self, model: str, priority: int, waited: float) -> None:
+        from .telemetry import telemetry, telemetry_enabled
+
+        if telemetry_enabled():
+            telemetry.observe("mindponics_model_queue_wait_seconds",
+                              (("model", model), ("priority", PRIORITY_NAMES[priority])), waited)
+
+
+class ScheduledLlm(BaseLlm):
+    """Passes an agent's model requests through a ModelScheduler."""
+
+    inner: BaseLlm
+    scheduler: Any
+    model: str = ""
+
+    def model_post_init(self, __context) -> None:
+        self.model = self.model or self.inner.model
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.scheduler.generate(self.inner, llm_request, stream):
+            yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+model_scheduler = ModelScheduler(parse_limits(os.getenv("MINDPONICS_MODEL_LIMITS", "")))
@@ -0,0 +1,403 @@
+"""Persistent local session service backed by SQLite in WAL mode.
+
+SQLiteSessionService keeps sessions, their events and the session, user and
+app state on disk, so local runs keep their history and `*_agent_output` state
+across restarts instead of holding everything in RAM like InMemorySessionService.
+
+* Write-behind: append_event updates the in-memory session and queues the
+  event and its state delta. A writer thread drains the queue in batches, one
+  transaction per batch, and repeated writes to a state key within a batch are
+  coalesced into one row. A crash loses at most the last unflushed batch.
+* Hot sessions are served from an LRU cache without touching the database.
+  Cache misses wait for queued writes and read the database in a worker
+  thread, so the event loop keeps serving other sessions meanwhile.
+* Sessions idle for longer than idle_s leave the cache. Their stored events
+  are compacted to the last keep_events (state is stored separately, so a
+  resumed session keeps all of it) and the WAL is checkpointed.
+
+Usage:
+    runner = Runner(agent=root_agent, app_name="mindponics", session_service=SQLiteSessionService("sessions.db"))
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT, user_id TEXT, id TEXT, last_update_time REAL,
+    PRIMARY KEY (app_name, user_id, id));
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT, user_id TEXT, session_id TEXT, seq INTEGER, data TEXT,
+    PRIMARY KEY (app_name, user_id, session_id, seq));
+CREATE TABLE IF NOT EXISTS session_state (
+    app_name TEXT, user_id TEXT, session_id TEXT, key TEXT, value TEXT,
+    PRIMARY KEY (app_name, user_id, session_id, key));
+CREATE TABLE IF NOT EXISTS user_state (
+    app_name TEXT, user_id TEXT, key TEXT, value TEXT, PRIMARY KEY (app_name, user_id, key));
+CREATE TABLE IF NOT EXISTS app_state (
+    app_name TEXT, key TEXT, value TEXT, PRIMARY KEY (app_name, key));
+"""
+
+_UPSERT = {
+    "session": "INSERT OR REPLACE INTO session_state VALUES (?, ?, ?, ?, ?)",
+    "user": "INSERT OR REPLACE INTO user_state VALUES (?, ?, ?, ?)",
+    "app": "INSERT OR REPLACE INTO app_state VALUES (?, ?, ?)",
+}
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_IDLE_S = 900.0
+DEFAULT_KEEP_EVENTS = 200
+DEFAULT_BATCH_DELAY_S = 0.02
+MAX_BATCH = 500
+
+
+def _split_state(state: Optional[dict]) -> dict:
+    """Splits a state dict into app, user and session parts, dropping temp keys."""
+    parts = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            parts["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            parts["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            parts["session"][key] = value
+    return parts
+
+
+class _Entry:
+    """Cached storage copy of a session."""
+
+    __slots__ = ("session", "next_seq", "last_access")
+
+    def __init__(self, session: Session, next_seq: int):
+        self.session = session
+        self.next_seq = next_seq
+        self.last_access = time.monotonic()
+
+
+class SQLiteSessionService(BaseSessionService):
+    """
+    Session service storing sessions in a SQLite database with write-behind batching.
+
+    Args:
+        path: Database file
+        cache_size: Sessions kept in memory
+        idle_s: Seconds without access after which a session leaves the cache and is compacted
+        keep_events: Stored events kept per session when it is compacted
+        batch_delay_s: How long the writer waits for more writes before committing a batch
+    """
+
+    def __init__(self, path, cache_size: int = DEFAULT_CACHE_SIZE, idle_s: float = DEFAULT_IDLE_S,
+                 keep_events: int = DEFAULT_KEEP_EVENTS, batch_delay_s: float = DEFAULT_BATCH_DELAY_S):
+        self.path = str(path)
+        self.cache_size = cache_size
+        self.idle_s = idle_s
+        self.keep_events = keep_events
+        self.batch_delay_s = batch_delay_s
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "batches": 0, "writes": 0}
+        self._cache = OrderedDict()   # (app_name, user_id, session_id) -> _Entry, least recently used first
+        self._app_state = {}
+        self._user_state = {}
+        self._last_sweep = time.monotonic()
+
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+        self._reader_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="mindponics-sessions", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL stays consistent and only fsyncs at checkpoints
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # Write-behind
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                self._queue.task_done()
+                break
+            time.sleep(self.batch_delay_s)
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            try:
+                self._write_batch(connection, [op for op in batch if op is not None])
+            except Exception as e:
+                logging.error(f"[SQLiteSessionService] Writing {len(batch)} operations failed: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                break
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list) -> None:
+        state = {}   # (table, key columns) -> value; later writes to a key replace earlier ones
+
+        def write_state():
+            for (table, *key), value in state.items():
+                connection.execute(_UPSERT[table], (*key, json.dumps(value, default=str)))
+            state.clear()
+
+        connection.execute("BEGIN")
+        try:
+            for op, key, *payload in batch:
+                app_name, user_id, session_id = key
+                if op in ("create", "event"):
+                    parts, timestamp = payload[-2], payload[-1]
+                    if op == "event":
+                        seq, event = payload[0], payload[1]
+                        connection.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)",
+                                           (*key, seq, event.model_dump_json(exclude_none=True)))
+                    connection.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", (*key, timestamp))
+                    for name, value in parts["session"].items():
+                        state[("session", app_name, user_id, session_id, name)] = value
+                    for name, value in parts["user"].items():
+                        state[("user", app_name, user_id, name)] = value
+                    for name, value in parts["app"].items():
+                        state[("app", app_name, name)] = value
+                    continue
+                write_state()
+                if op == "delete":
+                    for table, column in (("sessions", "id"), ("events", "session_id"), ("session_state", "session_id")):
+                        connection.execute(f"DELETE FROM {table} WHERE app_name=? AND user_id=? AND {column}=?", key)
+                elif op == "compact":
+                    connection.execute(
+                        "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=? AND seq < ("
+                        "SELECT MIN(seq) FROM (SELECT seq FROM events WHERE app_name=? AND user_id=? AND session_id=? "
+                        "ORDER BY seq DESC LIMIT ?))",
+                        (*key, *key, payload[0]),
+                    )
+            write_state()
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(batch)
+        if any(op == "compact" for op, *_ in batch):
+            connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def flush_sync(self) -> None:
+        """Blocks until every queued write is committed."""
+        self._queue.join()
+
+    async def flush(self):
+        await asyncio.to_thread(self.flush_sync)
+
+    def close(self) -> None:
+        """Commits the queued writes and stops the writer."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._reader_lock:
+            self._reader.close()
+
+    # Cache
+
+    def _touch(self, key: tuple) -> Optional[_Entry]:
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            entry.last_access = time.monotonic()
+        return entry
+
+    def _remember(self, key: tuple, entry: _Entry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.stats["evicted"] += 1
+        self._sweep_idle()
+
+    def _sweep_idle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < min(self.idle_s, 60.0):
+            return
+        self._last_sweep = now
+        # Least recently used first, so the scan stops at the first session still in use
+        while self._cache:
+            key, entry = next(iter(self._cache.items()))
+            if now - entry.last_access < self.idle_s:
+                break
+            del self._cache[key]
+            self.stats["evicted"] += 1
+            self._queue.put_nowait(("compact", key, self.keep_events))
+
+    def evict_idle(self) -> None:
+        """Evicts and compacts idle sessions now rather than on the next cache insert."""
+        self._last_sweep = float("-inf")
+        self._sweep_idle()
+
+    def _read_session(self, key: tuple) -> Optional[_Entry]:
+        """Reads a session from the database. Blocks, so it runs in a worker thread."""
+        # Writes queued for this session must land before it is read back
+        self.flush_sync()
+        with self._reader_lock:
+            row = self._reader.execute(
+                "SELECT last_update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?", key).fetchone()
+            if row is None:
+                return None
+            state = self._reader.execute(
+                "SELECT key, value FROM session_state WHERE app_name=? AND user_id=? AND session_id=?", key).fetchall()
+            events = self._reader.execute(
+                "SELECT seq, data FROM events WHERE app_name=? AND user_id=? AND session_id=? ORDER BY seq", key).fetchall()
+        session = Session(
+            app_name=key[0], user_id=key[1], id=key[2], last_update_time=row[0],
+            state={name: json.loads(value) for name, value in state},
+            events=[Event.model_validate_json(data) for _, data in events],
+        )
+        return _Entry(session, events[-1][0] + 1 if events else 0)
+
+    async def _load(self, key: tuple) -> Optional[_Entry]:
+        entry = self._touch(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        entry = await asyncio.to_thread(self._read_session, key)
+        # Another call may have loaded or created the session while this one read it; its copy is current
+        cached = self._touch(key)
+        if cached is not None:
+            return cached
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _shared_state(self, app_name: str, user_id: str) -> tuple:
+        """Returns the app and user state dicts, loading them on first use."""
+        if app_name not in self._app_state:
+            with self._reader_lock:
+                rows = self._reader.execute("SELECT key, value FROM app_state WHERE app_name=?", (app_name,)).fetchall()
+            self._app_state[app_name] = {name: json.loads(value) for name, value in rows}
+        if (app_name, user_id) not in self._user_state:
+            with self._reader_lock:
+                rows = self._reader.execute(
+                    "SELECT key, value FROM user_state WHERE app_name=? AND user_id=?", (app_name, user_id)).fetchall()
+            self._user_state[(app_name, user_id)] = {name: json.loads(value) for name, value in rows}
+        return self._app_state[app_name], self._user_state[(app_name, user_id)]
+
+    def _view(self, session: Session, with_events: bool = True) -> Session:
+        """Returns a copy of a stored session with the app and user state merged in."""
+        view = session.model_copy(deep=False)
+        view.events = list(session.events) if with_events else []
+        view.state = dict(session.state)
+        app_state, user_state = self._shared_state(session.app_name, session.user_id)
+        view.state.update({State.APP_PREFIX + name: value for name, value in app_state.items()})
+        view.state.update({State.USER_PREFIX + name: value for name, value in user_state.items()})
+        return view
+
+    # BaseSessionService
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        given = session_id.strip() if session_id else ""
+        session_id = given or str(uuid.uuid4())
+        key = (app_name, user_id, session_id)
+        # Only client-chosen ids can collide, so generated ones skip the lookup
+        if given and await self._load(key) is not None:
+            from google.adk.errors.already_exists_error import AlreadyExistsError
+
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        parts = _split_state(copy.deepcopy(state))
+        app_state, user_state = self._shared_state(app_name, user_id)
+        app_state.update(parts["app"])
+        user_state.update(parts["user"])
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=parts["session"],
+                          last_update_time=time.time())
+        self._remember(key, _Entry(session, 0))
+        self._queue.put_nowait(("create", key, parts, session.last_update_time))
+        return self._view(session)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        entry = await self._load((app_name, user_id, session_id))
+        if entry is None:
+            return None
+        view = self._view(entry.session)
+        if config is not None:
+            if config.num_recent_events is not None:
+                view.events = view.events[-config.num_recent_events:] if config.num_recent_events else []
+            if config.after_timestamp:
+                view.events = [e for e in view.events if e.timestamp >= config.after_timestamp]
+        return view
+
+    def _read_listing(self, app_name: str, user_id: Optional[str]) -> list:
+        """Reads the sessions of an app or user without their events. Blocks, so it runs in a worker thread."""
+        self.flush_sync()
+        query, params = "SELECT user_id, id, last_update_time FROM sessions WHERE app_name=?", (app_name,)
+        if user_id is not None:
+            query, params = query + " AND user_id=?", (app_name, user_id)
+        listing = []
+        with self._reader_lock:
+            for uid, sid, last_update_time in self._reader.execute(query, params).fetchall():
+                key = (app_name, uid, sid)
+                state = self._reader.execute(
+                    "SELECT key, value FROM session_state WHERE app_name=? AND user_id=? AND session_id=?", key
+                ).fetchall()
+                listing.append((key, Session(app_name=app_name, user_id=uid, id=sid, last_update_time=last_update_time,
+                                             state={name: json.loads(value) for name, value in state})))
+        return listing
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        listing = await asyncio.to_thread(self._read_listing, app_name, user_id)
+        sessions = []
+        for key, session in listing:
+            # Cached sessions may hold writes the database does not have yet
+            entry = self._touch(key)
+            sessions.append(self._view(entry.session if entry is not None else session, with_events=False))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._cache.pop(key, None)
+        self._queue.put_nowait(("delete", key))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        entry = await self._load(key)
+        if entry is None:
+            logging.warning(f"[SQLiteSessionService] Session {session.id} not found, event not stored")
+            return event
+        # Updates the caller's session and trims temp keys from the delta
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        stored = entry.session
+        if stored is not session:
+            stored.events.append(event)
+        stored.last_update_time = event.timestamp
+        parts = _split_state(event.actions.state_delta if event.actions else None)
+        if parts["session"] and stored is not session:
+            stored.state.update(parts["session"])
+        app_state, user_state = self._shared_state(session.app_name, session.user_id)
+        app_state.update(parts["app"])
+        user_state.update(parts["user"])
+
+        self._queue.put_nowait(("event", key, entry.next_seq, event, parts, event.timestamp))
+        entry.next_seq += 1
+        return event
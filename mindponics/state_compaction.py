@@ -0,0 +1,218 @@
+"""Session state size accounting and compaction.
+
+Every agent's output_key (water_agent_output, fish_agent_output, ...,
+mindponics_output) is overwritten with a full answer on each turn that reaches
+that agent, and other keys can grow without bound in long operator sessions.
+StateCompactor runs at the end of every root agent turn and:
+
+* folds each agent output replaced during the turn into a short summary kept
+  under AGENT_OUTPUT_HISTORY_KEY (the latest max_history per key), so the
+  session remembers earlier answers without storing them in full;
+* enforces a byte cap per key. Strings are cut; dicts and lists keep their
+  type and keys, with long strings inside them cut and trailing items
+  dropped, so tools and callbacks that read them (e.g. the router's check of
+  stored diagnoses) still find structured values;
+* measures the session's state bytes per key and records them, so the memory a
+  worker needs for N sessions can be bounded. With MINDPONICS_TELEMETRY=true the
+  sizes also go to the mindponics_session_state_bytes histogram.
+
+Compaction is on by default; set MINDPONICS_STATE_COMPACTION=false to leave
+session state as the agents write it.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+AGENT_OUTPUT_HISTORY_KEY = "agent_output_history"
+DEFAULT_KEY_CAP_BYTES = 8192
+SUMMARY_CHARS = 240
+TRUNCATED_KEY = "_truncated"   # added to a capped dict, saying how many keys were dropped
+MIN_STRING_CHARS = 16          # strings inside a capped value are not cut shorter than this
+TRACKED_SESSIONS = 10000   # sessions whose latest size is kept for metrics()
+# Bytes; Prometheus `le` upper bounds for the session size histogram
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def state_compaction_enabled() -> bool:
+    return os.getenv("MINDPONICS_STATE_COMPACTION", "true").lower() in ("1", "true", "yes")
+
+
+def value_bytes(value) -> int:
+    """Returns the size of a state value as stored: UTF-8 for strings, compact JSON otherwise."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, separators=(",", ":"))
+    return len(text.encode("utf-8"))
+
+
+def measure_state(state: dict) -> dict:
+    """Returns the bytes of each state key, key name included."""
+    return {key: len(key) + value_bytes(value) for key, value in state.items()}
+
+
+def summarize_output(text: str, max_chars: int = SUMMARY_CHARS) -> str:
+    """Condenses an agent answer to its first paragraph, cut at a sentence or word boundary."""
+    text = " ".join(str(text).strip().split("\n\n", 1)[0].split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    end = cut.rfind(". ")
+    cut = cut[:end + 1] if end >= max_chars // 2 else cut.rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+def _cut(text: str, cap: int, size: int) -> str:
+    marker = f"… [truncated from {size} bytes]"
+    keep = max(cap - len(marker.encode("utf-8")), 0)
+    return text.encode("utf-8")[:keep].decode("utf-8", "ignore") + marker
+
+
+def _shrink(value, max_chars: int, max_items: int):
+    """Cuts the strings in value to max_chars and its dicts and lists to max_items, keeping their types."""
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + "…"
+    if isinstance(value, dict):
+        items = list(value.items())
+        shrunk = {k: _shrink(v, max_chars, max_items) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            shrunk[TRUNCATED_KEY] = f"{len(items) - max_items} more keys"
+        return shrunk
+    if isinstance(value, (list, tuple)):
+        shrunk = [_shrink(v, max_chars, max_items) for v in value[:max_items]]
+        if len(value) > max_items:
+            shrunk.append(f"… [{len(value) - max_items} more items]")
+        return shrunk
+    return value
+
+
+def _cap(value, cap: int):
+    """Returns value cut to at most about cap bytes, or value itself when it fits."""
+    size = value_bytes(value)
+    if size <= cap:
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        # Halve the string length and item count until it fits, so the value stays a dict or list
+        max_chars, max_items = cap, cap
+        while max_chars >= MIN_STRING_CHARS or max_items > 1:
+            shrunk = _shrink(value, max(max_chars, MIN_STRING_CHARS), max_items)
+            if value_bytes(shrunk) <= cap:
+                return shrunk
+            max_chars, max_items = max_chars // 2, max(max_items // 2, 1)
+    text = value if isinstance(value, str) else json.dumps(value, default=str, separators=(",", ":"))
+    return _cut(text, cap, size)
+
+
+class StateCompactor:
+    """
+    Bounds session state with per-key caps and folds replaced agent outputs into summaries.
+
+    Args:
+        key_caps: State key -> maximum bytes; keys not listed use default_cap
+        default_cap: Maximum bytes for any other key, or None for no cap
+        max_history: Summaries kept per agent output key
+    """
+
+    def __init__(self, key_caps: dict = None, default_cap: int = DEFAULT_KEY_CAP_BYTES, max_history: int = 5):
+        self.key_caps = dict(key_caps or {})
+        self.default_cap = default_cap
+        self.max_history = max_history
+        self.totals = {"turns": 0, "folded": 0, "truncated": 0, "bytes_removed": 0}
+        self._output_keys = set()
+        self._turn_start = {}                 # invocation_id -> agent outputs when the turn began
+        self._session_bytes = OrderedDict()   # session id -> state bytes after its latest turn
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def install(self, root) -> None:
+        """Adds the compaction callbacks to root, tracking the output keys of every agent below it."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        self._output_keys.update(agent.output_key for agent in iter_llm_agents(root) if agent.output_key)
+        add_callbacks(root, before_agent_callback=self.start_turn, after_agent_callback=self.compact)
+
+    def start_turn(self, callback_context):
+        state = callback_context.state
+        self._turn_start[callback_context.invocation_id] = {key: state.get(key) for key in self._output_keys}
+        return None
+
+    def compact(self, callback_context):
+        state = callback_context.state
+        before = self._turn_start.pop(callback_context.invocation_id, {})
+        folded, truncated, removed = 0, 0, 0
+
+        # Fold the outputs this turn replaced into the summary history
+        history = dict(state.get(AGENT_OUTPUT_HISTORY_KEY) or {})
+        for key, old in before.items():
+            if old is not None and state.get(key) != old:
+                summaries = list(history.get(key, [])) + [summarize_output(old)]
+                history[key] = summaries[-self.max_history:]
+                folded += 1
+        if folded:
+            state[AGENT_OUTPUT_HISTORY_KEY] = history
+
+        current = state.to_dict()
+        for key, value in current.items():
+            cap = self.key_caps.get(key, self.default_cap)
+            if cap is None or key == AGENT_OUTPUT_HISTORY_KEY:
+                continue
+            capped = _cap(value, cap)
+            if capped is not value:
+                state[key] = current[key] = capped
+                truncated += 1
+                removed += value_bytes(value) - value_bytes(capped)
+
+        sizes = measure_state({k: v for k, v in current.items() if not k.startswith("temp:")})
+        total = sum(sizes.values())
+        session_id = callback_context.session.id
+        with self._lock:
+            self.totals["turns"] += 1
+            self.totals["folded"] += folded
+            self.totals["truncated"] += truncated
+            self.totals["bytes_removed"] += removed
+            self._session_bytes[session_id] = total
+            self._session_bytes.move_to_end(session_id)
+            while len(self._session_bytes) > TRACKED_SESSIONS:
+                self._session_bytes.popitem(last=False)
+        self._publish(callback_context.agent_name, total)
+        if folded or truncated:
+            logging.info(
+                f"[StateCompactor] session={session_id} bytes={total} folded={folded} "
+                f"truncated={truncated} bytes_removed={removed}"
+            )
+        return None
+
+    def _publish(self, agent_name: str, total: int) -> None:
+        from .telemetry import telemetry, telemetry_enabled
+
+        if telemetry_enabled():
+            telemetry.observe("mindponics_session_state_bytes", (("agent", agent_name),), total, SIZE_BUCKETS)
+
+    def session_bytes(self, session_id: str) -> int:
+        """Returns the state bytes of a session after its latest turn, or 0 if unknown."""
+        return self._session_bytes.get(session_id, 0)
+
+    def metrics(self) -> dict:
+        """Returns session byte metrics and compaction totals."""
+        with self._lock:
+            sizes = sorted(self._session_bytes.values())
+            totals = dict(self.totals)
+        return {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes),
+            "max_session_bytes": sizes[-1] if sizes else 0,
+            "p95_session_bytes": sizes[min(int(len(sizes) * 0.95), len(sizes) - 1)] if sizes else 0,
+            **totals,
+        }
+
+
+state_compactor = StateCompactor()
@@ -1,7 +1,8 @@
 """BiofilterBuddy bacteria agent for managing nitrification cycle and biofilter health."""
 
 from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
+from ...tool_declarations import CachedFunctionTool
+from ...forecasting import get_forecast_store
 from . import prompt
 
 MODEL = "gemini-1.5-flash"
@@ -33,24 +34,65 @@ def monitor_nitrification_cycle(ammonia: float, nitrite: float, nitrate: float)
     
     return status
 
+# Upper bounds (mg/L) used by monitor_nitrification_cycle
+NITRIFICATION_THRESHOLDS = {
+    "warning": {"ammonia": 0.5, "nitrite": 0.2, "nitrate": 80},
+    "critical": {"ammonia": 1.0, "nitrite": 0.5, "nitrate": 100},
+}
+
+def forecast_nitrification(tank_id: str = "default", horizon_hours: float = 48.0) -> dict:
+    """
+    Forecasts ammonia, nitrite and nitrate from their reading history and estimates
+    how many hours until each reaches the warning and critical levels.
+    
+    Args:
+        tank_id: Tank identifier ("default" for the main system)
+        horizon_hours: How many hours ahead to forecast
+    
+    Returns:
+        Dictionary per compound with the current smoothed level, trend, forecast at the
+        horizon, and hours_to_warning / hours_to_critical (None when not reached)
+    """
+    store = get_forecast_store()
+    compounds = list(NITRIFICATION_THRESHOLDS["warning"])
+    by_level = {
+        level: store.forecast(tank_id, compounds, {c: (None, limit) for c, limit in limits.items()}, horizon_hours)
+        for level, limits in NITRIFICATION_THRESHOLDS.items()
+    }
+    forecasts = {}
+    for compound in compounds:
+        entry = {k: v for k, v in by_level["warning"][compound].items()
+                 if k not in ("crosses", "threshold", "hours_to_threshold")}
+        if entry.get("status") != "insufficient_history":
+            for level in NITRIFICATION_THRESHOLDS:
+                entry[f"hours_to_{level}"] = by_level[level][compound].get("hours_to_threshold")
+        forecasts[compound] = entry
+    return {"tank_id": tank_id, "horizon_hours": horizon_hours, "forecasts": forecasts}
+
 # Create tools for the agent
-BiofilterSizingCalculatorTool = FunctionTool(
+BiofilterSizingCalculatorTool = CachedFunctionTool(
     #name="BiofilterSizingCalculator",
     #description="Calculates required biofilter volume based on fish load (in kg)",
     func=calculate_biofilter_size
 )
 
-NitrificationCycleMonitorTool = FunctionTool(
+NitrificationCycleMonitorTool = CachedFunctionTool(
     #name="NitrificationCycleMonitor",
     #description="Analyzes NH3, NO2, NO3 levels to determine nitrification cycle status",
     func=monitor_nitrification_cycle
 )
 
+NitrificationForecastTool = CachedFunctionTool(
+    #name="NitrificationForecast",
+    #description="Forecasts NH3, NO2, NO3 and time until warning/critical levels",
+    func=forecast_nitrification
+)
+
 # Create the bacteria agent
 BacteriaAgent = LlmAgent(
     model=MODEL,
     name="bacteria_agent",
     instruction=prompt.BACTERIA_PROMPT,
-    tools=[BiofilterSizingCalculatorTool, NitrificationCycleMonitorTool],
+    tools=[BiofilterSizingCalculatorTool, NitrificationCycleMonitorTool, NitrificationForecastTool],
     output_key="bacteria_agent_output"
 )
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .agent import EnvironmentAgent
+from .control import ClimateControlLoop
+from .model import GreenhouseModel
 
-__all__ = ["EnvironmentAgent"]
\ No newline at end of file
+__all__ = ["EnvironmentAgent", "ClimateControlLoop", "GreenhouseModel"]
\ No newline at end of file
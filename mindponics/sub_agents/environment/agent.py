@@ -2,29 +2,90 @@
 """ClimateController environment agent for monitoring and controlling environmental conditions."""
 
 from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
-from utils.sensor_simulator import get_simulated_sensor_data
+from ...tool_declarations import CachedFunctionTool
+from utils.sensor_acquisition import SIMULATED_FIELDS_KEY, get_sensor_data
+from ...forecasting import get_forecast_store, record_readings
 from . import prompt
+from .control import ClimateControlLoop
 import logging
 
 MODEL = "gemini-1.5-flash"
 
-def get_ambient_conditions() -> dict:
+# Comfortable band around the default 25 °C / 65 % targets; crossing it is worth a warning
+CLIMATE_THRESHOLDS = {
+    "ambient_temperature": (20.0, 30.0),
+    "humidity": (50.0, 80.0),
+    "light_level": (None, None),
+}
+
+def read_ambient_conditions(tank_id: str = "default") -> dict:
     """
-    Reads environmental conditions from sensor simulator.
-    Returns a dictionary with temperature, humidity, and light_level.
+    Reads environmental conditions from the latest sensor snapshot,
+    or the sensor simulator when no probes are being polled.
+    Returns a dictionary with temperature, humidity, and light_level; conditions the
+    tank's probes have not reported are simulated and listed under "simulated_fields".
     """
     try:
-        sensor_data = get_simulated_sensor_data()
-        return {
+        sensor_data = get_sensor_data(tank_id)
+        conditions = {
             "temperature": sensor_data.get("temperature", 22.0),
             "humidity": sensor_data.get("humidity", 60.0),
             "light_level": sensor_data.get("light_level", 500)
         }
+        simulated = [f for f in sensor_data.get(SIMULATED_FIELDS_KEY, []) if f in conditions]
+        if simulated:
+            conditions[SIMULATED_FIELDS_KEY] = simulated
+        return conditions
     except Exception as e:
         logging.error(f"Error reading sensor data: {e}")
         return {"temperature": 22.0, "humidity": 60.0, "light_level": 500}
 
+def get_ambient_conditions(tank_id: str = "default") -> dict:
+    """
+    Reads environmental conditions from the latest sensor snapshot, or the sensor simulator.
+    
+    Args:
+        tank_id: Tank or zone identifier ("default" for the main system)
+    
+    Returns:
+        Dictionary with temperature, humidity, and light_level; conditions not
+        reported by the tank's probes are simulated and listed under "simulated_fields"
+    """
+    conditions = read_ambient_conditions(tank_id)
+    simulated = conditions.get(SIMULATED_FIELDS_KEY, [])
+    # Only measured values go into the forecast history
+    record_readings({
+        name: conditions[field]
+        for name, field in (("ambient_temperature", "temperature"), ("humidity", "humidity"), ("light_level", "light_level"))
+        if field not in simulated
+    }, tank_id)
+    return conditions
+
+def forecast_climate(zone_id: str = "default", horizon_hours: float = 24.0) -> dict:
+    """
+    Forecasts ambient temperature, humidity and light level from their reading history
+    and estimates when temperature or humidity will leave the comfortable band.
+
+    Args:
+        zone_id: Zone identifier ("default" for the readings taken by GetAmbientConditions)
+        horizon_hours: How many hours ahead to forecast
+
+    Returns:
+        Dictionary with the current smoothed level, trend, forecast at the horizon and,
+        when a bound is crossed, which one and the hours until it happens
+    """
+    forecasts = get_forecast_store().forecast(zone_id, list(CLIMATE_THRESHOLDS), CLIMATE_THRESHOLDS, horizon_hours)
+    upcoming = sorted(
+        (p for p, f in forecasts.items() if "hours_to_threshold" in f),
+        key=lambda p: forecasts[p]["hours_to_threshold"]
+    )
+    return {
+        "zone_id": zone_id,
+        "horizon_hours": horizon_hours,
+        "forecasts": forecasts,
+        "upcoming_issues": upcoming
+    }
+
 def suggest_climate_control(current_temp: float, target_temp: float, 
                             current_humidity: float, target_humidity: float) -> str:
     """
@@ -63,18 +124,24 @@ def suggest_climate_control(current_temp: float, target_temp: float,
     return "Recommendations: " + "; ".join(recommendations)
 
 # Create tools for the agent
-GetAmbientConditionsTool = FunctionTool(
+GetAmbientConditionsTool = CachedFunctionTool(
     #name="GetAmbientConditions",
     #description="Reads current ambient temperature, humidity, and light levels from sensors",
     func=get_ambient_conditions
 )
 
-ClimateControlSuggesterTool = FunctionTool(
+ClimateControlSuggesterTool = CachedFunctionTool(
     #name="ClimateControlSuggester",
     #description="Recommends climate control adjustments based on current vs target conditions",
     func=suggest_climate_control
 )
 
+ClimateForecastTool = CachedFunctionTool(
+    #name="ClimateForecast",
+    #description="Forecasts ambient conditions and the time until they leave the comfortable band",
+    func=forecast_climate
+)
+
 # Create the environment agent
 class EnvironmentAgent(LlmAgent):
     orchestrator_id: str = "orchestrator"
@@ -84,7 +151,7 @@ class EnvironmentAgent(LlmAgent):
             model=MODEL,
             name=name,
             instruction=prompt.ENVIRONMENT_PROMPT,
-            tools=[GetAmbientConditionsTool, ClimateControlSuggesterTool],
+            tools=[GetAmbientConditionsTool, ClimateControlSuggesterTool, ClimateForecastTool],
             output_key="environment_agent_output",
             **kwargs
         )
@@ -94,12 +161,19 @@ class EnvironmentAgent(LlmAgent):
         object.__setattr__(self, "target_humidity", target_humidity)
         logging.info(f"EnvironmentAgent '{name}' initialized. Orchestrator: {self.orchestrator_id}, Target Temp: {self.target_temp}, Target Humidity: {self.target_humidity}")
     
+    def build_control_loop(self, zone_ids: list, **kwargs) -> ClimateControlLoop:
+        """
+        Creates a deterministic control loop for the given zones that holds this
+        agent's target temperature and humidity. Extra kwargs go to ClimateControlLoop.
+        """
+        return ClimateControlLoop(zone_ids, self.target_temp, self.target_humidity, **kwargs)
+
     def step(self, state, mailbox):
         # Get current conditions
-        current_conditions = GetAmbientConditionsTool.function()
+        current_conditions = GetAmbientConditionsTool.func()
         
         # Generate recommendations
-        recommendations = ClimateControlSuggesterTool.function(
+        recommendations = ClimateControlSuggesterTool.func(
             current_conditions["temperature"],
             self.target_temp,
             current_conditions["humidity"],
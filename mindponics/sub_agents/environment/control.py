@@ -0,0 +1,290 @@
+"""Deterministic closed-loop climate control for ClimateController zones.
+
+The loop runs without the LLM: every period it reads all zones, runs a vectorized
+PID per zone for temperature and humidity, and maps the outputs onto heating,
+cooling, ventilation and humidification duty cycles (0-1). The LLM is only
+involved through `on_escalation`, which fires when an actuator stays saturated
+without closing the error, or when a zone reports a sensor fault.
+
+With a GreenhouseModel attached, the controller acts on the predicted conditions
+`lookahead_s` ahead instead of the current reading, so it responds before the
+deviation happens.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+from google.genai import types
+
+# PID gains: output 1.0 is full actuator duty
+TEMP_GAINS = (0.4, 0.02, 0.05)        # per °C, per °C·s, per °C/s
+HUMIDITY_GAINS = (0.06, 0.003, 0.0)   # per %, per %·s, per %/s
+
+# Errors inside the deadband are treated as zero to avoid actuator chatter
+TEMP_DEADBAND = 0.3      # °C
+HUMIDITY_DEADBAND = 2.0  # %
+
+ACTUATORS = ("heating", "cooling", "ventilation", "humidification")
+
+# Zones listed individually in one LLM escalation message; the rest are counted
+MAX_ESCALATION_ZONES = 20
+
+
+class VectorPID:
+    """PID controller over many zones at once, with output clamping and anti-windup."""
+
+    def __init__(self, n_zones: int, kp: float, ki: float, kd: float,
+                 out_min: float = -1.0, out_max: float = 1.0):
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.out_min, self.out_max = out_min, out_max
+        self.integral = np.zeros(n_zones)
+        self.prev_error = np.full(n_zones, np.nan)
+
+    def update(self, error: np.ndarray, dt: float) -> tuple:
+        """
+        Advances the controller by dt seconds.
+        Returns the clamped outputs and a mask of zones whose output is saturated.
+        """
+        derivative = np.where(np.isnan(self.prev_error), 0.0, (error - self.prev_error) / dt)
+        candidate = self.integral + error * dt
+        raw = self.kp * error + self.ki * candidate + self.kd * derivative
+        output = np.clip(raw, self.out_min, self.out_max)
+        saturated = output != raw
+        # Conditional integration: stop accumulating while pushing further into saturation
+        winding_up = saturated & (np.sign(error) == np.sign(raw))
+        self.integral = np.where(winding_up, self.integral, candidate)
+        self.prev_error = error
+        return output, saturated
+
+    def reset(self, mask: np.ndarray) -> None:
+        self.integral[mask] = 0.0
+        self.prev_error[mask] = np.nan
+
+
+def _apply_deadband(error: np.ndarray, deadband: float) -> np.ndarray:
+    return np.sign(error) * np.maximum(np.abs(error) - deadband, 0.0)
+
+
+def read_simulated_zones(zone_ids: list) -> tuple:
+    """Reads temperature, humidity and light level for each zone from its latest sensor snapshot, or the simulator."""
+    # Not get_ambient_conditions: control reads must not feed the shared forecast series
+    from .agent import read_ambient_conditions
+
+    readings = [read_ambient_conditions(zone_id) for zone_id in zone_ids]
+    return (np.array([r["temperature"] for r in readings], dtype=float),
+            np.array([r["humidity"] for r in readings], dtype=float),
+            np.array([r["light_level"] for r in readings], dtype=float))
+
+
+class ClimateControlLoop:
+    """
+    Closed-loop heating, cooling, ventilation and humidification control for many zones.
+
+    Args:
+        zone_ids: Identifiers of the controlled zones
+        target_temp: Temperature setpoint in °C (scalar or one per zone)
+        target_humidity: Relative humidity setpoint in % (scalar or one per zone)
+        read_zones: Callable(zone_ids) -> (temperature, humidity[, light_level]) arrays;
+            NaN marks a failed probe
+        apply_outputs: Callable(zone_ids, outputs) that drives the actuators
+        on_escalation: Callable(event) invoked on saturation or fault; may be a coroutine function
+        period_s: Control period in seconds
+        saturation_hold_s: How long an actuator may stay saturated before escalating
+        model: Optional GreenhouseModel used to control on predicted conditions
+        lookahead_s: Prediction horizon used for the control error when a model is attached
+    """
+
+    def __init__(self, zone_ids: list, target_temp, target_humidity, read_zones=None,
+                 apply_outputs=None, on_escalation=None, period_s: float = 0.5,
+                 saturation_hold_s: float = 60.0, model=None, lookahead_s: float = 300.0):
+        self.zone_ids = list(zone_ids)
+        n_zones = len(self.zone_ids)
+        self.target_temp = np.broadcast_to(np.asarray(target_temp, dtype=float), (n_zones,)).copy()
+        self.target_humidity = np.broadcast_to(np.asarray(target_humidity, dtype=float), (n_zones,)).copy()
+        self.read_zones = read_zones or read_simulated_zones
+        self.apply_outputs = apply_outputs
+        self.on_escalation = on_escalation
+        self.period_s = period_s
+        self.saturation_hold_s = saturation_hold_s
+        self.model = model
+        self.lookahead_s = lookahead_s
+
+        self.temp_pid = VectorPID(n_zones, *TEMP_GAINS)
+        self.humidity_pid = VectorPID(n_zones, *HUMIDITY_GAINS)
+        self.saturated_since = np.full(n_zones, np.nan)
+        self.escalated = np.zeros(n_zones, dtype=bool)
+        self.outputs = {name: np.zeros(n_zones) for name in ACTUATORS}
+        self.escalations = deque(maxlen=1000)
+        self._escalation_tasks = set()
+        self._last_step = None
+
+    def step(self, temperature: np.ndarray, humidity: np.ndarray, now: float = None,
+             light_level: np.ndarray = None) -> dict:
+        """
+        Runs one control iteration for all zones.
+        Returns actuator duty cycles keyed by actuator name, one value per zone.
+        """
+        now = time.monotonic() if now is None else now
+        dt = self.period_s if self._last_step is None else max(now - self._last_step, 1e-3)
+        self._last_step = now
+
+        faulted = ~(np.isfinite(temperature) & np.isfinite(humidity))
+        controlled_temp, controlled_humidity = temperature, humidity
+        if self.model is not None and self.lookahead_s > 0:
+            forecast = self.model.predict(
+                np.nan_to_num(temperature), np.nan_to_num(humidity),
+                0.0 if light_level is None else np.nan_to_num(light_level),
+                controls=self.outputs, horizon_s=self.lookahead_s, step_s=min(60.0, self.lookahead_s),
+            )
+            controlled_temp = forecast["temperature"][:, -1]
+            controlled_humidity = forecast["humidity"][:, -1]
+        temp_error = _apply_deadband(np.nan_to_num(self.target_temp - controlled_temp), TEMP_DEADBAND)
+        humidity_error = _apply_deadband(np.nan_to_num(self.target_humidity - controlled_humidity), HUMIDITY_DEADBAND)
+        temp_error[faulted] = humidity_error[faulted] = 0.0
+
+        u_temp, temp_saturated = self.temp_pid.update(temp_error, dt)
+        u_humidity, humidity_saturated = self.humidity_pid.update(humidity_error, dt)
+
+        heating = np.maximum(u_temp, 0.0)
+        cooling = np.maximum(-u_temp, 0.0)
+        outputs = {
+            "heating": heating,
+            "cooling": cooling,
+            # Ventilation serves both cooling and dehumidification
+            "ventilation": np.maximum(cooling, np.maximum(-u_humidity, 0.0)),
+            "humidification": np.maximum(u_humidity, 0.0),
+        }
+        # Failed probes get a safe all-off output and fresh controller state
+        for values in outputs.values():
+            values[faulted] = 0.0
+        self.temp_pid.reset(faulted)
+        self.humidity_pid.reset(faulted)
+        self.outputs = outputs
+
+        saturated = ((temp_saturated & (temp_error != 0)) | (humidity_saturated & (humidity_error != 0))) & ~faulted
+        self.saturated_since = np.where(saturated, np.where(np.isnan(self.saturated_since), now, self.saturated_since), np.nan)
+        stuck = saturated & (now - np.nan_to_num(self.saturated_since, nan=now) >= self.saturation_hold_s)
+        self._escalate(faulted & ~self.escalated, "fault", temperature, humidity)
+        self._escalate(stuck & ~self.escalated, "saturation", temperature, humidity)
+        self.escalated = (self.escalated & (faulted | saturated)) | faulted | stuck
+
+        if self.apply_outputs is not None:
+            self.apply_outputs(self.zone_ids, outputs)
+        return outputs
+
+    def _escalate(self, mask: np.ndarray, reason: str, temperature: np.ndarray, humidity: np.ndarray) -> None:
+        for i in np.flatnonzero(mask):
+            event = {
+                "zone": self.zone_ids[i],
+                "reason": reason,
+                "temperature": None if not np.isfinite(temperature[i]) else float(temperature[i]),
+                "humidity": None if not np.isfinite(humidity[i]) else float(humidity[i]),
+                "targets": {"temperature": float(self.target_temp[i]), "humidity": float(self.target_humidity[i])},
+                "outputs": {name: round(float(values[i]), 3) for name, values in self.outputs.items()},
+            }
+            logging.warning(f"[ClimateControlLoop] Escalating zone {event['zone']}: {reason}")
+            self.escalations.append(event)
+            if self.on_escalation is not None:
+                result = self.on_escalation(event)
+                if asyncio.iscoroutine(result):
+                    # Keep a reference so the task is not garbage-collected mid-flight
+                    task = asyncio.ensure_future(result)
+                    self._escalation_tasks.add(task)
+                    task.add_done_callback(self._escalation_done)
+
+    def _escalation_done(self, task: asyncio.Future) -> None:
+        self._escalation_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"[ClimateControlLoop] Escalation handler failed: {task.exception()}")
+
+    async def run(self, stop_event: asyncio.Event = None) -> None:
+        """Runs the loop at a fixed period until stop_event is set."""
+        stop_event = stop_event or asyncio.Event()
+        next_tick = time.monotonic()
+        while not stop_event.is_set():
+            light_level = None
+            try:
+                temperature, humidity, *rest = self.read_zones(self.zone_ids)
+                light_level = np.asarray(rest[0], dtype=float) if rest else None
+            except Exception as e:
+                logging.error(f"[ClimateControlLoop] Error reading zones: {e}")
+                temperature = humidity = np.full(len(self.zone_ids), np.nan)
+            self.step(np.asarray(temperature, dtype=float), np.asarray(humidity, dtype=float),
+                      light_level=light_level)
+            next_tick += self.period_s
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=max(next_tick - time.monotonic(), 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+
+def format_escalations(events: list) -> str:
+    """Builds one LLM message describing a batch of escalation events."""
+    lines = [
+        f"- Zone {e['zone']} ({e['reason']}): temperature {e['temperature']} °C, humidity {e['humidity']} %, "
+        f"targets {e['targets']}, actuator outputs {e['outputs']}"
+        for e in events[:MAX_ESCALATION_ZONES]
+    ]
+    if len(events) > MAX_ESCALATION_ZONES:
+        reasons = sorted({e["reason"] for e in events[MAX_ESCALATION_ZONES:]})
+        lines.append(f"- ...and {len(events) - MAX_ESCALATION_ZONES} more zones ({', '.join(reasons)})")
+    return (
+        f"Climate control escalation for {len(events)} zone(s):\n" + "\n".join(lines)
+        + "\nDiagnose the cause and recommend operator actions."
+    )
+
+
+class LlmEscalation:
+    """
+    on_escalation callback that hands saturation and fault events to the agent served
+    by `runner`, so the LLM only sees the cases the loop cannot handle.
+
+    Runs on one session are serialized: a single worker sends the events queued
+    while the previous run was in progress as one batched message, so a burst
+    such as a failed read across every zone costs one LLM turn, not one per zone.
+    """
+
+    def __init__(self, runner, user_id: str, session_id: str):
+        self.runner = runner
+        self.user_id = user_id
+        self.session_id = session_id
+        self.pending = []
+        self.messages_sent = 0
+        self._worker = None
+
+    def __call__(self, event: dict) -> None:
+        self.pending.append(event)
+        if self._worker is None or self._worker.done():
+            try:
+                self._worker = asyncio.get_running_loop().create_task(self._drain())
+            except RuntimeError:
+                # No running loop (e.g. a synchronous step); the next call or flush() sends the batch
+                self._worker = None
+
+    async def _drain(self) -> None:
+        while self.pending:
+            batch, self.pending = self.pending, []
+            message = types.Content(role="user", parts=[types.Part(text=format_escalations(batch))])
+            try:
+                async for _ in self.runner.run_async(user_id=self.user_id, session_id=self.session_id,
+                                                     new_message=message):
+                    pass
+                self.messages_sent += 1
+            except Exception as e:
+                logging.error(f"[LlmEscalation] Escalating {len(batch)} zone events failed: {e}")
+
+    async def flush(self) -> None:
+        """Sends any queued events and waits until the worker is idle."""
+        if self._worker is not None and not self._worker.done():
+            await self._worker
+        if self.pending:
+            await self._drain()
+
+
+def make_llm_escalation(runner, user_id: str, session_id: str) -> LlmEscalation:
+    """Returns the on_escalation callback that escalates to the LLM on one session."""
+    return LlmEscalation(runner, user_id, session_id)
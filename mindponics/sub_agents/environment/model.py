@@ -0,0 +1,140 @@
+"""Lumped-parameter greenhouse thermal and moisture model for short-horizon prediction.
+
+Each zone is a single well-mixed air volume:
+
+    dT/dt = loss·(T_out - T) + vent·v·(T_out - T) + heat·h - cool·c + solar·L
+    dH/dt = loss·(H_out - H) + vent·v·(H_out - H) + humidify·u + transpiration·L
+
+where h, c, v, u are the heating, cooling, ventilation and humidification duty
+cycles (0-1) from ClimateControlLoop and L is the light level in lux. All zones
+are integrated together, one vectorized step at a time.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+THERMAL_TERMS = ("loss", "vent", "heat", "cool", "solar")
+MOISTURE_TERMS = ("loss", "vent", "humidify", "transpiration")
+
+# Defaults for a small hobby greenhouse, per second
+DEFAULT_THERMAL_PARAMS = {"loss": 2.8e-4, "vent": 8e-4, "heat": 1.5e-3, "cool": 1.5e-3, "solar": 1e-6}
+DEFAULT_MOISTURE_PARAMS = {"loss": 1.5e-4, "vent": 1e-3, "humidify": 3e-3, "transpiration": 2e-6}
+
+
+def _regressors(history: dict) -> tuple:
+    """Builds the thermal and moisture regressor matrices for a zone history."""
+    temperature = np.asarray(history["temperature"], dtype=float)
+    humidity = np.asarray(history["humidity"], dtype=float)
+    n = len(temperature)
+    column = lambda key, default=0.0: np.broadcast_to(np.asarray(history.get(key, default), dtype=float), (n,))
+    ventilation = column("ventilation")
+    light = column("light_level")
+    temp_gap = column("outdoor_temp", 15.0) - temperature
+    humidity_gap = column("outdoor_humidity", 50.0) - humidity
+    thermal = np.column_stack([temp_gap, ventilation * temp_gap, column("heating"), -column("cooling"), light])
+    moisture = np.column_stack([humidity_gap, ventilation * humidity_gap, column("humidification"), light])
+    return thermal, moisture
+
+
+class GreenhouseModel:
+    """
+    Thermal and moisture model for many zones, with fitted parameters cached per zone.
+
+    Args:
+        zone_ids: Identifiers of the modelled zones
+        outdoor_temp: Outdoor temperature in °C (scalar or one per zone)
+        outdoor_humidity: Outdoor relative humidity in % (scalar or one per zone)
+    """
+
+    def __init__(self, zone_ids: list, outdoor_temp=15.0, outdoor_humidity=50.0):
+        self.zone_ids = list(zone_ids)
+        self._zone_index = {zone: i for i, zone in enumerate(self.zone_ids)}
+        n_zones = len(self.zone_ids)
+        self.outdoor_temp = np.broadcast_to(np.asarray(outdoor_temp, dtype=float), (n_zones,)).copy()
+        self.outdoor_humidity = np.broadcast_to(np.asarray(outdoor_humidity, dtype=float), (n_zones,)).copy()
+        self.thermal = np.tile([DEFAULT_THERMAL_PARAMS[t] for t in THERMAL_TERMS], (n_zones, 1))
+        self.moisture = np.tile([DEFAULT_MOISTURE_PARAMS[t] for t in MOISTURE_TERMS], (n_zones, 1))
+        # zone -> {"thermal": {...}, "moisture": {...}, "samples": n, "fitted_at": t}
+        self.fitted = {}
+
+    def fit_zone(self, zone_id, history: dict) -> dict:
+        """
+        Fits the zone's parameters by least squares on finite differences of its history.
+        `history` holds equally long sequences for temperature, humidity and "timestamp"
+        (seconds), plus optional actuator duty cycles, light_level and outdoor conditions.
+        The result is cached and used by every later prediction for the zone.
+        """
+        thermal_x, moisture_x = _regressors(history)
+        timestamps = np.asarray(history["timestamp"], dtype=float)
+        dt = np.diff(timestamps)
+        valid = dt > 0
+        if valid.sum() < len(THERMAL_TERMS):
+            logging.warning(f"[GreenhouseModel] Not enough samples to fit zone {zone_id}")
+            return self.parameters(zone_id)
+
+        temp_rate = np.diff(np.asarray(history["temperature"], dtype=float))[valid] / dt[valid]
+        humidity_rate = np.diff(np.asarray(history["humidity"], dtype=float))[valid] / dt[valid]
+        thermal, *_ = np.linalg.lstsq(thermal_x[:-1][valid], temp_rate, rcond=None)
+        moisture, *_ = np.linalg.lstsq(moisture_x[:-1][valid], humidity_rate, rcond=None)
+
+        i = self._zone_index[zone_id]
+        # Physical coefficients are non-negative; an unexcited actuator keeps its prior
+        thermal_prior, moisture_prior = self.thermal[i].copy(), self.moisture[i].copy()
+        self.thermal[i] = np.where(np.abs(thermal_x).sum(axis=0) > 0, np.maximum(thermal, 0.0), thermal_prior)
+        self.moisture[i] = np.where(np.abs(moisture_x).sum(axis=0) > 0, np.maximum(moisture, 0.0), moisture_prior)
+        self.fitted[zone_id] = {**self.parameters(zone_id), "samples": int(valid.sum()), "fitted_at": time.time()}
+        return self.fitted[zone_id]
+
+    def parameters(self, zone_id) -> dict:
+        i = self._zone_index[zone_id]
+        return {
+            "thermal": dict(zip(THERMAL_TERMS, self.thermal[i].tolist())),
+            "moisture": dict(zip(MOISTURE_TERMS, self.moisture[i].tolist())),
+        }
+
+    def derivatives(self, temperature: np.ndarray, humidity: np.ndarray,
+                    light_level: np.ndarray, controls: dict) -> tuple:
+        """Returns dT/dt (°C/s) and dH/dt (%/s) for every zone."""
+        ventilation = controls.get("ventilation", 0.0)
+        temp_gap = self.outdoor_temp - temperature
+        humidity_gap = self.outdoor_humidity - humidity
+        loss, vent, heat, cool, solar = self.thermal.T
+        d_temp = (loss * temp_gap + vent * ventilation * temp_gap + heat * controls.get("heating", 0.0)
+                  - cool * controls.get("cooling", 0.0) + solar * light_level)
+        loss, vent, humidify, transpiration = self.moisture.T
+        d_humidity = (loss * humidity_gap + vent * ventilation * humidity_gap
+                      + humidify * controls.get("humidification", 0.0) + transpiration * light_level)
+        return d_temp, d_humidity
+
+    def predict(self, temperature, humidity, light_level=0.0, controls: dict = None,
+                horizon_s: float = 3600.0, step_s: float = 60.0) -> dict:
+        """
+        Integrates all zones forward with the actuators and light held constant.
+
+        Returns:
+            Dictionary with "time_s" (n_steps,) and "temperature"/"humidity" arrays of
+            shape (n_zones, n_steps) holding the predicted trajectory of every zone
+        """
+        n_zones = len(self.zone_ids)
+        temperature = np.broadcast_to(np.asarray(temperature, dtype=float), (n_zones,)).copy()
+        humidity = np.broadcast_to(np.asarray(humidity, dtype=float), (n_zones,)).copy()
+        light_level = np.broadcast_to(np.asarray(light_level, dtype=float), (n_zones,))
+        controls = {name: np.asarray(value, dtype=float) for name, value in (controls or {}).items()}
+
+        n_steps = max(int(np.ceil(horizon_s / step_s)), 1)
+        temp_path = np.empty((n_zones, n_steps))
+        humidity_path = np.empty((n_zones, n_steps))
+        for k in range(n_steps):
+            d_temp, d_humidity = self.derivatives(temperature, humidity, light_level, controls)
+            temperature = temperature + d_temp * step_s
+            humidity = np.clip(humidity + d_humidity * step_s, 0.0, 100.0)
+            temp_path[:, k] = temperature
+            humidity_path[:, k] = humidity
+
+        return {
+            "time_s": step_s * np.arange(1, n_steps + 1),
+            "temperature": temp_path,
+            "humidity": humidity_path,
+        }
@@ -1,7 +1,7 @@
 """PiscinePro fish health agent for monitoring fish health, diseases, and feeding."""
 
 from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
+from ...tool_declarations import CachedFunctionTool
 from . import prompt
 import json
 import logging
@@ -141,19 +141,19 @@ def check_fish_symptoms(symptoms: str) -> dict:
         }
 
 # Create tools for the agent
-FishSpeciesInfoTool = FunctionTool(
+FishSpeciesInfoTool = CachedFunctionTool(
     #name="FishSpeciesInfo",
     #description="Retrieves information about fish species and life stages from database",
     func=get_fish_species_info
 )
 
-FeedingCalculatorTool = FunctionTool(
+FeedingCalculatorTool = CachedFunctionTool(
     #name="FeedingCalculator",
     #description="Calculates daily feeding amount based on fish species and life stage",
     func=calculate_feeding
 )
 
-FishSymptomCheckerTool = FunctionTool(
+FishSymptomCheckerTool = CachedFunctionTool(
     #name="FishSymptomChecker",
     #description="Checks fish symptoms against disease database and returns possible diagnoses",
     func=check_fish_symptoms
@@ -181,7 +181,7 @@ class FishHealthAgent(LlmAgent):
         for sender_id, msg_content in messages:
             if "water_parameters" in msg_content:
                 water_params = msg_content["water_parameters"]
-                logging.debug(f"[{self.id}] Received water params: {water_params}")
+                logging.debug(f"[{self.name}] Received water params: {water_params}")
         
         # Prepare analysis context
         context = {
@@ -192,8 +192,13 @@ class FishHealthAgent(LlmAgent):
             "avg_weight_g": state.get("avg_weight_g", 200)
         }
         
-        # Run agent analysis
-        analysis = super().step(context, mailbox)
+        # Run the deterministic analysis with the agent's tools
+        analysis = {
+            "species_info": FishSpeciesInfoTool.func(context["fish_species"], context["life_stage"]),
+            "feeding": FeedingCalculatorTool.func(
+                context["fish_species"], context["life_stage"], context["fish_count"], context["avg_weight_g"]
+            ),
+        }
         
         # Send results to orchestrator
         output = {
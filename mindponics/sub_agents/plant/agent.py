@@ -1,10 +1,11 @@
 """FloraFriend plant growth agent for monitoring plant health and nutrient management."""
 
 from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
+from ...tool_declarations import CachedFunctionTool
 from . import prompt
 import json
 import logging
+import numpy as np
 
 MODEL = "gemini-2.5-pro"
 
@@ -37,6 +38,17 @@ PLANT_DATABASE = {
     }
 }
 
+# Base N/P/K ranges (ppm) for a "medium" feeder in vegetative growth
+NUTRIENTS = ("nitrogen", "phosphorus", "potassium")
+BASE_NUTRIENT_RANGES = np.array([
+    (20.0, 50.0),  # nitrogen
+    (10.0, 30.0),  # phosphorus
+    (20.0, 40.0),  # potassium
+])
+
+# Scale applied to the base ranges for each nutrient_needs level
+NUTRIENT_NEED_SCALE = {"low": 0.75, "medium": 1.0, "high": 1.25, "very high": 1.5}
+
 # Plant symptom database
 PLANT_SYMPTOM_DB = {
     "yellow leaves": {
@@ -57,6 +69,20 @@ PLANT_SYMPTOM_DB = {
     }
 }
 
+def _nutrient_scale(species: str, life_stage: str) -> np.ndarray:
+    """
+    Returns the N/P/K range multipliers for a species and life stage.
+    Unknown species or life stages fall back to a multiplier of 1.
+    """
+    plant_info = PLANT_DATABASE.get(species.lower(), {})
+    needs = plant_info.get("nutrient_needs", {})
+    life_stage_info = plant_info.get("life_stages", {}).get(life_stage, {})
+    nutrient_adjust = life_stage_info.get("nutrient_adjust", 1)
+    return np.array([
+        NUTRIENT_NEED_SCALE.get(needs.get(symbol, "medium"), 1.0) * nutrient_adjust
+        for symbol in ("N", "P", "K")
+    ])
+
 def get_plant_species_info(species: str, life_stage: str) -> dict:
     """
     Retrieves information about plant species and life stage from database.
@@ -80,13 +106,59 @@ def get_plant_species_info(species: str, life_stage: str) -> dict:
         optimized_info["light_hours"] *= life_stage_info.get("light_multiplier", 1)
         nutrient_adjust = life_stage_info.get("nutrient_adjust", 1)
         optimized_info["nutrient_needs"] = {
-            nutrient: f"{level} (adjusted)" 
+            nutrient: f"{level} (adjusted x{nutrient_adjust})"
             for nutrient, level in plant_info["nutrient_needs"].items()
         }
+    ranges = BASE_NUTRIENT_RANGES * _nutrient_scale(species, life_stage)[:, None]
+    optimized_info["nutrient_ranges"] = {
+        nutrient: (round(float(low), 1), round(float(high), 1))
+        for nutrient, (low, high) in zip(NUTRIENTS, ranges)
+    }
     
     return optimized_info
 
-def identify_nutrient_deficiency(symptoms: str, nitrate_level: float, phosphate_level: float, potassium_level: float) -> dict:
+def analyze_nutrient_levels_batch(nitrate_levels, phosphate_levels, potassium_levels,
+                                  species, life_stages) -> dict:
+    """
+    Compares N/P/K levels of many grow beds against their optimal ranges in one pass.
+    
+    Args:
+        nitrate_levels: Nitrate level per bed in ppm (sequence or array)
+        phosphate_levels: Phosphate level per bed in ppm
+        potassium_levels: Potassium level per bed in ppm
+        species: Plant species per bed, or a single species for all beds
+        life_stages: Life stage per bed, or a single life stage for all beds
+    
+    Returns:
+        Dictionary with the per-bed "levels" and "ranges" arrays (shape (n, 3) and
+        (n, 3, 2), columns ordered as NUTRIENTS) and boolean "deficient" and
+        "excess" masks of shape (n, 3)
+    """
+    levels = np.column_stack([
+        np.asarray(nitrate_levels, dtype=float).ravel(),
+        np.asarray(phosphate_levels, dtype=float).ravel(),
+        np.asarray(potassium_levels, dtype=float).ravel(),
+    ])
+    n_beds = len(levels)
+    species = np.broadcast_to(np.asarray(species, dtype=object), (n_beds,))
+    life_stages = np.broadcast_to(np.asarray(life_stages, dtype=object), (n_beds,))
+    
+    # Look up each distinct species/life stage pair once, then scatter to beds
+    pairs = np.array([f"{sp.lower()}|{stage}" for sp, stage in zip(species, life_stages)], dtype=object)
+    unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+    scale_table = np.array([_nutrient_scale(*pair.split("|", 1)) for pair in unique_pairs]).reshape(-1, len(NUTRIENTS))
+    ranges = BASE_NUTRIENT_RANGES[None, :, :] * scale_table[inverse][:, :, None]
+    
+    return {
+        "nutrients": NUTRIENTS,
+        "levels": levels,
+        "ranges": ranges,
+        "deficient": levels < ranges[:, :, 0],
+        "excess": levels > ranges[:, :, 1],
+    }
+
+def identify_nutrient_deficiency(symptoms: str, nitrate_level: float, phosphate_level: float, potassium_level: float,
+                                 species: str = "", life_stage: str = "") -> dict:
     """
     Identifies nutrient deficiencies based on symptoms and nutrient levels.
     
@@ -95,6 +167,8 @@ def identify_nutrient_deficiency(symptoms: str, nitrate_level: float, phosphate_
         nitrate_level: Current nitrate level in ppm
         phosphate_level: Current phosphate level in ppm
         potassium_level: Current potassium level in ppm
+        species: Plant species in the bed (e.g., "lettuce"); empty for generic ranges
+        life_stage: Life stage of the plants (e.g., "seedling"); empty for generic ranges
     
     Returns:
         Dictionary with potential deficiencies and treatment recommendations
@@ -105,11 +179,9 @@ def identify_nutrient_deficiency(symptoms: str, nitrate_level: float, phosphate_
         "phosphorus": phosphate_level,
         "potassium": potassium_level
     }
-    optimal_ranges = {
-        "nitrogen": (20, 50),   # ppm
-        "phosphorus": (10, 30), # ppm
-        "potassium": (20, 40)   # ppm
-    }
+    analysis = analyze_nutrient_levels_batch(
+        [nitrate_level], [phosphate_level], [potassium_level], species, life_stage
+    )
     # Check symptoms against known issues
     deficiencies = [
         {
@@ -122,15 +194,15 @@ def identify_nutrient_deficiency(symptoms: str, nitrate_level: float, phosphate_
     ]
     
     # Check nutrient levels against optimal ranges
-    for nutrient, level in nutrient_levels.items():
-        low, high = optimal_ranges.get(nutrient, (0, 0))
-        if level < low:
+    for i, (nutrient, level) in enumerate(nutrient_levels.items()):
+        low, high = (round(float(x), 1) for x in analysis["ranges"][0, i])
+        if analysis["deficient"][0, i]:
             deficiencies.append({
                 "issue": f"{nutrient.capitalize()} deficiency",
                 "cause": f"Level ({level} ppm) below optimal range ({low}-{high} ppm)",
                 "treatment": f"Increase {nutrient} levels gradually"
             })
-        elif level > high:
+        elif analysis["excess"][0, i]:
             deficiencies.append({
                 "issue": f"{nutrient.capitalize()} excess",
                 "cause": f"Level ({level} ppm) above optimal range ({low}-{high} ppm)",
@@ -182,19 +254,19 @@ def check_plant_symptoms(symptoms: str) -> dict:
         }
 
 # Create tools for the agent
-PlantSpeciesInfoTool = FunctionTool(
+PlantSpeciesInfoTool = CachedFunctionTool(
     #name="PlantSpeciesInfo",
     #description="Retrieves information about plant species and life stages from database",
     func=get_plant_species_info
 )
 
-NutrientDeficiencyIdentifierTool = FunctionTool(
+NutrientDeficiencyIdentifierTool = CachedFunctionTool(
     #name="NutrientDeficiencyIdentifier",
     #description="Identifies nutrient deficiencies based on symptoms and nutrient levels",
     func=identify_nutrient_deficiency
 )
 
-PlantSymptomCheckerTool = FunctionTool(
+PlantSymptomCheckerTool = CachedFunctionTool(
     #name="PlantSymptomChecker",
     #description="Checks plant symptoms against issue database and returns possible diagnoses",
     func=check_plant_symptoms
@@ -222,7 +294,7 @@ class PlantGrowthAgent(LlmAgent):
         for sender_id, msg_content in messages:
             if "nutrient_levels" in msg_content:
                 nutrient_levels = msg_content["nutrient_levels"]
-                logging.debug(f"[{self.id}] Received nutrient levels: {nutrient_levels}")
+                logging.debug(f"[{self.name}] Received nutrient levels: {nutrient_levels}")
         
         # Prepare analysis context
         context = {
@@ -232,8 +304,19 @@ class PlantGrowthAgent(LlmAgent):
             "observed_symptoms": state.get("observed_symptoms", "")
         }
         
-        # Run agent analysis
-        analysis = super().step(context, mailbox)
+        # Run the deterministic analysis with the agent's tools
+        analysis = {
+            "species_info": PlantSpeciesInfoTool.func(context["plant_species"], context["life_stage"]),
+        }
+        if nutrient_levels:
+            analysis["nutrients"] = NutrientDeficiencyIdentifierTool.func(
+                context["observed_symptoms"],
+                nutrient_levels.get("nitrate", 0.0),
+                nutrient_levels.get("phosphate", 0.0),
+                nutrient_levels.get("potassium", 0.0),
+                context["plant_species"],
+                context["life_stage"],
+            )
         
         # Send results to orchestrator
         output = {
@@ -1,8 +1,9 @@
 """HydroGuardian water quality agent for monitoring and managing water parameters."""
 
 from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
-from utils.sensor_simulator import get_simulated_sensor_data
+from ...tool_declarations import CachedFunctionTool
+from utils.sensor_acquisition import SIMULATED_FIELDS_KEY, get_sensor_data
+from ...forecasting import get_forecast_store, record_readings
 from . import prompt
 import logging
 
@@ -18,14 +19,24 @@ OPTIMAL_RANGES = {
     "dissolved_oxygen": (5.0, 8.0) # mg/L
 }
 
-def get_water_parameters() -> dict:
+# Sensor field -> water parameter, where the names differ
+SENSOR_FIELDS = {"oxygen": "dissolved_oxygen"}
+
+def get_water_parameters(tank_id: str = "default") -> dict:
     """
-    Reads water parameters from sensor simulator.
-    Returns a dictionary with pH, ammonia, nitrite, nitrate, temperature, and dissolved oxygen.
+    Reads water parameters from the latest sensor snapshot,
+    or the sensor simulator when no probes are being polled.
+    
+    Args:
+        tank_id: Tank identifier ("default" for the main system)
+    
+    Returns:
+        Dictionary with pH, ammonia, nitrite, nitrate, temperature, and dissolved oxygen.
+        Parameters the tank's probes have not reported are simulated and listed under "simulated_fields".
     """
     try:
-        sensor_data = get_simulated_sensor_data()
-        return {
+        sensor_data = get_sensor_data(tank_id)
+        parameters = {
             "ph": sensor_data.get("ph", 7.0),
             "ammonia": sensor_data.get("ammonia", 0.0),
             "nitrite": sensor_data.get("nitrite", 0.0),
@@ -33,6 +44,13 @@ def get_water_parameters() -> dict:
             "temperature": sensor_data.get("temperature", 22.0),
             "dissolved_oxygen": sensor_data.get("oxygen", 6.5)
         }
+        simulated = [SENSOR_FIELDS.get(f, f) for f in sensor_data.get(SIMULATED_FIELDS_KEY, [])]
+        # Only measured values go into the forecast history
+        record_readings({p: v for p, v in parameters.items() if p not in simulated}, tank_id)
+        simulated = [p for p in simulated if p in parameters]
+        if simulated:
+            parameters[SIMULATED_FIELDS_KEY] = simulated
+        return parameters
     except Exception as e:
         logging.error(f"Error reading water parameters: {e}")
         # Return safe default values
@@ -159,25 +177,56 @@ def suggest_corrective_actions(parameters: dict, diagnosis: dict) -> dict:
         "priority": "immediate" if any(issue["severity"] == "critical" for issue in diagnosis.get("issues", [])) else "routine"
     }
 
+def forecast_water_parameters(tank_id: str = "default", horizon_hours: float = 24.0) -> dict:
+    """
+    Forecasts water parameters from their reading history and estimates when each
+    will leave its optimal range (e.g. "ammonia crosses 0.5 mg/L in about 6 hours").
+    
+    Args:
+        tank_id: Tank identifier ("default" for the main system)
+        horizon_hours: How many hours ahead to forecast
+    
+    Returns:
+        Dictionary with the current smoothed level, trend, forecast at the horizon and,
+        when a bound is crossed, which one and the hours until it happens
+    """
+    forecasts = get_forecast_store().forecast(tank_id, list(OPTIMAL_RANGES), OPTIMAL_RANGES, horizon_hours)
+    upcoming = sorted(
+        (p for p, f in forecasts.items() if "hours_to_threshold" in f),
+        key=lambda p: forecasts[p]["hours_to_threshold"]
+    )
+    return {
+        "tank_id": tank_id,
+        "horizon_hours": horizon_hours,
+        "forecasts": forecasts,
+        "upcoming_issues": upcoming
+    }
+
 # Create tools for the agent
-GetWaterParametersTool = FunctionTool(
+GetWaterParametersTool = CachedFunctionTool(
     #name="GetWaterParameters",#
     #description="Reads current water parameters from sensors",#
     func=get_water_parameters
 )
 
-WaterQualityDiagnosisTool = FunctionTool(
+WaterQualityDiagnosisTool = CachedFunctionTool(
     #name="WaterQualityDiagnosis",#
     #description="Diagnoses water quality issues based on parameters",#
     func=diagnose_water_quality
 )
 
-CorrectiveActionSuggesterTool = FunctionTool(
+CorrectiveActionSuggesterTool = CachedFunctionTool(
     #name="CorrectiveActionSuggester",#
     #description="Recommends corrective actions for water quality issues",#
     func=suggest_corrective_actions
 )
 
+WaterParameterForecastTool = CachedFunctionTool(
+    #name="WaterParameterForecast",#
+    #description="Forecasts water parameters and time until they leave optimal ranges",#
+    func=forecast_water_parameters
+)
+
 # Create the water quality agent
 class WaterQualityAgent(LlmAgent):
     orchestrator_id: str = "orchestrator"
@@ -187,7 +236,7 @@ class WaterQualityAgent(LlmAgent):
             model=MODEL,
             name=name,
             instruction=prompt.WATER_PROMPT,
-            tools=[GetWaterParametersTool, WaterQualityDiagnosisTool, CorrectiveActionSuggesterTool],
+            tools=[GetWaterParametersTool, WaterQualityDiagnosisTool, CorrectiveActionSuggesterTool, WaterParameterForecastTool],
             output_key="water_agent_output",
             **kwargs
         )
@@ -195,13 +244,13 @@ class WaterQualityAgent(LlmAgent):
     
     def step(self, state, mailbox):
         # Get current water parameters
-        parameters = GetWaterParametersTool.function()
+        parameters = GetWaterParametersTool.func()
         
         # Diagnose water quality
-        diagnosis = WaterQualityDiagnosisTool.function(parameters)
+        diagnosis = WaterQualityDiagnosisTool.func(parameters)
         
         # Suggest corrective actions
-        actions = CorrectiveActionSuggesterTool.function(parameters, diagnosis)
+        actions = CorrectiveActionSuggesterTool.func(parameters, diagnosis)
         
         # Prepare output
         output = {
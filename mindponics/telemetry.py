@@ -0,0 +1,327 @@
+"""Latency and token instrumentation with local Prometheus and OTLP-JSON exporters.
+
+Telemetry runs as observer callbacks on every agent in the tree and records:
+
+* latency histograms per agent run, per model call (agent, model) and per tool call (agent, tool);
+* prompt, completion and cached tokens per agent and model;
+* sub-agent fan-out: AgentTool calls per agent run;
+* hit and miss counts of the in-process caches (tool declarations, compatibility index).
+
+The hot path is a perf_counter() read and a dict insert at the start of each
+call, and a bisect into fixed buckets at the end. The slowest calls are kept as
+spans so p99 outliers can be inspected with their attributes.
+
+render_prometheus() returns the Prometheus text format; export() writes it and
+OTLP/JSON metrics and spans to a directory. Enable it with MINDPONICS_TELEMETRY=true;
+with MINDPONICS_TELEMETRY_DIR set, files are rewritten every MINDPONICS_TELEMETRY_INTERVAL_S
+seconds (default 60).
+"""
+
+import heapq
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; Prometheus `le` upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FANOUT_BUCKETS = (0, 1, 2, 3, 4, 5, 8)
+SLOW_SPANS = 100   # slowest calls kept for the span export
+
+METRICS = {
+    "mindponics_agent_latency_seconds": ("histogram", "Agent run latency"),
+    "mindponics_model_latency_seconds": ("histogram", "Model call latency"),
+    "mindponics_tool_latency_seconds": ("histogram", "Tool call latency"),
+    "mindponics_agent_fanout": ("histogram", "AgentTool calls per agent run"),
+    "mindponics_model_queue_wait_seconds": ("histogram", "Time model requests waited for the scheduler"),
+    "mindponics_session_state_bytes": ("histogram", "Session state bytes at the end of each turn"),
+    "mindponics_model_tokens_total": ("counter", "Model tokens by kind (prompt, completion, cached)"),
+    "mindponics_cache_hits_total": ("counter", "In-process cache hits"),
+    "mindponics_cache_misses_total": ("counter", "In-process cache misses"),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] holds observations <= bounds[i], the last slot the overflow."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.bounds[i - 1] if i > 0 else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+def _labels(labels: tuple) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels)
+
+
+def _cache_stats() -> dict:
+    from .compatibility import get_compatibility_index
+    from .tool_declarations import declaration_cache_stats
+
+    declarations = declaration_cache_stats()
+    index = get_compatibility_index.cache_info()
+    return {
+        "tool_declarations": (declarations["hits"], declarations["misses"]),
+        "compatibility_index": (index.hits, index.misses),
+    }
+
+
+def telemetry_enabled() -> bool:
+    return os.getenv("MINDPONICS_TELEMETRY", "false").lower() in ("1", "true", "yes")
+
+
+class Telemetry:
+    """Records per-agent, per-model and per-tool latency and token metrics."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.slow_spans = []   # min-heap of (duration, seq, span)
+        self._started = {}
+        self._fanout = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._exporter = None
+
+    def __getstate__(self):
+        # Locks and threads cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_exporter"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def install(self, root) -> None:
+        """Adds the observer callbacks ahead of any other callbacks on root and every agent below it."""
+        from .callbacks import add_callbacks, iter_llm_agents
+
+        for agent in iter_llm_agents(root):
+            add_callbacks(
+                agent, prepend=True,
+                before_agent_callback=self.before_agent, after_agent_callback=self.after_agent,
+                before_model_callback=self.before_model, after_model_callback=self.after_model,
+                before_tool_callback=self.before_tool, after_tool_callback=self.after_tool,
+            )
+
+    # Recording
+
+    def observe(self, metric: str, labels: tuple, value: float, buckets: tuple = LATENCY_BUCKETS) -> None:
+        key = (metric, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def add(self, metric: str, labels: tuple, value: float) -> None:
+        key = (metric, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _finish(self, key: tuple, metric: str, labels: tuple) -> None:
+        started = self._started.pop(key, None)
+        if started is None:
+            return
+        end = time.perf_counter()
+        duration = end - started[0]
+        self.observe(metric, labels, duration)
+        if len(self.slow_spans) < SLOW_SPANS or duration > self.slow_spans[0][0]:
+            span = {"name": metric.replace("mindponics_", "").replace("_latency_seconds", ""),
+                    "start_unix": started[1], "duration_s": duration, "attributes": dict(labels)}
+            with self._lock:
+                self._seq += 1
+                item = (duration, self._seq, span)
+                if len(self.slow_spans) < SLOW_SPANS:
+                    heapq.heappush(self.slow_spans, item)
+                else:
+                    heapq.heappushpop(self.slow_spans, item)
+
+    # Callbacks
+
+    def before_agent(self, callback_context):
+        key = ("agent", callback_context.invocation_id, callback_context.agent_name)
+        self._started[key] = (time.perf_counter(), time.time())
+        self._fanout[key] = 0
+        return None
+
+    def after_agent(self, callback_context):
+        key = ("agent", callback_context.invocation_id, callback_context.agent_name)
+        labels = (("agent", callback_context.agent_name),)
+        self._finish(key, "mindponics_agent_latency_seconds", labels)
+        fanout = self._fanout.pop(key, None)
+        if fanout is not None:
+            self.observe("mindponics_agent_fanout", labels, fanout, FANOUT_BUCKETS)
+        return None
+
+    def before_model(self, callback_context, llm_request):
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        self._started[key] = (time.perf_counter(), time.time(), llm_request.model)
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        started = self._started.get(key)
+        # The router may change the model after this observer's before_model ran
+        model = llm_response.model_version or (started[2] if started else None) or "unknown"
+        labels = (("agent", callback_context.agent_name), ("model", model))
+        self._finish(key, "mindponics_model_latency_seconds", labels)
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            for kind, count in (("prompt", usage.prompt_token_count), ("completion", usage.candidates_token_count),
+                                ("cached", usage.cached_content_token_count)):
+                if count:
+                    self.add("mindponics_model_tokens_total", labels + (("kind", kind),), count)
+        return None
+
+    def before_tool(self, tool, args, tool_context):
+        call_id = getattr(tool_context, "function_call_id", None) or id(args)
+        self._started[("tool", tool_context.invocation_id, call_id)] = (time.perf_counter(), time.time())
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        from google.adk.tools.agent_tool import AgentTool
+
+        call_id = getattr(tool_context, "function_call_id", None) or id(args)
+        labels = (("agent", tool_context.agent_name), ("tool", tool.name))
+        self._finish(("tool", tool_context.invocation_id, call_id), "mindponics_tool_latency_seconds", labels)
+        if isinstance(tool, AgentTool):
+            key = ("agent", tool_context.invocation_id, tool_context.agent_name)
+            if key in self._fanout:
+                self._fanout[key] += 1
+        return None
+
+    # Export
+
+    def _snapshot(self) -> tuple:
+        caches = _cache_stats()
+        with self._lock:
+            for cache, (hits, misses) in caches.items():
+                self.counters[("mindponics_cache_hits_total", (("cache", cache),))] = hits
+                self.counters[("mindponics_cache_misses_total", (("cache", cache),))] = misses
+            histograms = {k: (h.bounds, list(h.counts), h.sum, h.count) for k, h in self.histograms.items()}
+            return histograms, dict(self.counters), [span for _, _, span in sorted(self.slow_spans, reverse=True)]
+
+    def render_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        histograms, counters, _ = self._snapshot()
+        lines = []
+        for metric, (kind, help_text) in METRICS.items():
+            series = histograms if kind == "histogram" else counters
+            keys = sorted(k for k in series if k[0] == metric)
+            if not keys:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for key in keys:
+                labels = _labels(key[1])
+                if kind == "counter":
+                    lines.append(f"{metric}{{{labels}}} {series[key]}")
+                    continue
+                bounds, counts, total, count = series[key]
+                cumulative = 0
+                for bound, n in zip(bounds + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {total}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_otlp(self) -> tuple:
+        """Returns (metrics, traces) as OTLP/JSON ExportMetricsServiceRequest and ExportTraceServiceRequest dicts."""
+        histograms, counters, spans = self._snapshot()
+        now_ns = str(time.time_ns())
+        resource = {"attributes": [{"key": "service.name", "value": {"stringValue": "mindponics"}}]}
+        scope = {"name": "mindponics.telemetry"}
+
+        def attributes(labels: tuple) -> list:
+            return [{"key": k, "value": {"stringValue": str(v)}} for k, v in labels]
+
+        metrics = []
+        for metric, (kind, help_text) in METRICS.items():
+            if kind == "histogram":
+                points = [{
+                    "attributes": attributes(key[1]), "timeUnixNano": now_ns,
+                    "count": str(count), "sum": total, "bucketCounts": [str(n) for n in counts],
+                    "explicitBounds": list(bounds),
+                } for key, (bounds, counts, total, count) in sorted(histograms.items()) if key[0] == metric]
+                body = {"histogram": {"dataPoints": points, "aggregationTemporality": 2}}
+            else:
+                points = [{"attributes": attributes(key[1]), "timeUnixNano": now_ns, "asDouble": value}
+                          for key, value in sorted(counters.items()) if key[0] == metric]
+                body = {"sum": {"dataPoints": points, "aggregationTemporality": 2, "isMonotonic": True}}
+            if points:
+                metrics.append({"name": metric, "description": help_text, **body})
+
+        otlp_spans = []
+        for i, span in enumerate(spans):
+            start_ns = int(span["start_unix"] * 1e9)
+            otlp_spans.append({
+                "traceId": f"{start_ns:032x}"[-32:], "spanId": f"{i + 1:016x}", "name": span["name"], "kind": 1,
+                "startTimeUnixNano": str(start_ns), "endTimeUnixNano": str(start_ns + int(span["duration_s"] * 1e9)),
+                "attributes": attributes(tuple(span["attributes"].items())),
+            })
+        return (
+            {"resourceMetrics": [{"resource": resource, "scopeMetrics": [{"scope": scope, "metrics": metrics}]}]},
+            {"resourceSpans": [{"resource": resource, "scopeSpans": [{"scope": scope, "spans": otlp_spans}]}]},
+        )
+
+    def export(self, directory) -> None:
+        """Writes metrics.prom, metrics.otlp.json and slow_spans.otlp.json to directory."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        metrics, traces = self.to_otlp()
+        for name, text in (("metrics.prom", self.render_prometheus()),
+                           ("metrics.otlp.json", json.dumps(metrics)),
+                           ("slow_spans.otlp.json", json.dumps(traces))):
+            tmp = directory / f".{name}.tmp"
+            tmp.write_text(text)
+            tmp.replace(directory / name)
+
+    def start_file_exporter(self, directory, interval_s: float = 60.0) -> None:
+        """Exports to directory every interval_s seconds from a daemon thread."""
+        if self._exporter is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.export(directory)
+                except Exception as e:
+                    logging.error(f"[Telemetry] Export to {directory} failed: {e}")
+
+        self._exporter = threading.Thread(target=loop, name="mindponics-telemetry", daemon=True)
+        self._exporter.start()
+        logging.info(f"[Telemetry] Exporting to {directory} every {interval_s:.0f}s")
+
+
+telemetry = Telemetry()
@@ -0,0 +1,65 @@
+"""Function declarations built once per tool function and shared by every request.
+
+ADK's FunctionTool derives its declaration by introspecting the function's
+signature and docstring on every model call. CachedFunctionTool keys the
+declaration on the function's identity and signature and builds it once, at
+startup via warm_declarations() or on first use, for all agents and sessions.
+Cached declarations are shared objects and must not be mutated.
+"""
+
+import inspect
+import logging
+import threading
+
+from google.adk.tools import FunctionTool
+
+_cache = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+class CachedFunctionTool(FunctionTool):
+    """FunctionTool whose declaration comes from the shared declaration cache."""
+
+    def __init__(self, func, **kwargs):
+        super().__init__(func=func, **kwargs)
+        # Keyed on the function, its signature and docstring; the API variant is added per call
+        self._signature = (str(inspect.signature(func)), func.__doc__, tuple(self._ignore_params))
+
+    def _get_declaration(self):
+        key = (self.func, *self._signature, str(self._api_variant))
+        declaration = _cache.get(key)
+        if declaration is not None:
+            _stats["hits"] += 1
+            return declaration
+        with _lock:
+            declaration = _cache.get(key)
+            if declaration is None:
+                _stats["misses"] += 1
+                declaration = _cache[key] = super()._get_declaration()
+        return declaration
+
+
+def warm_declarations(root) -> int:
+    """Builds the declarations of every CachedFunctionTool under root. Returns how many were built."""
+    from .callbacks import iter_llm_agents
+
+    before = _stats["misses"]
+    for agent in iter_llm_agents(root):
+        for tool in agent.tools:
+            if isinstance(tool, CachedFunctionTool):
+                tool._get_declaration()
+    built = _stats["misses"] - before
+    logging.info(f"[CachedFunctionTool] Prepared {built} tool declarations")
+    return built
+
+
+def declaration_cache_stats() -> dict:
+    """Returns cache hits, misses and the number of cached declarations."""
+    return {**_stats, "size": len(_cache)}
+
+
+def clear_declaration_cache() -> None:
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
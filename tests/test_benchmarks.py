@@ -0,0 +1,26 @@
+"""Test cases for the benchmark suite and the agent step() loops it measures"""
+
+from benchmarks.suite import Mailbox, compare
+from mindponics.sub_agents.plant import PlantGrowthAgent
+from mindponics.sub_agents.water import WaterQualityAgent
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"tools": {"a": {"us_per_call": 10.0}, "b": {"us_per_call": 10.0}},
+                "runner": {"turn": {"median_ms": 20.0, "model_calls_per_turn": 4.0}}}
+    current = {"tools": {"a": {"us_per_call": 10.5}, "b": {"us_per_call": 13.0}},
+               "runner": {"turn": {"median_ms": 19.0, "model_calls_per_turn": 9.0}}}
+
+    regressions = compare(baseline, current, threshold=0.15)
+    assert [(level, name, metric) for level, name, metric, *_ in regressions] == [("tools", "b", "us_per_call")]
+
+
+def test_step_loops_run_their_tools_and_report_to_orchestrator():
+    mailbox = Mailbox()
+    water = WaterQualityAgent(name="HydroGuardian").step({}, mailbox)
+    assert set(water) == {"water_parameters", "diagnosis", "corrective_actions"}
+
+    mailbox.inbox.append(("orchestrator", {"nutrient_levels": {"nitrate": 5.0, "phosphate": 15.0, "potassium": 25.0}}))
+    plant = PlantGrowthAgent(name="FloraFriend").step({"plant_species": "lettuce", "observed_symptoms": "yellow"}, mailbox)
+    assert "nitrogen" in str(plant["plant_health_analysis"]["nutrients"]).lower()
+    assert [recipient for recipient, _ in mailbox.outbox] == ["orchestrator", "orchestrator"]
@@ -0,0 +1,93 @@
+"""Test cases for the ClimateController control loop"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from mindponics.sub_agents.environment import ClimateControlLoop, EnvironmentAgent
+from mindponics.sub_agents.environment.control import make_llm_escalation
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_outputs_follow_error_direction():
+    loop = ClimateControlLoop(["cold", "hot", "dry", "ok"], 25.0, 65.0)
+    outputs = loop.step(np.array([20.0, 30.0, 25.0, 25.1]), np.array([65.0, 65.0, 50.0, 66.0]), now=0.0)
+
+    assert outputs["heating"][0] > 0 and outputs["cooling"][0] == 0
+    assert outputs["cooling"][1] > 0 and outputs["ventilation"][1] > 0
+    assert outputs["humidification"][2] > 0
+    assert all(outputs[name][3] == 0 for name in outputs)
+
+
+def test_escalates_on_fault_and_sustained_saturation():
+    events = []
+    loop = ClimateControlLoop(["a", "b"], 25.0, 65.0, on_escalation=events.append, saturation_hold_s=10.0)
+    for t in range(0, 30, 1):
+        loop.step(np.array([5.0, np.nan]), np.array([65.0, 65.0]), now=float(t))
+
+    assert [(e["zone"], e["reason"]) for e in events] == [("b", "fault"), ("a", "saturation")]
+    assert loop.outputs["heating"][0] == 1.0
+    assert loop.outputs["heating"][1] == 0.0
+
+
+def test_agent_builds_loop_from_its_targets():
+    agent = EnvironmentAgent(name="ClimateController", target_temp=22.0, target_humidity=70.0)
+    loop = agent.build_control_loop([f"zone-{i}" for i in range(300)])
+    assert loop.target_temp.shape == (300,)
+    assert loop.target_humidity[0] == 70.0
+
+
+@pytest.mark.asyncio
+async def test_run_applies_outputs_each_period():
+    applied = []
+    loop = ClimateControlLoop(
+        ["z1", "z2"], 25.0, 65.0,
+        read_zones=lambda zones: (np.array([24.0, 26.0]), np.array([65.0, 65.0])),
+        apply_outputs=lambda zones, outputs: applied.append(outputs),
+        period_s=0.01,
+    )
+    stop = asyncio.Event()
+    task = asyncio.create_task(loop.run(stop))
+    await asyncio.sleep(0.1)
+    stop.set()
+    await task
+    assert len(applied) >= 3
+
+
+class _CountingRunner:
+    def __init__(self):
+        self.messages = []
+        self.active = 0
+        self.max_active = 0
+
+    async def run_async(self, user_id, session_id, new_message):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.messages.append(new_message.parts[0].text)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        yield None
+
+
+@pytest.mark.asyncio
+async def test_read_failure_across_zones_is_one_serialized_llm_message():
+    runner = _CountingRunner()
+    escalation = make_llm_escalation(runner, "operator", "climate")
+    zones = [f"zone-{i}" for i in range(300)]
+
+    def failing_read(zone_ids):
+        raise IOError("gateway offline")
+
+    loop = ClimateControlLoop(zones, 25.0, 65.0, read_zones=failing_read, on_escalation=escalation, period_s=0.005)
+    stop = asyncio.Event()
+    task = asyncio.create_task(loop.run(stop))
+    await asyncio.sleep(0.05)
+    stop.set()
+    await task
+    await escalation.flush()
+
+    assert runner.max_active == 1
+    assert len(runner.messages) == 1
+    assert "300 zone(s)" in runner.messages[0] and "280 more zones (fault)" in runner.messages[0]
@@ -0,0 +1,58 @@
+"""Test cases for compact tool-result serialization"""
+
+from google.adk.models import LlmRequest
+from google.genai.types import Content, FunctionResponse, GenerateContentConfig, Part
+
+from mindponics.compact import CompactToolResults, compact_legend, compact_tool_result, short_keys_in
+from mindponics.context_budget import estimate_tokens
+from mindponics.sub_agents.fish.agent import calculate_feeding, get_fish_species_info
+from mindponics.sub_agents.water.agent import diagnose_water_quality, suggest_corrective_actions
+
+PARAMETERS = {"ph": 6.23, "ammonia": 1.237, "nitrite": 0.612, "nitrate": 40.0,
+              "temperature": 24.04, "dissolved_oxygen": 6.0}
+
+
+def test_echoed_arguments_are_dropped_and_keys_shortened():
+    diagnosis = diagnose_water_quality(PARAMETERS)
+    args = {"parameters": PARAMETERS, "diagnosis": diagnosis}
+    compact = compact_tool_result("suggest_corrective_actions", args, suggest_corrective_actions(**args), shorten=True)
+
+    assert set(compact) == {"A", "pr"}
+    assert short_keys_in(compact) >= {"A", "pr"}
+    assert "A=actions" in compact_legend(short_keys_in(compact))
+
+
+def test_floats_are_rounded_to_sensor_precision():
+    compact = compact_tool_result("diagnose_water_quality", {}, diagnose_water_quality(PARAMETERS), shorten=True)
+    assert compact["P"]["ph"] == 6.2
+    assert compact["P"]["ammonia"] == 1.24
+
+
+def test_redundant_life_stage_table_is_dropped():
+    compact = compact_tool_result("get_fish_species_info", {"species": "trout", "life_stage": "fry"},
+                                  get_fish_species_info("trout", "fry"), shorten=True)
+    assert "LS" not in compact
+    assert compact["oT"] == [12, 18]
+
+
+def test_keys_are_kept_when_the_legend_would_cost_more():
+    args = {"species": "trout", "life_stage": "fry", "fish_count": 250, "avg_weight_g": 12.5}
+    compact = compact_tool_result("calculate_feeding", args, calculate_feeding(**args))
+    assert not short_keys_in(compact)
+    assert estimate_tokens(compact) < estimate_tokens(calculate_feeding(**args))
+
+
+def test_legend_covers_only_keys_in_the_request():
+    compact = compact_tool_result("get_fish_species_info", {"species": "trout", "life_stage": "fry"},
+                                  get_fish_species_info("trout", "fry"), shorten=True)
+    request = LlmRequest(
+        config=GenerateContentConfig(system_instruction="You are PiscinePro."),
+        contents=[Content(role="user", parts=[Part(function_response=FunctionResponse(
+            name="get_fish_species_info", response=compact))])],
+    )
+    CompactToolResults().before_model(None, request)
+
+    instruction = request.config.system_instruction
+    assert instruction.startswith("You are PiscinePro.") and "oT=optimal_temp" in instruction
+    assert "A=actions" not in instruction
+    assert compact_legend(set()) == ""
@@ -0,0 +1,45 @@
+"""Test cases for the fish-plant compatibility index"""
+
+import random
+
+from mindponics.compatibility import IntervalIndex, find_compatible_species
+
+
+def test_interval_index_counts_and_lists_overlaps():
+    index = IntervalIndex([(10, 16), (15, 21), (22, 30), (18, 26)])
+    assert index.count(16, 19) == 3
+    assert sorted(index.overlapping(16, 19)) == [0, 1, 3]
+    assert index.count(31, 40) == 0
+    assert sorted(index.overlapping(21, 22)) == [1, 2, 3]
+    assert index.overlapping(31, 40) == []
+
+
+def test_interval_index_matches_brute_force():
+    rng = random.Random(7)
+    intervals = [(a, a + rng.uniform(0, 10)) for a in (rng.uniform(0, 100) for _ in range(300))]
+    index = IntervalIndex(intervals)
+    for _ in range(100):
+        low = rng.uniform(-5, 105)
+        high = low + rng.uniform(0, 15)
+        expected = [i for i, (a, b) in enumerate(intervals) if a <= high and b >= low]
+        assert sorted(index.overlapping(low, high)) == expected
+        assert index.count(low, high) == len(expected)
+
+
+def test_trout_pairs_with_lettuce_using_life_stage_temperatures():
+    result = find_compatible_species("Trout")
+    pairs = {(p["life_stage"], p["partner"]): p for p in result["compatible"]}
+
+    assert result["kind"] == "fish"
+    # Fry run 2 °C warmer (12-18 °C); that only touches the tomato range at 18 °C
+    assert pairs[("fry", "lettuce")]["shared_temp"] == (15, 18)
+    assert ("fry", "tomato") not in pairs
+    assert ("adult", "tomato") not in pairs
+    assert all(p["score"] > 0 for p in result["compatible"])
+    assert result["compatible"][0]["score"] >= result["compatible"][-1]["score"]
+
+
+def test_plant_lookup_and_min_score():
+    result = find_compatible_species("tomato", min_score=0.05)
+    assert {p["partner"] for p in result["compatible"]} == {"tilapia"}
+    assert "error" in find_compatible_species("carp")
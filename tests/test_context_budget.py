@@ -0,0 +1,98 @@
+"""Test cases for prompt and state token budgeting"""
+
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai.types import Content, FunctionCall, FunctionResponse, Part
+
+from mindponics.context_budget import ContextBudget, budget_from_env, estimate_tokens, measure_prompt_sections
+from mindponics.sub_agents.water.agent import diagnose_water_quality, suggest_corrective_actions
+
+PARAMETERS = {"ph": 7.0, "ammonia": 1.2, "nitrite": 0.6, "nitrate": 40.0, "temperature": 24.0, "dissolved_oxygen": 6.0}
+
+
+def _context(invocation_id="inv-1"):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name="HydroGuardian", state={})
+
+
+def _tool_round(name, args, result):
+    return [
+        Content(role="model", parts=[Part(function_call=FunctionCall(name=name, args=args))]),
+        Content(role="user", parts=[Part(function_response=FunctionResponse(name=name, response=result))]),
+    ]
+
+
+def test_nested_tool_payloads_are_replaced_with_references():
+    diagnosis = diagnose_water_quality(PARAMETERS)
+    actions = suggest_corrective_actions(PARAMETERS, diagnosis)
+    request = LlmRequest(contents=[
+        Content(role="user", parts=[Part(text="Check the water")]),
+        *_tool_round("diagnose_water_quality", {"parameters": PARAMETERS}, diagnosis),
+        *_tool_round("suggest_corrective_actions", {"parameters": PARAMETERS, "diagnosis": diagnosis}, actions),
+    ])
+    budget = ContextBudget()
+    budget.start_turn(_context())
+    budget.before_model(_context(), request)
+
+    diagnosis_response = request.contents[2].parts[0].function_response.response
+    actions_response = request.contents[4].parts[0].function_response.response
+    assert diagnosis_response["parameters"] == {"$ref": "contents[1].diagnose_water_quality.args.parameters"}
+    assert actions_response["diagnosis"] == {"$ref": "contents[2].diagnose_water_quality.result"}
+    assert actions_response["actions"] == actions["actions"]
+
+
+def test_references_distinguish_repeated_calls_of_a_tool():
+    first = diagnose_water_quality(PARAMETERS)
+    second = diagnose_water_quality({**PARAMETERS, "ammonia": 3.0})
+    request = LlmRequest(contents=[
+        Content(role="user", parts=[Part(text="Check the water twice")]),
+        *_tool_round("diagnose_water_quality", {}, first),
+        *_tool_round("diagnose_water_quality", {}, second),
+        *_tool_round("suggest_corrective_actions", {"diagnosis": second}, {"echo": second}),
+    ])
+    budget = ContextBudget()
+    budget.start_turn(_context())
+    budget.before_model(_context(), request)
+
+    assert request.contents[6].parts[0].function_response.response["echo"] == {
+        "$ref": "contents[4].diagnose_water_quality.result"
+    }
+
+
+def test_measure_prompt_sections_without_config():
+    request = LlmRequest(contents=[Content(role="user", parts=[Part(text="hello")])])
+    request.config = None
+    assert measure_prompt_sections(request)["tools"] == 0
+
+
+def test_old_turns_are_shortened_when_over_budget():
+    long_text = "ammonia spike " * 400
+    contents = [Content(role="user", parts=[Part(text=long_text)]) for _ in range(4)]
+    request = LlmRequest(contents=contents)
+    budget = ContextBudget(max_prompt_tokens=1000, keep_recent_contents=1, max_old_part_tokens=50)
+    budget.start_turn(_context())
+    budget.before_model(_context(), request)
+
+    assert request.contents[0].parts[0].text.endswith("tokens]")
+    assert request.contents[-1].parts[0].text == long_text
+
+
+def test_state_entries_are_trimmed_and_turn_savings_reported():
+    budget = ContextBudget(max_state_tokens=10)
+    budget._output_keys["HydroGuardian"] = "water_agent_output"
+    context = _context()
+    context.state["water_agent_output"] = "x" * 400
+    budget.start_turn(context)
+    budget.after_agent(context)
+
+    assert estimate_tokens(context.state["water_agent_output"]) < 20
+    assert budget.totals["turns"] == 1 and budget.totals["tokens_saved"] > 80
+
+
+def test_budgets_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MINDPONICS_CONTEXT_MAX_PROMPT_TOKENS", "2000")
+    monkeypatch.setenv("MINDPONICS_CONTEXT_MAX_STATE_TOKENS", "300")
+    monkeypatch.setenv("MINDPONICS_CONTEXT_DEDUPE", "false")
+    budget = budget_from_env()
+    assert (budget.max_prompt_tokens, budget.max_state_tokens, budget.dedupe) == (2000, 300, False)
+    assert budget.keep_recent_contents == ContextBudget().keep_recent_contents
@@ -0,0 +1,45 @@
+"""Test cases for the parallel, cached evaluation runner"""
+
+import asyncio
+
+from eval.runner import agent_graph_hash, evaluate, rouge1_f
+from mindponics.agent import build_root_agent
+from mindponics.fake_llm import fake_llm
+
+EVAL_SET = {
+    "eval_set_id": "smoke",
+    "eval_cases": [{
+        "eval_id": "water",
+        "session_input": {"app_name": "mindponics", "user_id": "u", "state": {}},
+        "conversation": [{
+            "user_content": {"parts": [{"text": "What is the ammonia level in the water?"}], "role": "user"},
+            "final_response": {"parts": [{"text": "AquaMaestro summary for the ammonia level"}]},
+            "intermediate_data": {"tool_uses": [{"name": "HydroGuardian", "args": {}}]},
+        }],
+    }],
+}
+
+
+def test_rouge1_f():
+    assert rouge1_f("the pH is stable", "The pH is stable.") == 1.0
+    assert rouge1_f("ammonia high", "nitrate low") == 0.0
+    assert 0 < rouge1_f("ammonia is high today", "ammonia is high") < 1
+
+
+def test_runs_concurrently_and_serves_unchanged_cases_from_cache(tmp_path):
+    root = build_root_agent()
+    with fake_llm(root, latency_s=0.05):
+        first = asyncio.run(evaluate(root, EVAL_SET, num_runs=4, concurrency=4, cache_dir=tmp_path))
+        second = asyncio.run(evaluate(root, EVAL_SET, num_runs=4, concurrency=4, cache_dir=tmp_path))
+        graph = agent_graph_hash(root)
+
+    case = first["cases"]["water"]
+    assert case["scores"]["tool_trajectory_avg_score"] == 1.0
+    assert case["scores"]["response_match_score"] > 0.2
+    assert case["prompt_tokens"] > 0 and case["model_calls"] == 4
+    assert case["cached_runs"] == 0
+    # Four runs of four 50 ms model calls each take 0.8 s one after another
+    assert first["wall_s"] < 0.7
+    assert second["cases"]["water"]["cached_runs"] == 4
+    assert second["cases"]["water"]["scores"] == case["scores"]
+    assert graph != agent_graph_hash(root)   # the real model is back
@@ -0,0 +1,57 @@
+"""Test cases for the offline fake model"""
+
+import asyncio
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from mindponics.agent import build_root_agent
+from mindponics.fake_llm import ResponseRecorder, fake_llm
+
+
+def _run_turn(root, text: str) -> list:
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        return [e async for e in runner.run_async(user_id="u", session_id=session.id, new_message=message)]
+
+    return asyncio.run(run())
+
+
+def test_default_policy_delegates_to_matching_specialists():
+    root = build_root_agent()
+    with fake_llm(root) as models:
+        events = _run_turn(root, "Is the water ammonia safe for my fish?")
+
+    calls = [p.function_call.name for e in events for p in e.content.parts if p.function_call]
+    assert calls == ["HydroGuardian", "PiscinePro"]
+    answer = events[-1].content.parts[0].text
+    assert "get_water_parameters" in answer
+    assert models["HydroGuardian"].calls == 2
+    assert events[-1].usage_metadata.prompt_token_count > 0
+    assert not isinstance(root.model, type(models["AquaMaestro"]))
+
+
+def test_recorded_responses_replay():
+    root = build_root_agent()
+    recorder = ResponseRecorder()
+    recorder.install(root)
+    with fake_llm(root):
+        first = _run_turn(root, "Why are the plant leaves yellow?")
+    with fake_llm(root, script=recorder.script, latency_s=0.001):
+        replay = _run_turn(root, "Something else entirely")
+
+    assert set(recorder.script) == {"AquaMaestro", "FloraFriend"}
+    assert replay[-1].content.parts[0].text == first[-1].content.parts[0].text
+
+
+def test_script_ending_on_a_function_call_terminates():
+    root = build_root_agent()
+    script = {"AquaMaestro": [{"function_calls": [{"name": "FloraFriend", "args": {"request": "leaves"}}]}]}
+    with fake_llm(root, script=script) as models:
+        events = _run_turn(root, "Check the leaves")
+
+    assert models["AquaMaestro"].calls == 2
+    assert events[-1].content.parts[0].text.startswith("AquaMaestro summary")
@@ -0,0 +1,51 @@
+"""Test cases for the batched farm report"""
+
+import asyncio
+import json
+
+from mindponics.fake_llm import FakeLlm
+from mindponics.farm_report import OPTIMAL_NARRATIVE, cluster_tanks, diagnose_tank, generate_farm_report
+
+OPTIMAL = {"ph": 7.0, "ammonia": 0.1, "nitrite": 0.05, "nitrate": 40.0, "temperature": 24.0, "dissolved_oxygen": 6.5}
+
+
+def _farm() -> dict:
+    readings = {f"ok-{i}": dict(OPTIMAL) for i in range(10)}
+    # Same issues at different values cluster together
+    readings.update({f"ammonia-{i}": {**OPTIMAL, "ammonia": round(0.8 + i / 100, 2)} for i in range(5)})
+    readings["acid"] = {**OPTIMAL, "ph": 6.0}
+    return readings
+
+
+def test_tanks_with_the_same_issues_share_a_cluster():
+    tanks = {tank_id: diagnose_tank(r) for tank_id, r in _farm().items()}
+    clusters = cluster_tanks(tanks)
+
+    assert [len(c["tanks"]) for c in clusters] == [5, 10, 1]   # the critical ammonia group first
+    assert clusters[0]["tanks"][0].startswith("ammonia")
+
+
+def test_report_makes_one_model_call_and_fans_narratives_out():
+    script = {"FarmReport": [{"text": json.dumps({"group-1": "Ammonia is high: cut feeding.", "group-3": "pH is low."})}]}
+    model = FakeLlm(agent_name="FarmReport", script=script)
+    report = asyncio.run(generate_farm_report(_farm(), model))
+
+    assert model.calls == 1 and report["model_calls"] == 1
+    assert report["tank_count"] == 16 and report["cluster_count"] == 3
+    assert all(report["tanks"][f"ammonia-{i}"]["narrative"] == "Ammonia is high: cut feeding." for i in range(5))
+    assert report["tanks"]["acid"]["narrative"] == "pH is low."
+    assert report["tanks"]["ok-3"]["narrative"] == OPTIMAL_NARRATIVE
+    assert report["tanks"]["ammonia-2"]["readings"]["ammonia"] == 0.82
+    assert report["prompt_tokens"] > 0
+    json.dumps(report)
+
+
+def test_unparseable_answer_falls_back_and_optimal_farm_skips_the_model():
+    model = FakeLlm(agent_name="FarmReport", script={"FarmReport": [{"text": "Sorry, I cannot help."}]})
+    report = asyncio.run(generate_farm_report(_farm(), model))
+    assert {c["source"] for c in report["clusters"]} == {"deterministic"}
+    assert "High ammonia (critical)" in report["tanks"]["ammonia-0"]["narrative"]
+
+    model = FakeLlm(agent_name="FarmReport")
+    report = asyncio.run(generate_farm_report({f"ok-{i}": dict(OPTIMAL) for i in range(20)}, model))
+    assert model.calls == 0 and report["model_calls"] == 0 and report["cluster_count"] == 1
@@ -0,0 +1,88 @@
+"""Test cases for water and climate parameter forecasting"""
+
+import numpy as np
+
+from mindponics.forecasting import ForecastStore
+
+
+def _feed_rising_ammonia(store, tank_id="t1", hours=12):
+    for h in range(hours):
+        store.observe(tank_id, {"ammonia": 0.1 + 0.02 * h, "ph": 7.0}, timestamp=h * 3600.0)
+
+
+def test_time_to_threshold_for_rising_series():
+    store = ForecastStore(alpha=0.8, beta=0.5, gamma=0.0)
+    _feed_rising_ammonia(store)
+
+    report = store.forecast("t1", ["ammonia", "ph"], {"ammonia": (0.0, 0.5), "ph": (6.5, 7.5)}, horizon_hours=24)
+
+    assert report["ammonia"]["crosses"] == "high"
+    assert 6.0 <= report["ammonia"]["hours_to_threshold"] <= 12.0
+    assert "hours_to_threshold" not in report["ph"]
+
+
+def test_forecast_all_is_vectorized_and_cached_until_next_reading():
+    store = ForecastStore()
+    for tank in range(50):
+        _feed_rising_ammonia(store, f"tank-{tank}", hours=4)
+
+    first = store.forecast_all(horizon_hours=6)
+    dirty = store._cache[(6, 1.0)]["dirty"]
+    assert first["values"].shape == (100, 6)
+    assert not dirty[:100].any()
+
+    store.observe("tank-3", {"ammonia": 5.0}, timestamp=5 * 3600.0)
+    assert dirty[:100].sum() == 1
+    second = store.forecast_all(horizon_hours=6)
+    changed = np.flatnonzero((first["values"] != second["values"]).any(axis=1))
+    assert [second["series"][i] for i in changed] == [("tank-3", "ammonia")]
+
+
+def test_each_horizon_keeps_its_own_cached_forecast():
+    store = ForecastStore()
+    for tank in range(10):
+        _feed_rising_ammonia(store, f"tank-{tank}", hours=4)
+
+    # A tool forecasting 24h at half-hour steps and a dashboard forecasting 6h hourly no longer evict each other
+    store.forecast("tank-1", ["ammonia"], {}, horizon_hours=24, step_hours=0.5)
+    store.forecast_all(horizon_hours=6)
+    store.observe("tank-1", {"ammonia": 1.0}, timestamp=5 * 3600.0)
+    store.forecast("tank-1", ["ammonia"], {}, horizon_hours=24, step_hours=0.5)
+
+    assert set(store._cache) == {(48, 0.5), (6, 1.0)}
+    assert store._cache[(48, 0.5)]["dirty"][:20].sum() == 0
+    assert store._cache[(6, 1.0)]["dirty"][:20].sum() == 1
+
+
+def test_batch_observations_apply_in_time_order():
+    batched, sequential = ForecastStore(), ForecastStore()
+    times = [3 * 3600.0, 3600.0, 2 * 3600.0]
+    values = [0.3, 0.1, 0.2]
+    batched.observe_many(["t"] * 3, ["nitrite"] * 3, values, times)
+    for t, v in sorted(zip(times, values)):
+        sequential.observe("t", {"nitrite": v}, timestamp=t)
+
+    np.testing.assert_allclose(batched.forecast_all()["values"], sequential.forecast_all()["values"])
+
+
+def test_short_history_is_reported():
+    store = ForecastStore()
+    store.observe("t", {"nitrate": 40.0}, timestamp=0.0)
+    assert store.forecast("t", ["nitrate", "nitrite"], {})["nitrate"]["status"] == "insufficient_history"
+
+
+def test_climate_forecast_uses_tool_readings_but_not_control_reads():
+    from mindponics.forecasting import get_forecast_store
+    from mindponics.sub_agents.environment.agent import forecast_climate
+    from mindponics.sub_agents.environment.control import read_simulated_zones
+
+    store = get_forecast_store()
+    before = len(store)
+    read_simulated_zones([f"zone-{i}" for i in range(50)])
+    assert len(store) == before
+
+    for hour in range(12):
+        store.observe("greenhouse", {"ambient_temperature": 20.0 + hour, "humidity": 65.0}, timestamp=hour * 3600.0)
+    report = forecast_climate("greenhouse", horizon_hours=24.0)
+    assert report["upcoming_issues"][0] == "ambient_temperature"
+    assert report["forecasts"]["ambient_temperature"]["crosses"] == "high"
@@ -0,0 +1,55 @@
+"""Test cases for the ClimateController greenhouse model"""
+
+import numpy as np
+
+from mindponics.sub_agents.environment import ClimateControlLoop, GreenhouseModel
+
+
+def _simulate(model, steps=400, dt=30.0):
+    rng = np.random.default_rng(0)
+    history = {key: [] for key in ("timestamp", "temperature", "humidity", "heating",
+                                   "ventilation", "humidification", "light_level")}
+    temperature, humidity = np.array([20.0]), np.array([60.0])
+    for k in range(steps):
+        controls = {"heating": rng.uniform(), "ventilation": rng.uniform(), "humidification": rng.uniform()}
+        light = rng.uniform(0, 1000)
+        for key, value in (("timestamp", k * dt), ("temperature", temperature[0]), ("humidity", humidity[0]),
+                           ("light_level", light), *controls.items()):
+            history[key].append(value)
+        d_temp, d_humidity = model.derivatives(temperature, humidity, np.array([light]),
+                                               {n: np.array([v]) for n, v in controls.items()})
+        temperature, humidity = temperature + d_temp * dt, humidity + d_humidity * dt
+    return history
+
+
+def test_fit_recovers_parameters_and_caches_them_per_zone():
+    truth = GreenhouseModel(["zone"])
+    truth.thermal[0] = [4e-4, 1e-3, 2e-3, 1.5e-3, 3e-6]
+    history = _simulate(truth)
+
+    model = GreenhouseModel(["zone", "other"])
+    fitted = model.fit_zone("zone", history)
+
+    np.testing.assert_allclose(list(fitted["thermal"].values())[:3], [4e-4, 1e-3, 2e-3], rtol=0.05)
+    assert model.fitted["zone"]["samples"] == 399
+    assert "other" not in model.fitted
+
+
+def test_predict_is_vectorized_over_zones():
+    model = GreenhouseModel([f"z{i}" for i in range(200)], outdoor_temp=10.0)
+    forecast = model.predict(25.0, 60.0, light_level=0.0, horizon_s=7200, step_s=60)
+
+    assert forecast["temperature"].shape == (200, 120)
+    # Without heating or light the zones cool towards the outdoor temperature
+    assert (np.diff(forecast["temperature"], axis=1) < 0).all()
+
+
+def test_controller_acts_on_predicted_deviation():
+    zones = ["z"]
+    model = GreenhouseModel(zones, outdoor_temp=0.0)
+    reactive = ClimateControlLoop(zones, 25.0, 65.0)
+    predictive = ClimateControlLoop(zones, 25.0, 65.0, model=model, lookahead_s=600)
+
+    # At the setpoint now, but a cold night will pull the zone down
+    assert reactive.step(np.array([25.0]), np.array([65.0]), now=0.0)["heating"][0] == 0.0
+    assert predictive.step(np.array([25.0]), np.array([65.0]), now=0.0)["heating"][0] > 0.0
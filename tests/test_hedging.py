@@ -0,0 +1,67 @@
+"""Test cases for hedged and deadline-bounded delegations"""
+
+import asyncio
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from mindponics.fake_llm import FakeLlm, install_fake_llm
+from mindponics.hedging import HedgedAgentTool, HedgingPolicy
+from mindponics.routing import _forced_tier
+from mindponics.sub_agents.water import WaterQualityAgent
+
+
+class SlowUnlessHedged(FakeLlm):
+    """Answers after latency_s, except for calls made on a forced (hedge) tier."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if _forced_tier.get() is None:
+            await asyncio.sleep(self.latency_s)
+        async for response in FakeLlm.generate_content_async(self.model_copy(update={"latency_s": 0.0}), llm_request, stream):
+            yield response
+
+
+def _delegate(policy: HedgingPolicy, hedge_is_fast: bool) -> dict:
+    water = WaterQualityAgent(name="HydroGuardian")
+    root = LlmAgent(name="AquaMaestro", model="gemini-2.5-pro", instruction="x",
+                    tools=[HedgedAgentTool(agent=water, policy=policy)])
+    install_fake_llm(root)
+    model = SlowUnlessHedged if hedge_is_fast else FakeLlm
+    water.model = model(agent_name="HydroGuardian", latency_s=2.0)
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="What is the ammonia level in the water?")])
+        return [e async for e in runner.run_async(user_id="u", session_id=session.id, new_message=message)]
+
+    events = asyncio.run(run())
+    return next(p.function_response.response for e in events for p in e.content.parts if p.function_response)
+
+
+def test_slow_delegation_is_hedged_and_the_hedge_wins():
+    policy = HedgingPolicy(hedge_after_s=0.05, deadline_s=1.0)
+    response = _delegate(policy, hedge_is_fast=True)
+
+    assert "HydroGuardian summary" in response["result"]
+    report = policy.report()["HydroGuardian"]
+    assert report["hedged"] == 1 and report["hedge_wins"] == 1 and report["fallbacks"] == 0
+    assert report["hedge_rate"] == 1.0
+
+
+def test_deadline_returns_deterministic_tool_output():
+    policy = HedgingPolicy(hedge_after_s=0.05, deadline_s=0.2)
+    response = _delegate(policy, hedge_is_fast=False)
+
+    assert response["fallback"] == "deterministic"
+    assert "ammonia" in response["tool_results"]["get_water_parameters"]
+    assert policy.report()["HydroGuardian"]["fallback_rate"] == 1.0
+
+
+def test_hedge_delay_follows_the_tracked_p95():
+    policy = HedgingPolicy(hedge_after_s=5.0)
+    assert policy.hedge_delay("FloraFriend") == 5.0
+    for i in range(100):
+        policy.record("FloraFriend", i / 100)
+    assert policy.hedge_delay("FloraFriend") == 0.95
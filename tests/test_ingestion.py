@@ -0,0 +1,126 @@
+"""Test cases for the sensor ingestion gateway"""
+
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from mindponics.forecasting import ForecastStore
+from mindponics.ingestion import (
+    Backpressure, IngestionGateway, MalformedPayload, decode, encode_binary, encode_lines, parameter_table,
+)
+from mindponics.sub_agents.water.agent import get_water_parameters
+from utils import sensor_acquisition
+from utils.sensor_acquisition import SensorSnapshot
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _gateway(**kwargs) -> IngestionGateway:
+    return IngestionGateway(store=ForecastStore(), snapshot=SensorSnapshot(), **kwargs)
+
+
+def test_line_and_binary_payloads_decode_to_the_same_columns():
+    names = parameter_table()[0]
+    lines = encode_lines([("tank-7", {"ph": 7.25, "ammonia": 0.5}, 1000.0)])
+    binary = encode_binary([7, 7], ["ph", "ammonia"], [7.25, 0.5], [1000.0, 1000.0])
+
+    for payload in (lines, binary):
+        (tanks, codes, values, timestamps), rejected = decode(payload)
+        assert list(tanks) == ["tank-7", "tank-7"] and rejected == 0
+        assert [names[c] for c in codes] == ["ph", "ammonia"]
+        assert values.tolist() == [7.25, 0.5] and timestamps.tolist() == [1000.0, 1000.0]
+
+
+def test_unknown_parameters_and_implausible_values_are_rejected():
+    payload = encode_lines([("tank-1", {"ph": 15.0, "salinity": 3.0, "nitrate": float("nan"), "nitrite": 0.1}, None)])
+    (tanks, codes, values, _), rejected = decode(payload)
+    assert rejected == 3 and values.tolist() == [0.1]
+
+    with pytest.raises(MalformedPayload):
+        decode(b"tank-1 ph=seven\n")
+    with pytest.raises(MalformedPayload):
+        decode(b"MPB1" + b"\x00" * 5)
+
+
+@pytest.mark.asyncio
+async def test_readings_are_batched_into_the_store_snapshot_and_alerts():
+    gateway = _gateway(batch_size=1000)
+    tanks = np.repeat(np.arange(50), 6 * 20)
+    parameters = list(parameter_table()[0]) * (50 * 20)
+    values = np.tile([7.0, 0.1, 0.05, 40.0, 24.0, 6.5], 50 * 20)
+    values[0] = 9.0   # tank 0, the default tank, pH above the optimal range
+    timestamps = 1000.0 + np.tile(np.repeat(np.arange(20) * 600.0, 6), 50)
+
+    result = gateway.submit(encode_binary(tanks, parameters, values, timestamps))
+    assert result == {"accepted": 6000, "rejected": 0}
+    assert await gateway.flush() == 6000
+
+    assert gateway.stats["batches"] == 6 and gateway.stats["written"] == 6000
+    assert len(gateway.store) == 300
+    assert gateway.store.forecast("tank-3", ["ph"], {})["ph"]["current"] == pytest.approx(7.0)
+    assert gateway.snapshot.latest("tank-3")["oxygen"] == pytest.approx(6.5)
+    assert gateway.stats["alerts"] == 1 and gateway.alerts[0]["tank_id"] == "default"
+
+
+@pytest.mark.asyncio
+async def test_http_and_udp_intake_with_backpressure():
+    gateway = _gateway(max_pending=10, flush_interval_s=10)
+    ports = await gateway.start(udp_port=0, http_port=0)
+
+    async def post(body: bytes) -> tuple:
+        reader, writer = await asyncio.open_connection("127.0.0.1", ports["http"])
+        writer.write(f"POST /ingest HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1]), response
+
+    try:
+        status, response = await post(encode_lines([("tank-1", {"ph": 7.0, "nitrate": 30.0}, None)]))
+        assert status == 202 and b'"accepted": 2' in response
+        assert (await post(b"tank-1 ph\n"))[0] == 400
+
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=("127.0.0.1", ports["udp"]))
+        transport.sendto(encode_lines([("tank-2", {"ph": 7.0}, None)] * 5))
+        transport.close()
+        await asyncio.sleep(0.05)
+        assert gateway.stats["accepted"] == 7
+
+        # 7 readings wait for the writer; 5 more would pass max_pending
+        status, response = await post(encode_lines([("tank-3", {"ph": 7.0}, None)] * 5))
+        assert status == 429 and b"Retry-After: 1" in response
+        with pytest.raises(Backpressure):
+            gateway.submit(encode_lines([("tank-3", {"ph": 7.0}, None)] * 5))
+    finally:
+        await gateway.stop()
+
+    assert gateway.stats["written"] == 7 and gateway.stats["backpressured"] == 2
+    assert gateway.snapshot.latest("tank-2") == {"ph": 7.0}
+
+
+@pytest.mark.asyncio
+async def test_ingested_readings_reach_the_water_tool(monkeypatch):
+    monkeypatch.setattr(sensor_acquisition, "sensor_snapshot", SensorSnapshot())
+    gateway = IngestionGateway(store=ForecastStore(), snapshot=sensor_acquisition.sensor_snapshot)
+    gateway.submit(encode_lines([("tank-5", {"ph": 6.4, "ammonia": 0.75}, None)]))
+    gateway.submit(encode_binary([0], ["nitrate"], [35.0], [0.0]))
+    await gateway.flush()
+
+    parameters = get_water_parameters("tank-5")
+    assert parameters["ph"] == 6.4 and parameters["ammonia"] == 0.75
+    assert "ph" not in parameters["simulated_fields"] and "nitrate" in parameters["simulated_fields"]
+    assert get_water_parameters()["nitrate"] == 35.0
+
+
+def test_start_in_thread_raises_when_the_port_is_taken():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        gateway = _gateway()
+        with pytest.raises(OSError):
+            gateway.start_in_thread("127.0.0.1", udp_port=0, http_port=taken.getsockname()[1])
+
+    assert gateway._thread is None and gateway.ports == {}
+    assert gateway._writer is None and not gateway._servers
@@ -0,0 +1,30 @@
+"""Test cases for the deployment load test in local mode"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("absl", reason="the load test is part of the deployment dependency group")
+
+from deployment.run_load_test import LocalClient, load_queries, percentile, run_level  # noqa: E402
+from mindponics.agent import build_root_agent  # noqa: E402
+from mindponics.fake_llm import fake_llm  # noqa: E402
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_local_level_reports_latency_and_time_to_first_event():
+    queries = load_queries()
+    assert "Hello MindPonics, what can you do?" in queries
+    root = build_root_agent()
+    with fake_llm(root, latency_s=0.01):
+        level = asyncio.run(run_level(LocalClient(root), ["What is the ammonia level in the water?"], 4, 200.0, 12))
+
+    assert level["errors"] == 0 and level["throughput_rps"] > 0
+    assert 0 < level["ttfe_p50_ms"] <= level["latency_p50_ms"] <= level["latency_p95_ms"] <= level["latency_p99_ms"]
@@ -0,0 +1,50 @@
+"""Test cases for the FloraFriend nutrient analysis tools"""
+
+import numpy as np
+
+from mindponics.sub_agents.plant.agent import (
+    analyze_nutrient_levels_batch,
+    get_plant_species_info,
+    identify_nutrient_deficiency,
+)
+
+
+def test_batch_analysis_applies_life_stage_adjustment():
+    """Seedling ranges are scaled down, fruiting tomato ranges are scaled up."""
+    result = analyze_nutrient_levels_batch(
+        [15.0, 15.0, 40.0],
+        [20.0, 20.0, 20.0],
+        [30.0, 30.0, 30.0],
+        ["lettuce", "lettuce", "tomato"],
+        ["seedling", "vegetative", "fruiting"],
+    )
+
+    assert result["ranges"].shape == (3, 3, 2)
+    # Lettuce seedling nitrogen: medium need, 0.7 adjust -> 14-35 ppm
+    np.testing.assert_allclose(result["ranges"][0, 0], (14.0, 35.0))
+    assert not result["deficient"][0, 0]
+    assert result["deficient"][1, 0]
+    # Tomato fruiting nitrogen: high need (1.25) and 1.3 adjust -> 32.5-81.25 ppm
+    np.testing.assert_allclose(result["ranges"][2, 0], (32.5, 81.25))
+    assert not result["excess"][2].any()
+
+
+def test_batch_analysis_broadcasts_single_species():
+    result = analyze_nutrient_levels_batch(
+        np.full(4, 60.0), np.full(4, 20.0), np.full(4, 30.0), "unknown", ""
+    )
+    assert result["excess"][:, 0].all()
+    assert not result["deficient"].any()
+
+
+def test_per_bed_tool_delegates_to_batch_ranges():
+    generic = identify_nutrient_deficiency("wilting", 15.0, 20.0, 30.0)
+    assert generic["deficiencies"][0]["issue"] == "Nitrogen deficiency"
+
+    seedling = identify_nutrient_deficiency("wilting", 15.0, 20.0, 30.0, "lettuce", "seedling")
+    assert seedling["status"] == "No nutrient deficiencies detected"
+
+
+def test_species_info_reports_adjusted_ranges():
+    info = get_plant_species_info("tomato", "seedling")
+    assert info["nutrient_ranges"]["phosphorus"] == (7.5, 22.5)
@@ -0,0 +1,65 @@
+"""Test cases for the session-start sensor prefetch"""
+
+import asyncio
+import time
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from mindponics.fake_llm import install_fake_llm
+from mindponics.prefetch import SNAPSHOT_KEY, SessionPrefetcher, _served_value, take_snapshot
+from mindponics.sub_agents.water import WaterQualityAgent
+from mindponics.sub_agents.water import agent as water_agent
+
+
+def _run_turns(prefetcher: SessionPrefetcher, turns: int) -> dict:
+    root = LlmAgent(name="AquaMaestro", model="gemini-2.5-pro", instruction="x",
+                    tools=[AgentTool(agent=WaterQualityAgent(name="HydroGuardian"))])
+    prefetcher.install(root)
+    install_fake_llm(root)
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        for _ in range(turns):
+            message = types.Content(role="user", parts=[types.Part(text="How is the water?")])
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                pass
+        session = await runner.session_service.get_session(app_name="mindponics", user_id="u", session_id=session.id)
+        return session.state
+
+    return asyncio.run(run())
+
+
+def test_first_turn_is_served_from_the_prefetched_snapshot(monkeypatch):
+    reads = []
+    monkeypatch.setattr(water_agent, "get_sensor_data", lambda tank_id="default": reads.append(1) or {"ph": 7.1})
+    prefetcher = SessionPrefetcher()
+    state = _run_turns(prefetcher, turns=2)
+
+    assert state[SNAPSHOT_KEY]["water_parameters"]["ph"] == 7.1
+    # Only the prefetch reads the water sensors; both turns' get_water_parameters calls are served
+    assert len(reads) == 1
+    assert prefetcher.counts["prefetched"] == 1 and prefetcher.counts["served"] == 2
+
+
+def test_stale_snapshot_is_refreshed_and_not_served():
+    prefetcher = SessionPrefetcher(max_age_s=0.0)
+    _run_turns(prefetcher, turns=2)
+
+    assert prefetcher.counts["prefetched"] == 2
+    assert prefetcher.counts["served"] == 0 and prefetcher.counts["expired"] == 2
+
+
+def test_diagnoses_are_served_only_for_the_prefetched_readings():
+    snapshot = take_snapshot()
+    parameters = snapshot["water_parameters"]
+    nitrogen = {c: parameters[c] for c in ("ammonia", "nitrite", "nitrate")}
+
+    assert _served_value(snapshot, "diagnose_water_quality", {"parameters": parameters}) == snapshot["water_diagnosis"]
+    assert _served_value(snapshot, "diagnose_water_quality", {"parameters": {**parameters, "ph": 3.0}}) is None
+    assert _served_value(snapshot, "monitor_nitrification_cycle", nitrogen) == {"result": snapshot["nitrification_status"]}
+    assert _served_value(snapshot, "suggest_corrective_actions", {}) is None
+    assert snapshot["taken_at"] <= time.time()
@@ -0,0 +1,19 @@
+"""Test cases for the profiling CLI"""
+
+import pstats
+
+from mindponics.profile import run
+
+
+def test_profile_writes_per_turn_and_per_agent_reports(tmp_path):
+    summary = run(["Is the water ammonia safe for my fish?"], tmp_path)
+
+    turn = summary["turns"][0]
+    assert set(turn["agents"]) == {"AquaMaestro", "HydroGuardian", "PiscinePro"}
+    assert pstats.Stats(str(tmp_path / "turn1.prof")).total_calls > 0
+    assert (tmp_path / "turn1.PiscinePro.prof").exists()
+    assert "peak" in (tmp_path / "turn1.alloc.txt").read_text()
+    assert turn["allocations"]["peak_kib"] > 0
+    for line in (tmp_path / "stacks.collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("turn1;agent:") and int(count) > 0
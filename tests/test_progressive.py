@@ -0,0 +1,97 @@
+"""Test cases for progressive per-specialist responses"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.events import Event
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from mindponics.fake_llm import FakeLlm
+from mindponics.progressive import ProgressiveOrchestrator, format_section
+from mindponics.sub_agents.bacteria import BacteriaAgent
+
+
+class ScriptedOrchestrator(BaseAgent):
+    """Stands in for AquaMaestro: one specialist call, then the final answer."""
+
+    after_tool_callback: Any = None
+
+    async def _run_async_impl(self, ctx):
+        tool = AgentTool(agent=BacteriaAgent)
+        context = SimpleNamespace(invocation_id=ctx.invocation_id)
+        for callback in self.after_tool_callback:
+            callback(tool, {"request": "status"}, context, "Biofilter is cycling normally.\n\nDetails follow.")
+        await asyncio.sleep(0)
+        yield Event(
+            invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="All systems stable.")]),
+        )
+
+
+def test_format_section_keeps_first_paragraph():
+    section = format_section("HydroGuardian", {"result": "pH is low.\n\nLong explanation."})
+    assert section == "**Water quality** (HydroGuardian): pH is low.\n\n"
+
+
+def test_sections_stream_before_final_answer_and_are_not_stored():
+    root = ProgressiveOrchestrator(ScriptedOrchestrator(name="AquaMaestro"))
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="How is the system?")])
+        events = [e async for e in runner.run_async(user_id="u", session_id=session.id, new_message=message)]
+        session = await runner.session_service.get_session(app_name="mindponics", user_id="u", session_id=session.id)
+        return events, session
+
+    events, session = asyncio.run(run())
+    texts = [(e.partial, e.content.parts[0].text) for e in events]
+    assert texts == [
+        (True, "**Biofilter** (bacteria_agent): Biofilter is cycling normally.\n\n"),
+        (None, "All systems stable."),
+    ]
+    assert [e.content.parts[0].text for e in session.events if e.author != "user"] == ["All systems stable."]
+
+
+def test_real_orchestrator_streams_fast_section_before_slow_specialist_finishes():
+    finished = {}
+
+    def mark_finished(callback_context, llm_response):
+        finished[callback_context.agent_name] = time.perf_counter()
+        return None
+
+    script = {
+        "AquaMaestro": [
+            {"function_calls": [{"name": "HydroGuardian", "args": {"request": "water?"}},
+                                {"name": "FloraFriend", "args": {"request": "plants?"}}]},
+            {"text": "Combined answer."},
+        ],
+        "HydroGuardian": [{"text": "pH is stable at 7.0."}],
+        "FloraFriend": [{"text": "Lettuce is growing well."}],
+    }
+    fast = LlmAgent(name="HydroGuardian", model=FakeLlm(agent_name="HydroGuardian", script=script),
+                    after_model_callback=mark_finished)
+    slow = LlmAgent(name="FloraFriend", model=FakeLlm(agent_name="FloraFriend", script=script, latency_s=0.3),
+                    after_model_callback=mark_finished)
+    orchestrator = LlmAgent(name="AquaMaestro", model=FakeLlm(agent_name="AquaMaestro", script=script),
+                            tools=[AgentTool(agent=fast), AgentTool(agent=slow)])
+    runner = InMemoryRunner(agent=ProgressiveOrchestrator(orchestrator), app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="How is everything?")])
+        arrivals = []
+        async for event in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            if event.partial:
+                arrivals.append((event.content.parts[0].text, time.perf_counter()))
+        return arrivals
+
+    arrivals = asyncio.run(run())
+    assert [text.split(" (")[0] for text, _ in arrivals] == ["**Water quality**", "**Plant growth**"]
+    water_arrived = arrivals[0][1]
+    assert water_arrived < finished["FloraFriend"]
@@ -0,0 +1,72 @@
+"""Test cases for per-request model tiering"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai.types import Content, GenerateContentResponseUsageMetadata, Part
+
+from mindponics import routing
+from mindponics.routing import MODEL_TIERS, ModelRouter, classify_query
+
+
+def test_routine_questions_use_fast_tier():
+    assert classify_query("What's the current pH?")["tier"] == "fast"
+
+
+def test_multi_domain_and_critical_cases_use_pro_tier():
+    decision = classify_query("My fish are gasping and the lettuce leaves are yellow")
+    assert decision["tier"] == "pro" and decision["reason"] == "multi_domain"
+
+    state = {"water_agent_output": {"issues": [{"parameter": "ammonia", "severity": "critical"}]}}
+    assert classify_query("How is the system?", state)["reason"] == "critical_issues"
+
+
+def test_critical_requires_a_severity_field_or_marker():
+    assert classify_query("What is the pH?", {"water_agent_output": "All good, no critical issues detected."})["tier"] == "fast"
+    assert classify_query("What is the pH?", {"water_agent_output": 'Issues: [{"severity": "critical"}]'})["tier"] == "pro"
+    assert classify_query("What is the pH?", {"fish_agent_output": "CRITICAL: oxygen at 2 mg/L"})["tier"] == "pro"
+
+
+def test_agent_tree_can_be_pickled_for_deployment():
+    cloudpickle = pytest.importorskip("cloudpickle")
+    from mindponics.agent import build_root_agent
+
+    restored = cloudpickle.loads(cloudpickle.dumps(build_root_agent()))
+    assert restored.name.startswith("AquaMaestro")
+
+
+def test_router_sets_model_and_records_tier_stats():
+    router = ModelRouter()
+    context = SimpleNamespace(
+        invocation_id="inv-1", agent_name="HydroGuardian", state={},
+        user_content=Content(role="user", parts=[Part(text="Check ammonia")]),
+    )
+    request = LlmRequest(model="gemini-2.5-pro")
+    router.before_model(context, request)
+    assert request.model == MODEL_TIERS["fast"]
+
+    usage = GenerateContentResponseUsageMetadata(prompt_token_count=120, candidates_token_count=30)
+    router.after_model(context, LlmResponse(usage_metadata=usage))
+    stats = router.stats()["fast"]
+    assert (stats["calls"], stats["prompt_tokens"], stats["completion_tokens"]) == (1, 120, 30)
+
+
+def test_failed_and_abandoned_calls_do_not_stay_pending(monkeypatch):
+    router = ModelRouter()
+    context = SimpleNamespace(
+        invocation_id="inv-1", agent_name="HydroGuardian", state={},
+        user_content=Content(role="user", parts=[Part(text="Check ammonia")]),
+    )
+    router.before_model(context, LlmRequest())
+    router.on_model_error(context, LlmRequest(), RuntimeError("quota exceeded"))
+    assert router._pending == {} and router.stats()["fast"]["calls"] == 0
+
+    # A cancelled call never reaches either callback; later calls drop it once it is stale
+    router.before_model(context, LlmRequest())
+    later = time.perf_counter() + routing.PENDING_TTL_S + 1
+    monkeypatch.setattr(routing.time, "perf_counter", lambda: later)
+    router.before_model(SimpleNamespace(**{**vars(context), "invocation_id": "inv-2"}), LlmRequest())
+    assert list(router._pending) == [("inv-2", "HydroGuardian")]
@@ -0,0 +1,96 @@
+"""Test cases for the model request scheduler"""
+
+import asyncio
+import time
+
+import cloudpickle
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from mindponics.fake_llm import FakeLlm
+from mindponics.scheduler import CRITICAL, ROUTINE, ModelScheduler, ScheduledLlm, _priority, parse_limits
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _request(text: str, model: str = "m") -> LlmRequest:
+    return LlmRequest(model=model, contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def _ask(llm, text: str, model: str = "m", priority: int = ROUTINE) -> str:
+    _priority.set(priority)
+    responses = [r async for r in llm.generate_content_async(_request(text, model))]
+    return responses[-1].content.parts[0].text
+
+
+def test_parse_limits():
+    assert parse_limits("gemini-2.5-pro=60:1000000, gemini-1.5-flash=600") == {
+        "gemini-2.5-pro": (60.0, 1000000.0), "gemini-1.5-flash": (600.0, None)}
+    assert parse_limits("") == {}
+
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_requests_share_one_call():
+    inner = FakeLlm(agent_name="AquaMaestro", latency_s=0.05)
+    scheduler = ModelScheduler()
+    llm = ScheduledLlm(inner=inner, scheduler=scheduler)
+
+    answers = await asyncio.gather(*(_ask(llm, "Is the ammonia safe?") for _ in range(5)), _ask(llm, "Other question"))
+    assert inner.calls == 2
+    assert len(set(answers[:5])) == 1 and answers[5] != answers[0]
+    assert scheduler.stats()["m"]["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_and_critical_goes_first():
+    inner = FakeLlm(agent_name="AquaMaestro")
+    scheduler = ModelScheduler({"m": (600.0, None)}, coalesce=False)   # 10 per second, burst 10
+    llm = ScheduledLlm(inner=inner, scheduler=scheduler)
+    await asyncio.gather(*(_ask(llm, f"warm-up {i}") for i in range(10)))   # empties the burst
+
+    finished = []
+
+    async def ask(name, priority):
+        await _ask(llm, name, priority=priority)
+        finished.append(name)
+
+    started = time.perf_counter()
+    routine = [asyncio.create_task(ask(f"routine {i}", ROUTINE)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    await asyncio.gather(ask("critical", CRITICAL), *routine)
+
+    assert time.perf_counter() - started >= 0.3
+    assert finished.index("critical") <= 1
+    stats = scheduler.stats()["m"]
+    assert stats["requests"] == 14 and stats["max_queue_wait_s"] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_quota_errors_are_retried_after_a_pause(monkeypatch):
+    monkeypatch.setattr("mindponics.scheduler.QUOTA_BACKOFF_S", 0.01)
+
+    class Exhausted(Exception):
+        code = 429
+
+    class FlakyLlm(FakeLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            if self.calls == 0:
+                self.calls += 1
+                raise Exhausted("RESOURCE_EXHAUSTED")
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+
+    scheduler = ModelScheduler({"m": (6000.0, None)})
+    llm = ScheduledLlm(inner=FlakyLlm(agent_name="AquaMaestro"), scheduler=scheduler)
+    assert (await _ask(llm, "Is the water ok?")).startswith("AquaMaestro summary")
+    assert scheduler.stats()["m"]["quota_retries"] == 1
+
+
+def test_scheduled_agent_tree_pickles():
+    from google.adk.agents import LlmAgent
+
+    agent = LlmAgent(name="a", model="gemini-2.5-pro", instruction="x")
+    ModelScheduler({"gemini-2.5-pro": (60.0, None)}).install(agent)
+    restored = cloudpickle.loads(cloudpickle.dumps(agent))
+    assert isinstance(restored.model, ScheduledLlm) and restored.model.model == "gemini-2.5-pro"
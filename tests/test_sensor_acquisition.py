@@ -0,0 +1,94 @@
+"""Test cases for the pooled asynchronous sensor acquisition"""
+
+import time
+
+import pytest
+
+from utils import sensor_acquisition
+from utils.sensor_acquisition import (
+    SensorAcquisition, SensorSnapshot, SimulatedGateway, get_sensor_data, parse_probes, parse_reading,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_parse_probes_and_readings():
+    assert parse_probes("tank-1/ph-1@127.0.0.1:5020, do-2@gw:1") == [
+        ("tank-1", "ph-1", "127.0.0.1", 5020), ("default", "do-2", "gw", 1)]
+    assert parse_reading("OK ph=7.1 ammonia=0.25\n") == {"ph": 7.1, "ammonia": 0.25}
+    with pytest.raises(sensor_acquisition.GatewayError):
+        parse_reading("ERR probe offline")
+
+
+@pytest.mark.asyncio
+async def test_polls_many_probes_over_reused_connections():
+    gateway = SimulatedGateway(latency_s=0.01)
+    port = await gateway.start()
+    probes = [(f"tank-{i % 5}", f"probe-{i}", "127.0.0.1", port) for i in range(40)]
+    snapshot = SensorSnapshot()
+    acquisition = SensorAcquisition(probes, snapshot=snapshot, pool_size=4)
+    try:
+        started = time.perf_counter()
+        assert await acquisition.poll_once() == 40
+        # Four connections share the 40 reads, ten after another on each
+        assert time.perf_counter() - started < 0.4
+        assert await acquisition.poll_once() == 40
+    finally:
+        await acquisition.close()
+        await gateway.stop()
+
+    assert gateway.connections == 4 and gateway.requests == 80
+    assert set(snapshot.latest("tank-3")) >= {"ph", "ammonia", "oxygen", "humidity"}
+    assert snapshot.errors() == {}
+
+
+@pytest.mark.asyncio
+async def test_failing_and_slow_probes_are_retried_then_reported():
+    gateway = SimulatedGateway(failing={"broken"})
+    port = await gateway.start()
+    slow = SimulatedGateway(latency_s=0.5)
+    slow_port = await slow.start()
+    snapshot = SensorSnapshot()
+    acquisition = SensorAcquisition(
+        [("tank-1", "ok", "127.0.0.1", port), ("tank-1", "broken", "127.0.0.1", port),
+         ("tank-2", "slow", "127.0.0.1", slow_port)],
+        snapshot=snapshot, timeout_s=0.05, retries=1)
+    try:
+        assert await acquisition.poll_once() == 1
+    finally:
+        await acquisition.close()
+        await gateway.stop()
+        await slow.stop()
+
+    assert acquisition.stats == {"polls": 1, "reads": 1, "retries": 2, "failures": 2}
+    assert set(snapshot.errors()) == {"broken", "slow"}
+    assert "not responding" in snapshot.errors()["broken"]
+    assert snapshot.latest("tank-1") is not None and snapshot.latest("tank-2") is None
+
+
+def test_tools_read_the_snapshot_and_fall_back_when_it_is_stale(monkeypatch):
+    snapshot = SensorSnapshot()
+    monkeypatch.setattr(sensor_acquisition, "sensor_snapshot", snapshot)
+    snapshot.publish("default", {"ph": 6.2})
+    data = get_sensor_data()
+    assert data["ph"] == 6.2 and "ph" not in data["simulated_fields"] and "ammonia" in data["simulated_fields"]
+
+    snapshot.publish("default", {"ph": 6.2}, updated_at=time.time() - 3600)
+    assert "ammonia" in get_sensor_data()
+
+
+def test_tools_read_their_tank_and_flag_fields_no_probe_reported(monkeypatch):
+    from mindponics.sub_agents.environment.agent import get_ambient_conditions
+    from mindponics.sub_agents.water.agent import get_water_parameters
+
+    snapshot = SensorSnapshot()
+    monkeypatch.setattr(sensor_acquisition, "sensor_snapshot", snapshot)
+    snapshot.publish("tank-1", {"ph": 6.2, "oxygen": 5.5, "humidity": 70.0})
+
+    parameters = get_water_parameters("tank-1")
+    assert parameters["ph"] == 6.2 and parameters["dissolved_oxygen"] == 5.5
+    # Unreported fields are simulated and named, never silent zeros
+    assert set(parameters["simulated_fields"]) == {"ammonia", "nitrite", "nitrate", "temperature"}
+    conditions = get_ambient_conditions("tank-1")
+    assert conditions["humidity"] == 70.0 and set(conditions["simulated_fields"]) == {"temperature", "light_level"}
+    assert "simulated_fields" not in get_water_parameters("tank-2")
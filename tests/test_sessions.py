@@ -0,0 +1,120 @@
+"""Test cases for the SQLite session service"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.genai import types
+
+from mindponics.agent import build_root_agent
+from mindponics.fake_llm import fake_llm
+from mindponics.sessions import SQLiteSessionService
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _event(n: int, **state) -> Event:
+    return Event(author="user", invocation_id=f"inv{n}", content=types.Content(role="user", parts=[types.Part(text=f"m{n}")]),
+                 actions=EventActions(state_delta=state))
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_a_restart(tmp_path):
+    service = SQLiteSessionService(tmp_path / "s.db")
+    session = await service.create_session(app_name="a", user_id="u", state={"user:name": "Ada", "tank": 1})
+    for n in range(3):
+        await service.append_event(session, _event(n, tank=n, **{"app:version": n, "temp:scratch": n}))
+    service.close()
+
+    reopened = SQLiteSessionService(tmp_path / "s.db")
+    restored = await reopened.get_session(app_name="a", user_id="u", session_id=session.id)
+    assert [e.content.parts[0].text for e in restored.events] == ["m0", "m1", "m2"]
+    assert restored.state == {"tank": 2, "user:name": "Ada", "app:version": 2}
+    listed = await reopened.list_sessions(app_name="a", user_id="u")
+    assert [s.id for s in listed.sessions] == [session.id] and listed.sessions[0].events == []
+    await reopened.delete_session(app_name="a", user_id="u", session_id=session.id)
+    assert await reopened.get_session(app_name="a", user_id="u", session_id=session.id) is None
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_appends_are_written_behind_in_batches(tmp_path):
+    service = SQLiteSessionService(tmp_path / "s.db", batch_delay_s=0.2)
+    session = await service.create_session(app_name="a", user_id="u")
+    for n in range(50):
+        await service.append_event(session, _event(n, counter=n))
+
+    on_disk = sqlite3.connect(tmp_path / "s.db").execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    assert on_disk == 0
+    await service.flush()
+    db = sqlite3.connect(tmp_path / "s.db")
+    assert db.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 50
+    assert db.execute("SELECT value FROM session_state WHERE key='counter'").fetchall() == [("49",)]
+    assert service.stats["batches"] == 1
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_and_idle_eviction_with_compaction(tmp_path):
+    service = SQLiteSessionService(tmp_path / "s.db", cache_size=2, keep_events=2)
+    sessions = [await service.create_session(app_name="a", user_id="u") for _ in range(3)]
+    assert service.stats["evicted"] == 1
+    for n in range(5):
+        await service.append_event(sessions[0], _event(n))
+
+    service.idle_s = 0.0
+    service.evict_idle()
+    assert not service._cache
+    await service.flush()
+    restored = await service.get_session(app_name="a", user_id="u", session_id=sessions[0].id)
+    assert [e.content.parts[0].text for e in restored.events] == ["m3", "m4"]
+    assert service.stats["misses"] >= 1
+    service.close()
+
+
+def test_runner_turn_persists_agent_outputs(tmp_path):
+    root = build_root_agent()
+    service = SQLiteSessionService(tmp_path / "s.db")
+    runner = Runner(agent=root, app_name="mindponics", session_service=service)
+
+    async def run():
+        session = await service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="Is the water ammonia safe?")])
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+        return session.id
+
+    with fake_llm(root):
+        session_id = asyncio.run(run())
+    service.close()
+
+    reopened = SQLiteSessionService(tmp_path / "s.db")
+    restored = asyncio.run(reopened.get_session(app_name="mindponics", user_id="u", session_id=session_id))
+    assert restored.state["mindponics_output"].startswith("AquaMaestro summary")
+    assert any(e.author == "AquaMaestro" for e in restored.events)
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_misses_do_not_block_the_event_loop(tmp_path):
+    service = SQLiteSessionService(tmp_path / "s.db", cache_size=1, batch_delay_s=0.3)
+    first = await service.create_session(app_name="a", user_id="u")
+    await service.create_session(app_name="a", user_id="u")
+
+    # The miss on `first` waits for the writer's batch delay; the loop keeps running meanwhile
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.ensure_future(tick())
+    restored = await service.get_session(app_name="a", user_id="u", session_id=first.id)
+    ticker.cancel()
+    assert restored.id == first.id and service.stats["misses"] == 1
+    assert ticks >= 10
+    service.close()
@@ -0,0 +1,31 @@
+"""Test cases for lazy agent construction"""
+
+import subprocess
+import sys
+
+from benchmarks.import_time import parse_importtime
+
+
+def test_importing_agent_module_does_not_load_adk():
+    code = (
+        "import sys, mindponics.agent\n"
+        "print(sorted(m for m in ('google.adk', 'google.genai', 'numpy') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_root_agent_is_built_once():
+    import mindponics.agent as agent
+
+    assert agent.root_agent is agent.root_agent
+    assert agent.root_agent.name.startswith("AquaMaestro")
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   mindponics.prompt\n"
+        "import time:      1500 |       1620 | mindponics.agent\n"
+    )
+    assert parse_importtime(stderr) == {"mindponics.prompt": 0.12, "mindponics.agent": 1.5}
@@ -0,0 +1,89 @@
+"""Test cases for session state compaction and size accounting"""
+
+import asyncio
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from mindponics.agent import build_root_agent
+from mindponics.callbacks import CALLBACK_SLOTS, iter_llm_agents
+from mindponics.fake_llm import fake_llm
+from mindponics.routing import has_critical_issues
+from mindponics.state_compaction import (
+    AGENT_OUTPUT_HISTORY_KEY, TRUNCATED_KEY, StateCompactor, _cap, measure_state, summarize_output, value_bytes,
+)
+
+
+@pytest.fixture
+def root():
+    # The root agent is cached, so callbacks added by a test are removed afterwards
+    root = build_root_agent()
+    slots = {(agent.name, slot): getattr(agent, slot) for agent in iter_llm_agents(root) for slot in CALLBACK_SLOTS}
+    yield root
+    for agent in iter_llm_agents(root):
+        for slot in CALLBACK_SLOTS:
+            setattr(agent, slot, slots[(agent.name, slot)])
+
+
+def _run_session(root, texts: list):
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        for text in texts:
+            message = types.Content(role="user", parts=[types.Part(text=text)])
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                pass
+        return await runner.session_service.get_session(app_name="mindponics", user_id="u", session_id=session.id)
+
+    with fake_llm(root):
+        return asyncio.run(run())
+
+
+def test_summarize_output_keeps_the_first_sentences():
+    text = "Ammonia is high at 0.8 ppm. Reduce feeding. " * 20 + "\n\nDetails follow."
+    summary = summarize_output(text, max_chars=80)
+    assert summary.endswith("…") and len(summary) <= 81
+    assert summary.startswith("Ammonia is high at 0.8 ppm.")
+    assert summarize_output("Short answer.") == "Short answer."
+
+
+def test_replaced_outputs_fold_into_history(root):
+    compactor = StateCompactor(max_history=2)
+    compactor.install(root)
+    session = _run_session(root, [f"Check the water ammonia, reading {n}" for n in range(4)])
+
+    history = session.state[AGENT_OUTPUT_HISTORY_KEY]
+    assert len(history["water_agent_output"]) == 2
+    assert "reading 2" in history["mindponics_output"][-1]
+    assert "reading 3" in session.state["mindponics_output"]
+    assert compactor.totals["folded"] >= 6
+    metrics = compactor.metrics()
+    assert metrics["sessions"] == 1
+    assert compactor.session_bytes(session.id) == sum(measure_state(session.state).values())
+
+
+def test_keys_over_their_cap_are_truncated(root):
+    compactor = StateCompactor(key_caps={"mindponics_output": 120}, default_cap=None)
+    compactor.install(root)
+    session = _run_session(root, ["Give me a full status report"])
+
+    assert len(session.state["mindponics_output"].encode()) <= 120
+    assert "truncated from" in session.state["mindponics_output"]
+    assert len(session.state["water_agent_output"]) > 120
+    assert compactor.totals["truncated"] == 1 and compactor.totals["bytes_removed"] > 0
+
+
+def test_structured_values_keep_their_shape_when_capped():
+    diagnosis = {
+        "status": "critical",
+        "issues": [{"parameter": "ammonia", "severity": "critical", "detail": "rising " * 40}] * 30,
+        **{f"reading_{i}": i * 0.5 for i in range(200)},
+    }
+    capped = _cap(diagnosis, 1024)
+
+    assert isinstance(capped, dict) and value_bytes(capped) <= 1024
+    assert capped["status"] == "critical" and capped["issues"][0]["severity"] == "critical"
+    assert "more keys" in capped[TRUNCATED_KEY] and "more items" in capped["issues"][-1]
+    assert has_critical_issues({"water_agent_output": capped})
@@ -0,0 +1,75 @@
+"""Test cases for latency and token telemetry"""
+
+import asyncio
+import json
+
+import cloudpickle
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from mindponics.agent import build_root_agent
+from mindponics.fake_llm import fake_llm
+from mindponics.telemetry import LATENCY_BUCKETS, Histogram, Telemetry
+
+
+def _run_turn(root, text: str) -> None:
+    runner = InMemoryRunner(agent=root, app_name="mindponics")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="mindponics", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(run())
+
+
+def test_histogram_quantile():
+    histogram = Histogram(LATENCY_BUCKETS)
+    for _ in range(99):
+        histogram.observe(0.002)
+    histogram.observe(3.0)
+    assert histogram.count == 100
+    assert 0.001 <= histogram.quantile(0.5) <= 0.0025
+    assert 2.5 <= histogram.quantile(0.999) <= 5.0
+
+
+def test_turn_records_agents_models_tools_and_tokens(tmp_path):
+    root = build_root_agent()
+    telemetry = Telemetry()
+    telemetry.install(root)
+    with fake_llm(root, latency_s=0.002):
+        _run_turn(root, "Is the water ammonia safe for my fish?")
+
+    recorded = {(metric, dict(labels).get("agent"), dict(labels).get("tool")) for metric, labels in telemetry.histograms}
+    assert ("mindponics_agent_latency_seconds", "HydroGuardian", None) in recorded
+    assert ("mindponics_model_latency_seconds", "AquaMaestro", None) in recorded
+    assert ("mindponics_tool_latency_seconds", "AquaMaestro", "PiscinePro") in recorded
+    assert ("mindponics_tool_latency_seconds", "HydroGuardian", "get_water_parameters") in recorded
+
+    fanout = telemetry.histograms[("mindponics_agent_fanout", (("agent", "AquaMaestro"),))]
+    assert fanout.sum == 2
+    model = telemetry.histograms[("mindponics_model_latency_seconds", (("agent", "AquaMaestro"), ("model", "mindponics-fake")))]
+    assert model.count == 2 and model.sum >= 0.004
+    tokens = {dict(labels)["kind"] for metric, labels in telemetry.counters if metric == "mindponics_model_tokens_total"}
+    assert {"prompt", "completion"} <= tokens
+
+    text = telemetry.render_prometheus()
+    assert "# TYPE mindponics_tool_latency_seconds histogram" in text
+    assert 'mindponics_cache_hits_total{cache="tool_declarations"}' in text
+    assert 'le="+Inf"' in text
+
+    telemetry.export(tmp_path)
+    metrics = json.loads((tmp_path / "metrics.otlp.json").read_text())
+    names = {m["name"] for m in metrics["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]}
+    assert "mindponics_model_tokens_total" in names
+    spans = json.loads((tmp_path / "slow_spans.otlp.json").read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans and (tmp_path / "metrics.prom").read_text() == telemetry.render_prometheus()
+
+
+def test_telemetry_pickles():
+    telemetry = Telemetry()
+    telemetry.observe("mindponics_tool_latency_seconds", (("tool", "t"),), 0.01)
+    restored = cloudpickle.loads(cloudpickle.dumps(telemetry))
+    restored.observe("mindponics_tool_latency_seconds", (("tool", "t"),), 0.01)
+    assert restored.histograms[("mindponics_tool_latency_seconds", (("tool", "t"),))].count == 2
@@ -0,0 +1,32 @@
+"""Test cases for cached tool declarations"""
+
+from google.adk.tools import FunctionTool
+
+from mindponics.sub_agents.fish.agent import calculate_feeding
+from mindponics.tool_declarations import CachedFunctionTool, clear_declaration_cache, declaration_cache_stats
+
+
+def test_cached_declaration_matches_function_tool():
+    clear_declaration_cache()
+    tool = CachedFunctionTool(func=calculate_feeding)
+    first = tool._get_declaration()
+
+    assert first == FunctionTool(func=calculate_feeding)._get_declaration()
+    assert CachedFunctionTool(func=calculate_feeding)._get_declaration() is first
+    assert declaration_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_functions_with_same_name_get_their_own_declaration():
+    def lookup(species: str) -> dict:
+        """Looks up a species."""
+        return {}
+
+    first = CachedFunctionTool(func=lookup)._get_declaration()
+
+    def lookup(species: str, life_stage: str) -> dict:
+        """Looks up a species at a life stage."""
+        return {}
+
+    second = CachedFunctionTool(func=lookup)._get_declaration()
+    assert first is not second
+    assert set(second.parameters.properties) == {"species", "life_stage"}
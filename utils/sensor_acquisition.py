@@ -0,0 +1,346 @@
+"""Asynchronous sensor acquisition over pooled device gateway connections.
+
+Probes sit behind device gateways (Modbus/TCP bridges, serial servers) that
+answer one request at a time per connection. SensorAcquisition polls every
+probe concurrently on an asyncio loop of its own:
+
+* connections to each gateway are pooled and reused across polls, up to
+  pool_size per gateway, so a poll of many probes opens no new sockets;
+* every read has a timeout and is retried with backoff; a connection that
+  fails or times out is dropped from the pool rather than reused;
+* results are published into a SensorSnapshot, merged per tank.
+
+Tools read the latest snapshot through get_sensor_data(tank_id) and never
+wait on device I/O. get_sensor_data() falls back to the simulator when no
+acquisition is running or the tank's readings are older than max_age_s.
+Probes may report only some parameters. Fields a tank's probes have not
+reported come from the simulator too, and are listed under
+SIMULATED_FIELDS_KEY so they are never mistaken for measurements.
+
+The wire protocol is line based: the client sends "READ <probe_id>\\n" and the
+gateway answers "OK name=value name=value ...\\n" or "ERR <message>\\n".
+SimulatedGateway is a local TCP stand-in that answers with simulator data.
+
+Set MINDPONICS_SENSOR_PROBES to comma-separated tank_id/probe_id@host:port
+entries to start polling when the agent is built, every
+MINDPONICS_SENSOR_INTERVAL_S seconds (default 10).
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+
+from utils.sensor_simulator import get_simulated_sensor_data
+
+DEFAULT_TIMEOUT_S = 2.0
+DEFAULT_RETRIES = 2
+DEFAULT_POOL_SIZE = 4
+DEFAULT_INTERVAL_S = 10.0
+DEFAULT_MAX_AGE_S = 60.0
+RETRY_BACKOFF_S = 0.05
+SIMULATED_FIELDS_KEY = "simulated_fields"
+
+
+class GatewayError(Exception):
+    """The gateway answered a read with an error."""
+
+
+def parse_probes(spec: str) -> list:
+    """Parses "tank_id/probe_id@host:port,..." into (tank_id, probe_id, host, port) tuples."""
+    probes = []
+    for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+        path, _, address = item.partition("@")
+        tank_id, _, probe_id = path.rpartition("/")
+        host, _, port = address.rpartition(":")
+        probes.append((tank_id or "default", probe_id, host, int(port)))
+    return probes
+
+
+def parse_reading(line: str) -> dict:
+    """Parses a gateway answer into a reading dict, raising GatewayError for an error answer."""
+    status, _, payload = line.strip().partition(" ")
+    if status != "OK":
+        raise GatewayError(payload or status or "empty answer")
+    reading = {}
+    for field in payload.split():
+        name, _, value = field.partition("=")
+        reading[name] = float(value)
+    return reading
+
+
+class SensorSnapshot:
+    """Latest readings per tank, written by the acquisition loop and read by tools from any thread."""
+
+    def __init__(self):
+        self._tanks = {}   # tank_id -> (updated_at, readings); replaced, never mutated
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and agents are pickled for Agent Engine deployment
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def publish(self, tank_id: str, reading: dict, updated_at: float = None) -> None:
+        with self._lock:
+            _, current = self._tanks.get(tank_id, (0.0, {}))
+            self._tanks[tank_id] = (updated_at or time.time(), {**current, **reading})
+
+    def record_error(self, probe_id: str, error: str) -> None:
+        with self._lock:
+            self._errors[probe_id] = (time.time(), error)
+
+    def clear_error(self, probe_id: str) -> None:
+        with self._lock:
+            self._errors.pop(probe_id, None)
+
+    def latest(self, tank_id: str = "default", max_age_s: float = None):
+        """Returns the tank's merged readings, or None when there are none or they are older than max_age_s."""
+        updated_at, reading = self._tanks.get(tank_id, (0.0, None))
+        if reading is None or (max_age_s is not None and time.time() - updated_at > max_age_s):
+            return None
+        return dict(reading)
+
+    def errors(self) -> dict:
+        with self._lock:
+            return {probe_id: error for probe_id, (_, error) in self._errors.items()}
+
+
+class ConnectionPool:
+    """
+    Reusable connections to one gateway.
+
+    Args:
+        host: Gateway host
+        port: Gateway TCP port
+        size: Most connections open at once; further reads wait for a free one
+    """
+
+    def __init__(self, host: str, port: int, size: int = DEFAULT_POOL_SIZE):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """Yields a (reader, writer) pair; it returns to the pool unless the block raised."""
+        async with self._slots:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.opened += 1
+            try:
+                yield reader, writer
+            except BaseException:
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+
+class SensorAcquisition:
+    """
+    Polls many probes concurrently over pooled gateway connections into a SensorSnapshot.
+
+    Args:
+        probes: (tank_id, probe_id, host, port) per probe
+        snapshot: Where readings are published, defaults to the shared sensor_snapshot
+        pool_size: Connections per gateway
+        timeout_s: Limit for one read, including waiting for a connection
+        retries: Further attempts after a failed or timed-out read
+    """
+
+    def __init__(self, probes: list, snapshot: SensorSnapshot = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout_s: float = DEFAULT_TIMEOUT_S, retries: int = DEFAULT_RETRIES):
+        self.probes = list(probes)
+        self.snapshot = snapshot or sensor_snapshot
+        self.pool_size = pool_size
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self.stats = {"polls": 0, "reads": 0, "retries": 0, "failures": 0}
+        self._pools = {}
+        self._thread = None
+        self._loop = None
+
+    def _pool(self, host: str, port: int) -> ConnectionPool:
+        pool = self._pools.get((host, port))
+        if pool is None:
+            pool = self._pools[(host, port)] = ConnectionPool(host, port, self.pool_size)
+        return pool
+
+    async def _read_once(self, pool: ConnectionPool, probe_id: str) -> dict:
+        async with pool.connection() as (reader, writer):
+            writer.write(f"READ {probe_id}\n".encode())
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("gateway closed the connection")
+        # Parsed outside the block: an error answer leaves the connection usable
+        return parse_reading(line.decode())
+
+    async def read_probe(self, tank_id: str, probe_id: str, host: str, port: int):
+        """Reads one probe with timeout and retries and publishes the reading. Returns it, or None on failure."""
+        pool = self._pool(host, port)
+        for attempt in range(self.retries + 1):
+            try:
+                reading = await asyncio.wait_for(self._read_once(pool, probe_id), self.timeout_s)
+            except (OSError, asyncio.TimeoutError, GatewayError, ValueError) as e:
+                error = str(e) or type(e).__name__
+                if attempt < self.retries:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(RETRY_BACKOFF_S * 2 ** attempt)
+                    continue
+                self.stats["failures"] += 1
+                self.snapshot.record_error(probe_id, error)
+                logging.warning(f"[SensorAcquisition] {probe_id} at {host}:{port} failed: {error}")
+                return None
+            self.stats["reads"] += 1
+            self.snapshot.publish(tank_id, reading)
+            self.snapshot.clear_error(probe_id)
+            return reading
+
+    async def poll_once(self) -> int:
+        """Reads every probe concurrently. Returns how many reads succeeded."""
+        results = await asyncio.gather(*(self.read_probe(*probe) for probe in self.probes))
+        self.stats["polls"] += 1
+        return sum(r is not None for r in results)
+
+    async def run(self, interval_s: float = DEFAULT_INTERVAL_S) -> None:
+        """Polls every interval_s seconds until cancelled."""
+        try:
+            while True:
+                started = time.monotonic()
+                await self.poll_once()
+                await asyncio.sleep(max(interval_s - (time.monotonic() - started), 0))
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        for pool in self._pools.values():
+            await pool.close()
+        self._pools = {}
+
+    def start(self, interval_s: float = DEFAULT_INTERVAL_S) -> None:
+        """Runs the polling loop on an event loop in a daemon thread, apart from the agent's loop."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, args=(interval_s,), name="sensor-acquisition", daemon=True)
+        self._thread.start()
+
+    def _serve(self, interval_s: float) -> None:
+        try:
+            self._loop.run_until_complete(self.run(interval_s))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks()])
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+class SimulatedGateway:
+    """
+    Local TCP gateway answering reads with sensor simulator data, for tests and benchmarks.
+
+    Args:
+        latency_s: Delay before each answer
+        failing: Probe ids answered with an error
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_s: float = 0.0, failing=()):
+        self.host = host
+        self.port = port
+        self.latency_s = latency_s
+        self.failing = set(failing)
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.requests += 1
+                command, _, probe_id = line.decode().strip().partition(" ")
+                if self.latency_s:
+                    await asyncio.sleep(self.latency_s)
+                if command != "READ" or not probe_id:
+                    answer = "ERR bad request"
+                elif probe_id in self.failing:
+                    answer = f"ERR probe {probe_id} not responding"
+                else:
+                    answer = "OK " + " ".join(f"{k}={v}" for k, v in get_simulated_sensor_data().items())
+                writer.write((answer + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        """Starts listening and returns the bound port."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+sensor_snapshot = SensorSnapshot()
+
+
+def get_sensor_data(tank_id: str = "default", max_age_s: float = DEFAULT_MAX_AGE_S) -> dict:
+    """
+    Returns the tank's latest acquired readings, or simulator data when there are no fresh ones.
+    Fields the tank's probes have not reported are filled from the simulator and named under SIMULATED_FIELDS_KEY.
+    """
+    reading = sensor_snapshot.latest(tank_id, max_age_s)
+    fallback = get_simulated_sensor_data()
+    if reading is None:
+        return fallback
+    missing = sorted(set(fallback) - set(reading))
+    if not missing:
+        return reading
+    return {**fallback, **reading, SIMULATED_FIELDS_KEY: missing}
+
+
+def start_from_env():
+    """Starts polling the probes in MINDPONICS_SENSOR_PROBES, if set. Returns the SensorAcquisition or None."""
+    probes = parse_probes(os.getenv("MINDPONICS_SENSOR_PROBES", ""))
+    if not probes:
+        return None
+    acquisition = SensorAcquisition(probes)
+    acquisition.start(float(os.getenv("MINDPONICS_SENSOR_INTERVAL_S", DEFAULT_INTERVAL_S)))
+    logging.info(f"[SensorAcquisition] Polling {len(probes)} probes")
+    return acquisition